@@ -0,0 +1,51 @@
+"""
+Status-register decode throughput: per-string parse_status vs. the batch decoder.
+
+Usage:
+    python -m benchmarks.bench_bit_parser
+"""
+import gc
+import time
+
+import numpy as np
+
+from framework.utils.bit_parser import BitParser
+
+N_REGISTERS = 1_000_000
+SCALAR_SAMPLE = 200_000
+
+
+def rate(fn, count, repeat=3):
+    """Best-of-N registers per second."""
+    best = float("inf")
+    for _ in range(repeat):
+        # Keep the collector from charging one path for another path's garbage
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+        gc.enable()
+    return count / best
+
+
+def main():
+    rng = np.random.default_rng(0)
+    regs = rng.integers(0, 0x10000, N_REGISTERS, dtype=np.uint16)
+    dump = regs.astype("<u2").tobytes()
+    hex_sample = [f"0x{v:04X}" for v in regs[:SCALAR_SAMPLE]]
+
+    results = {
+        "parse_status (hex str)": rate(lambda: [BitParser.parse_status(h) for h in hex_sample], SCALAR_SAMPLE),
+        "batch (bytes)": rate(lambda: BitParser.parse_status_batch(dump), N_REGISTERS),
+        "batch (uint16 array)": rate(lambda: BitParser.parse_status_batch(regs), N_REGISTERS),
+    }
+    baseline = results["parse_status (hex str)"]
+    print(f"{'path':<22} | {'registers/s':>14} | {'vs scalar':>9}")
+    print("-" * 52)
+    for name, per_second in results.items():
+        print(f"{name:<22} | {per_second:>14,.0f} | {per_second / baseline:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Bytes and server time per /telemetry poll: full frames vs. ?since= deltas.
+
+N sessions are polled once per tick, the way a rack of rigs polls at 1 Hz:
+one set of clients fetches full frames, the other passes the `seq` of the
+last frame it holds. Requests go straight into the ASGI app (as in
+bench_metrics), with the tick scheduler keeping every frame cached; a full
+poll is then a cache lookup, so the delta side shows what cutting the
+delta costs on top of it. Body bytes are what goes over the wire
+before compression. Encoding compares what building the body costs by
+itself: rendering and serializing a full frame vs. cutting one delta.
+
+Usage:
+    python -m benchmarks.bench_delta [--sessions 1000] [--ticks 20]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from simulator.chip_api import app, render_frame, session_fleet, tick_scheduler, user_sessions
+from simulator.delta import encode_delta
+
+
+class Poll:
+    """One captured response."""
+
+    def __init__(self):
+        self.status = None
+        self.body = b""
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        elif message["type"] == "http.response.body":
+            self.body += message.get("body", b"")
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def get(cookie: bytes, query: bytes = b"") -> bytes:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/telemetry", "raw_path": b"/telemetry", "query_string": query,
+        "root_path": "", "headers": [(b"host", b"sim"), (b"cookie", cookie)],
+        "client": ("127.0.0.1", 50000), "server": ("sim", 80),
+    }
+    poll = Poll()
+    await app(scope, receive, poll.send)
+    assert poll.status == 200
+    return poll.body
+
+
+async def run(n: int, ticks: int) -> dict:
+    cookies = [f"chip_session=delta-{i}".encode() for i in range(n)]
+    seqs = [0] * n
+    for i, cookie in enumerate(cookies):
+        seqs[i] = json.loads(await get(cookie, b"since=0"))["seq"]
+    totals = {"full": [0, 0.0], "delta": [0, 0.0]}
+    keyframes = 0
+
+    for _ in range(ticks):
+        session_fleet.step()
+        tick_scheduler.tick()
+
+        start = time.perf_counter()
+        for cookie in cookies:
+            totals["full"][0] += len(await get(cookie))
+        totals["full"][1] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        bodies = [await get(cookie, b"since=%d" % seq) for cookie, seq in zip(cookies, seqs)]
+        totals["delta"][1] += time.perf_counter() - start
+        # Decoded outside the timing, which covers the server side only
+        for i, body in enumerate(bodies):
+            totals["delta"][0] += len(body)
+            update = json.loads(body)
+            keyframes += "keyframe" in update
+            seqs[i] = update["seq"]
+
+    polls = n * ticks
+    return {"keyframes": keyframes, **{kind: (size / polls, seconds / polls) for kind, (size, seconds) in totals.items()}}
+
+
+def encode_costs() -> dict:
+    """Seconds per body: a full frame from the fleet columns, and a delta between a chip's last two frames."""
+    chips = list(user_sessions.items())
+    start = time.perf_counter()
+    for session_id, chip in chips:
+        json.dumps(render_frame(session_id, chip)).encode()
+    full = (time.perf_counter() - start) / len(chips)
+
+    frames = [chip.frame for _, chip in chips]
+    start = time.perf_counter()
+    for frame in frames:
+        encode_delta(frame.seq, frame.history[-2][1], frame.history[-1][1])
+    return {"full": full, "delta": (time.perf_counter() - start) / len(frames)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=1_000)
+    parser.add_argument("--ticks", type=int, default=20)
+    args = parser.parse_args()
+
+    for i in range(args.sessions):
+        user_sessions.get_or_create(f"delta-{i}")
+    # Serve cached frames, as while the scheduler loop is running
+    tick_scheduler.tick()
+    tick_scheduler.running = True
+
+    results = asyncio.run(run(args.sessions, args.ticks))
+    encoding = encode_costs()
+    print(f"{args.sessions} sessions x {args.ticks} ticks, one poll per session per tick "
+          f"({results.pop('keyframes')} keyframes after the first)")
+    print(f"{'poll':>6} | {'bytes':>7} | {'µs/request':>11} | {'µs/encode':>10}")
+    print("-" * 44)
+    for kind, (size, seconds) in results.items():
+        print(f"{kind:>6} | {size:>7.0f} | {seconds * 1e6:>11.1f} | {encoding[kind] * 1e6:>10.1f}")
+    full, delta = results["full"], results["delta"]
+    print(f"delta bodies are {full[0] / delta[0]:.1f}x smaller and {encoding['full'] / encoding['delta']:.1f}x "
+          f"cheaper to build")
+
+
+if __name__ == "__main__":
+    main()
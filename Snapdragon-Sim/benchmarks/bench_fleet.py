@@ -0,0 +1,82 @@
+"""
+Per-device step cost of the fleet engine vs. the original per-dict physics.
+
+Usage:
+    python -m benchmarks.bench_fleet
+"""
+import random
+import time
+
+from simulator.fleet import Fleet
+
+SIZES = (10, 1_000, 100_000)
+
+
+def legacy_state():
+    """The original dict-of-lists chip state."""
+    return {
+        "battery_level": 100.0, "global_temp": 40.0, "power_mode": "Balance", "is_throttling": False,
+        "cores": [
+            {"id": i, "type": "Prime", "speed": 3.53, "temp": 40.0} if i < 2
+            else {"id": i, "type": "Performance", "speed": 2.80, "temp": 40.0}
+            for i in range(8)
+        ],
+    }
+
+
+def legacy_update(s):
+    """The original per-session update_physics loop, kept verbatim for comparison."""
+    if s["battery_level"] <= 5: s["power_mode"] = "Ultra Saver"
+    elif s["battery_level"] <= 20: s["power_mode"] = "Battery Saver"
+
+    if s["power_mode"] == "High Performance":
+        prime_t, perf_t, drain, heat = 4.32, 3.53, 0.45, 2.2
+    elif s["power_mode"] == "Balance":
+        prime_t, perf_t, drain, heat = 3.53, 2.80, 0.15, 0.4
+    else:
+        prime_t, perf_t, drain, heat = 1.20, 0.80, 0.05, -1.5
+
+    if s["global_temp"] > 85: s["is_throttling"] = True
+    elif s["global_temp"] < 65: s["is_throttling"] = False
+
+    if s["is_throttling"]:
+        prime_t, perf_t, heat = 1.80, 1.40, -3.5
+
+    s["battery_level"] = max(0, round(s["battery_level"] - drain, 2))
+    s["global_temp"] = max(35, round(s["global_temp"] + heat + random.uniform(-0.5, 0.5), 1))
+
+    for core in s["cores"]:
+        target = prime_t if core["type"] == "Prime" else perf_t
+        core["speed"] = round(target + random.uniform(-0.03, 0.03), 2)
+        core["temp"] = round(s["global_temp"] + random.uniform(-1.0, 1.0), 1)
+
+
+def time_per_device(fn, n_devices, min_seconds=0.5):
+    """Runs fn() repeatedly and returns seconds per device per step."""
+    fn()  # warm-up
+    runs, start = 0, time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / (runs * n_devices)
+
+
+def main():
+    print(f"{'sessions':>10} | {'legacy ns/dev':>14} | {'fleet ns/dev':>13} | {'speedup':>8}")
+    print("-" * 56)
+    for n in SIZES:
+        states = [legacy_state() for _ in range(n)]
+        legacy = time_per_device(lambda: [legacy_update(s) for s in states], n)
+
+        fleet = Fleet(capacity=n, seed=0)
+        for _ in range(n):
+            fleet.allocate()
+        batched = time_per_device(fleet.step, n)
+
+        print(f"{n:>10} | {legacy * 1e9:>14.0f} | {batched * 1e9:>13.0f} | {legacy / batched:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
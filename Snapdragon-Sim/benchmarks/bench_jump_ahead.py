@@ -0,0 +1,45 @@
+"""
+Cost of reaching a far-future state: tick-by-tick stepping vs. jump-ahead.
+
+Usage:
+    python -m benchmarks.bench_jump_ahead
+"""
+import time
+
+import numpy as np
+
+from simulator.fleet import Fleet, MODE_CODES
+
+N_SESSIONS = 1_000
+HORIZONS = (60, 3_600, 86_400)
+
+
+def make_fleet():
+    fleet = Fleet(capacity=N_SESSIONS, seed=0)
+    slots = np.array([fleet.allocate() for _ in range(N_SESSIONS)])
+    # Half the fleet boosted, half balanced, so both heat profiles are exercised
+    fleet.power_mode[slots[::2]] = MODE_CODES["High Performance"]
+    return fleet, slots
+
+
+def main():
+    print(f"{N_SESSIONS} sessions")
+    print(f"{'sim seconds':>12} | {'stepping ms':>12} | {'jump-ahead ms':>14} | {'speedup':>8}")
+    print("-" * 56)
+    for horizon in HORIZONS:
+        fleet, slots = make_fleet()
+        start = time.perf_counter()
+        for _ in range(horizon):
+            fleet.step(slots)
+        stepping = time.perf_counter() - start
+
+        fleet, slots = make_fleet()
+        start = time.perf_counter()
+        fleet.advance(slots, horizon)
+        jumping = time.perf_counter() - start
+
+        print(f"{horizon:>12} | {stepping * 1e3:>12.1f} | {jumping * 1e3:>14.1f} | {stepping / jumping:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+"""
+Load generator for the simulator API: throughput, latency percentiles and
+memory per session under a configurable request mix, checked against
+recorded baselines.
+
+Drives /telemetry, /set_mode and /reboot from `--concurrency` client loops,
+either in-process (an httpx client over the ASGI app, with the app's
+lifespan running so the tick scheduler advances every chip as it does in
+production), against a uvicorn process started for the run, or against an
+already running server (--url). Each request carries one of `--sessions`
+session cookies, all created before the clock starts, and the request plan
+is drawn up front from `--seed`, so two runs send the same requests.
+
+Reports requests per second, p50/p95/p99 latency overall and per endpoint,
+how much the server's RSS grew per session created, and how far it drifted
+while the load ran.
+
+Baselines live in benchmarks/baselines/load.json, keyed by target, mix,
+concurrency and session count. --save-baseline records this run's numbers;
+--check compares against the recorded entry and exits 1 if throughput
+dropped, or latency or memory per session rose, by more than --tolerance,
+so a slower physics step or response path is caught before it ships.
+
+Usage:
+    python -m benchmarks.bench_load [--target asgi|uvicorn] [--url URL]
+        [--scenario mixed | --mix telemetry=90,set_mode=8,reboot=2]
+        [--concurrency 32] [--sessions 1000] [--requests 20000] [--seed 0]
+        [--json] [--check] [--save-baseline] [--tolerance 0.25]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Optional
+
+import httpx
+import numpy as np
+
+from benchmarks.bench_workers import free_port
+from simulator.fleet import SELECTABLE_MODES
+
+# Request mixes, as relative weights per endpoint
+SCENARIOS = {
+    "read": {"telemetry": 100},
+    "mixed": {"telemetry": 90, "set_mode": 8, "reboot": 2},
+    "control": {"telemetry": 50, "set_mode": 40, "reboot": 10},
+}
+ROUTES = {"telemetry": ("GET", "/telemetry"), "set_mode": ("POST", "/set_mode"), "reboot": ("POST", "/reboot")}
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "load.json")
+# Baseline metrics, and whether a higher value is a regression
+COMPARED = {"rps": False, "p50_ms": True, "p95_ms": True, "p99_ms": True, "rss_per_session_kib": True}
+WARMUP_REQUESTS = 500
+SERVER_START_TIMEOUT = 30
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        endpoint, _, weight = part.partition("=")
+        if endpoint.strip() not in ROUTES:
+            raise SystemExit(f"Unknown endpoint {endpoint!r} in --mix; expected one of {', '.join(ROUTES)}")
+        mix[endpoint.strip()] = float(weight or 1)
+    return mix
+
+
+def rss_bytes(pid: Optional[int]) -> Optional[int]:
+    """Resident set size of `pid` (Linux only; None where /proc isn't available)."""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def make_plan(mix: dict, n_sessions: int, requests: int, seed: int) -> list:
+    """(endpoint, cookie header, query params) for every request, in send order."""
+    rng = random.Random(seed)
+    endpoints = rng.choices(list(mix), list(mix.values()), k=requests)
+    plan = []
+    for endpoint in endpoints:
+        cookie = f"chip_session=load-{rng.randrange(n_sessions)}"
+        params = {"mode": rng.choice(SELECTABLE_MODES)} if endpoint == "set_mode" else None
+        plan.append((endpoint, cookie, params))
+    return plan
+
+
+async def drive(client: httpx.AsyncClient, plan: list, concurrency: int) -> tuple:
+    """Sends the plan from `concurrency` loops. Returns ({endpoint: [seconds]}, errors, elapsed)."""
+    latencies = {endpoint: [] for endpoint in ROUTES}
+    errors = Counter()
+    pending = iter(plan)
+
+    async def loop():
+        # Every loop pulls from the same iterator, so the plan is sent exactly once
+        for endpoint, cookie, params in pending:
+            method, path = ROUTES[endpoint]
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, params=params, headers={"Cookie": cookie})
+            except httpx.TransportError as exc:
+                errors[f"{endpoint}: {type(exc).__name__}"] += 1
+                continue
+            latencies[endpoint].append(time.perf_counter() - start)
+            # The PMIC refusing a performance mode on a drained battery is a normal answer
+            refused = endpoint == "set_mode" and response.status_code == 400 and b"Battery" in response.content
+            # A new cookie means the session was lost (e.g. evicted) and the server made another
+            if (response.status_code != 200 and not refused) or "set-cookie" in response.headers:
+                errors[f"{endpoint}: {response.status_code}"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(loop() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentiles_ms(seconds: list) -> dict:
+    if not seconds:
+        return {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+    p50, p95, p99 = np.percentile(seconds, (50, 95, 99)) * 1e3
+    return {"count": len(seconds), "p50_ms": round(p50, 3), "p95_ms": round(p95, 3), "p99_ms": round(p99, 3)}
+
+
+async def run_load(client: httpx.AsyncClient, pid: Optional[int], args, mix: dict) -> dict:
+    """Creates the sessions, warms up, then sends the timed plan."""
+    before = rss_bytes(pid)
+    for i in range(args.sessions):
+        (await client.get("/telemetry", headers={"Cookie": f"chip_session=load-{i}"})).raise_for_status()
+    created = rss_bytes(pid)
+
+    await drive(client, make_plan(mix, args.sessions, WARMUP_REQUESTS, args.seed + 1), args.concurrency)
+    latencies, errors, elapsed = await drive(client, make_plan(mix, args.sessions, args.requests, args.seed),
+                                             args.concurrency)
+    after = rss_bytes(pid)
+
+    result = {
+        "requests": args.requests,
+        "seconds": round(elapsed, 3),
+        "rps": round(args.requests / elapsed, 1),
+        **percentiles_ms([s for samples in latencies.values() for s in samples]),
+        "endpoints": {endpoint: percentiles_ms(samples) for endpoint, samples in latencies.items() if samples},
+        "errors": dict(errors),
+        "rss_per_session_kib": None,
+        "rss_drift_mib": None,
+    }
+    del result["count"]
+    if before is not None and created is not None and after is not None:
+        result["rss_per_session_kib"] = round((created - before) / args.sessions / 1024, 2)
+        result["rss_drift_mib"] = round((after - created) / 2**20, 2)
+    return result
+
+
+async def run_asgi(args, mix: dict) -> dict:
+    # Imported here so the environment set up in main() is in place first
+    from simulator.chip_api import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://sim", timeout=30) as client:
+            return await run_load(client, os.getpid(), args, mix)
+
+
+def start_server(port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "simulator.chip_api:app", "--port", str(port), "--log-level", "warning"],
+        env=dict(os.environ),
+    )
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/sessions/stats", timeout=1)
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("uvicorn did not start")
+
+
+async def run_http(args, mix: dict, url: str, pid: Optional[int]) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        return await run_load(client, pid, args, mix)
+
+
+def run_uvicorn(args, mix: dict) -> dict:
+    port = free_port()
+    server = start_server(port)
+    try:
+        return asyncio.run(run_http(args, mix, f"http://127.0.0.1:{port}", server.pid))
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def machine() -> dict:
+    return {"cpus": os.cpu_count(), "python": platform.python_version(), "platform": platform.platform()}
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions of `result` against `baseline`, as human-readable lines."""
+    regressions = []
+    for metric, higher_is_worse in COMPARED.items():
+        now, then = result.get(metric), baseline.get(metric)
+        if now is None or then is None or then == 0:
+            continue
+        change = (now - then) / then
+        if (change if higher_is_worse else -change) > tolerance:
+            regressions.append(f"{metric}: {then} -> {now} ({change:+.1%}, tolerance {tolerance:.0%})")
+    if result["errors"]:
+        regressions.append(f"errors: {result['errors']}")
+    return regressions
+
+
+def load_baselines(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, key: str, result: dict):
+    baselines = load_baselines(path)
+    baselines[key] = {
+        **{metric: result[metric] for metric in COMPARED},
+        "machine": machine(),
+        "recorded": datetime.date.today().isoformat(),
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(dict(sorted(baselines.items())), f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
+
+
+def print_report(key: str, result: dict):
+    print(f"{key}: {result['requests']} requests in {result['seconds']:.2f} s = {result['rps']:.0f} req/s")
+    print(f"{'endpoint':>10} | {'count':>7} | {'p50 ms':>8} | {'p95 ms':>8} | {'p99 ms':>8}")
+    print("-" * 53)
+    rows = list(result["endpoints"].items()) + [("all", {**result, "count": result["requests"]})]
+    for endpoint, stats in rows:
+        print(f"{endpoint:>10} | {stats['count']:>7} | {stats['p50_ms']:>8.2f} | {stats['p95_ms']:>8.2f} "
+              f"| {stats['p99_ms']:>8.2f}")
+    if result["rss_per_session_kib"] is not None:
+        print(f"RSS: {result['rss_per_session_kib']:.2f} KiB per session created, "
+              f"{result['rss_drift_mib']:+.2f} MiB while under load")
+    if result["errors"]:
+        print(f"errors: {result['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--url", help="drive an already running server instead (no RSS figures)")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--mix", help="custom weights, e.g. telemetry=90,set_mode=8,reboot=2")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--sessions", type=int, default=1_000)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    parser.add_argument("--baselines", default=BASELINES)
+    parser.add_argument("--check", action="store_true", help="exit 1 on a regression against the baseline")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix) if args.mix else SCENARIOS[args.scenario]
+    scenario = args.mix.replace(" ", "") if args.mix else args.scenario
+    target = "url" if args.url else args.target
+    key = f"{target}/{scenario}/c{args.concurrency}/s{args.sessions}"
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        # Keep the run's files out of the way, and every session alive for the whole run
+        os.environ.setdefault("SIM_REGISTER_FILE", os.path.join(state_dir, "registers.bin"))
+        os.environ.setdefault("SIM_RECORD_DIR", os.path.join(state_dir, "runs"))
+        os.environ["SIM_MAX_SESSIONS"] = str(max(args.sessions, int(os.environ.get("SIM_MAX_SESSIONS", 10_000))))
+        if args.url:
+            result = asyncio.run(run_http(args, mix, args.url, None))
+        elif args.target == "uvicorn":
+            result = run_uvicorn(args, mix)
+        else:
+            result = asyncio.run(run_asgi(args, mix))
+    result = {"key": key, "machine": machine(), **result}
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(key, result)
+
+    if args.save_baseline:
+        save_baseline(args.baselines, key, result)
+        print(f"baseline saved to {args.baselines}", file=sys.stderr)
+    elif args.check:
+        baseline = load_baselines(args.baselines).get(key)
+        if baseline is None:
+            raise SystemExit(f"No baseline for {key} in {args.baselines}; record one with --save-baseline")
+        if baseline["machine"] != result["machine"]:
+            print(f"warning: baseline recorded on {baseline['machine']}", file=sys.stderr)
+        regressions = compare(result, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against the {baseline['recorded']} baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
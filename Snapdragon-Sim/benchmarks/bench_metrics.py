@@ -0,0 +1,93 @@
+"""
+Cost of the metrics instrumentation on the /telemetry path.
+
+Drives /telemetry in-process (ASGI calls straight into the app, no network
+or test client in the way, so the instrumentation isn't hidden behind
+transport costs) the way it runs in production: the tick scheduler keeps
+every frame cached and requests read them. Batches alternate between the
+instrumented route handler and the same handler without instrumentation,
+which is everything metrics add to this path (physics and scheduler timers
+fire once per tick, not per request); the fastest batches of each are compared.
+
+Usage:
+    python -m benchmarks.bench_metrics [--batches 40] [--batch-size 2000]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi.routing import APIRoute, request_response
+
+from simulator import metrics
+from simulator.chip_api import app, tick_scheduler, user_sessions
+
+SESSIONS = 64
+
+
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message):
+    if message["type"] == "http.response.start":
+        assert message["status"] == 200
+
+
+def scope(cookie: bytes) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/telemetry", "raw_path": b"/telemetry", "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"sim"), (b"cookie", cookie)],
+        "client": ("127.0.0.1", 50000), "server": ("sim", 80),
+    }
+
+
+async def hammer(cookies: list, requests: int) -> float:
+    """Seconds per request."""
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(scope(cookies[i % len(cookies)]), receive, send)
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batches", type=int, default=40)
+    parser.add_argument("--batch-size", type=int, default=2_000)
+    args = parser.parse_args()
+    if not metrics.ENABLED:
+        raise SystemExit("Metrics are disabled (SIM_METRICS=0); nothing to compare")
+
+    cookies = []
+    for i in range(SESSIONS):
+        user_sessions.get_or_create(f"bench-{i}")
+        cookies.append(f"chip_session=bench-{i}".encode())
+    # Serve cached frames, as while the scheduler loop is running
+    tick_scheduler.tick()
+    tick_scheduler.running = True
+
+    route = next(r for r in app.routes if getattr(r, "path", None) == "/telemetry" and isinstance(r, APIRoute))
+    handlers = {"on": route.app, "off": request_response(APIRoute.get_route_handler(route))}
+
+    timings = {name: [] for name in handlers}
+    asyncio.run(hammer(cookies, args.batch_size))  # warm-up
+    for _ in range(args.batches):
+        for name, handler in handlers.items():
+            route.app = handler
+            timings[name].append(asyncio.run(hammer(cookies, args.batch_size)))
+    route.app = handlers["on"]
+
+    # The quietest quarter of each side's batches, to keep scheduler noise out
+    fastest = {name: statistics.mean(sorted(t)[:max(1, len(t) // 4)]) * 1e6 for name, t in timings.items()}
+    off, on = fastest["off"], fastest["on"]
+    print(f"/telemetry (cached frames), {args.batches} x {args.batch_size} requests per side")
+    print(f"{'metrics':>8} | {'µs/request':>11}")
+    print("-" * 22)
+    print(f"{'off':>8} | {off:>11.1f}")
+    print(f"{'on':>8} | {on:>11.1f}")
+    print(f"overhead: {(on - off) / off:+.1%} ({on - off:.2f} µs/request)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Session checkpoint cost at scale: save time, event-loop stall and restore time.
+
+Creates N sessions in an in-memory store, then reports:
+
+- a blocking save (what shutdown pays)
+- a background checkpoint: its total time, and the longest the event loop
+  went without running while it was written (measured by a heartbeat task)
+- restoring the snapshot into a fresh fleet, and the first scheduler tick
+  afterwards (which faults the mapped pages in)
+
+Usage:
+    python -m benchmarks.bench_snapshot [--sessions 100000] [--path /tmp/bench.snap]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import tempfile
+import time
+
+from simulator.chip_api import SnapdragonSimulator, render_frame
+from simulator.fleet import Fleet
+from simulator.scheduler import TickScheduler
+from simulator.session_store import InMemorySessionStore
+from simulator import snapshot
+
+
+def make_store(n: int, capacity: int):
+    fleet = Fleet(capacity=capacity, seed=0)
+    store = InMemorySessionStore(lambda session_id: SnapdragonSimulator(session_id, fleet), ttl=None, max_sessions=n)
+    return fleet, store
+
+
+async def checkpoint_with_heartbeat(store, fleet, path):
+    """Runs a checkpoint while a 1 ms heartbeat records the longest gap between its wake-ups."""
+    longest = 0.0
+    done = False
+
+    async def heartbeat():
+        nonlocal longest
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            longest = max(longest, now - last)
+            last = now
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.01)
+    info = await snapshot.checkpoint(store, fleet, path)
+    done = True
+    await beat
+    return info, longest
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--path", default=os.path.join(tempfile.gettempdir(), "bench_snapshot.snap"))
+    args = parser.parse_args()
+    n = args.sessions
+
+    fleet, store = make_store(n, n)
+    for i in range(n):
+        store.get_or_create(f"session-{i:06d}")
+    fleet.step()
+    print(f"{n} sessions, {fleet.slot_nbytes()} bytes of fleet state each")
+
+    info = snapshot.save_snapshot(store, fleet, args.path)
+    print(f"blocking save:                 {info['seconds'] * 1e3:>9.1f} ms ({info['bytes'] / 2**20:.0f} MiB)")
+
+    start = time.perf_counter()
+    slots = [chip.slot for _, chip in store.items()]
+    for name, _, _ in fleet.fields:
+        getattr(fleet, name)[slots]
+    print(f"gathering every row in-loop:   {(time.perf_counter() - start) * 1e3:>9.1f} ms (stall without fork)")
+
+    info, stall = asyncio.run(checkpoint_with_heartbeat(store, fleet, args.path))
+    print(f"background checkpoint:         {info['seconds'] * 1e3:>9.1f} ms")
+    print(f"  longest event-loop stall:    {stall * 1e3:>9.1f} ms")
+
+    del fleet, store, slots
+    gc.collect()
+    restored_fleet, restored = make_store(n, 1)
+    start = time.perf_counter()
+    snapshot.restore_snapshot(restored, restored_fleet, args.path,
+                              lambda session_id, slot: SnapdragonSimulator(session_id, restored_fleet, slot=slot,
+                                                                           owns_slot=True))
+    print(f"restore:                       {(time.perf_counter() - start) * 1e3:>9.1f} ms ({len(restored)} sessions)")
+
+    scheduler = TickScheduler(restored, render_frame)
+    start = time.perf_counter()
+    scheduler.tick()
+    print(f"first scheduler tick after:    {(time.perf_counter() - start) * 1e3:>9.1f} ms")
+    os.remove(args.path)
+
+
+if __name__ == "__main__":
+    main()
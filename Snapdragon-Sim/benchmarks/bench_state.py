@@ -0,0 +1,99 @@
+"""
+Per-session memory and scheduler tick time of the chip state model at scale.
+
+Creates N sessions in an in-memory store backed by one pre-sized fleet, then
+reports the Python-object bytes each session costs (traced with tracemalloc,
+so the fleet's NumPy columns are counted separately) and the wall time of a
+scheduler tick in which every chip advances and is re-serialized.
+
+For comparison it also builds N sessions of the original state model, a
+plain object per chip holding a nested dict with a dict per core, and
+reports the bytes each of those cost: the before/after of the compact model.
+
+Usage:
+    python -m benchmarks.bench_state [--sessions 100000] [--ticks 5]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+
+from simulator.chip_api import SnapdragonSimulator, render_frame
+from simulator.fleet import Fleet
+from simulator.scheduler import TickScheduler
+from simulator.session_store import InMemorySessionStore
+
+
+class DictStateChip:
+    """The original per-session model: chip state as a nested dict, one dict per core."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.state = {
+            "battery_level": 100.0,
+            "global_temp": 40.0,
+            "power_mode": "Balance",
+            "is_throttling": False,
+            "cores": [
+                {"id": i, "type": "Prime", "speed": 3.53, "temp": 40.0} if i < 2
+                else {"id": i, "type": "Performance", "speed": 2.80, "temp": 40.0}
+                for i in range(8)
+            ],
+        }
+
+
+def traced_bytes_per_session(create, session_ids) -> float:
+    """Python heap bytes per session that `create(session_id)` leaves behind."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for session_id in session_ids:
+        create(session_id)
+    gc.collect()
+    per_session = (tracemalloc.get_traced_memory()[0] - before) / len(session_ids)
+    tracemalloc.stop()
+    return per_session
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--ticks", type=int, default=5)
+    args = parser.parse_args()
+    n = args.sessions
+
+    now = [0.0]
+    fleet = Fleet(capacity=n, seed=0, wall=lambda: now[0])
+    store = InMemorySessionStore(lambda session_id: SnapdragonSimulator(session_id, fleet),
+                                 ttl=None, max_sessions=n)
+    session_ids = [f"session-{i:06d}" for i in range(n)]
+
+    legacy = {}
+    dict_model = traced_bytes_per_session(lambda session_id: legacy.setdefault(session_id, DictStateChip(session_id)),
+                                          session_ids)
+    del legacy
+    handles = traced_bytes_per_session(store.get_or_create, session_ids)
+
+    scheduler = TickScheduler(store, render_frame)
+    scheduler.tick()  # builds every frame once
+    frames = sum(len(chip.frame.body) for _, chip in store.items()) / n
+
+    timings = []
+    for _ in range(args.ticks):
+        now[0] += 1.0
+        start = time.perf_counter()
+        scheduler.tick()
+        timings.append(time.perf_counter() - start)
+
+    print(f"{n} sessions")
+    print(f"python bytes/session (handle + store entry): {handles:>8.0f}")
+    print(f"cached frame bytes/session:                  {frames:>8.0f}")
+    print(f"fleet bytes/session (NumPy slot):            {fleet.slot_nbytes():>8}")
+    print(f"state bytes/session, dict model -> compact:  {dict_model:>8.0f} -> "
+          f"{handles + fleet.slot_nbytes():.0f} (handle + store entry + slot)")
+    print(f"scheduler tick, all chips changed:           {min(timings) * 1e3:>8.1f} ms "
+          f"({min(timings) / n * 1e6:.2f} µs/session)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Scenario sweep throughput and scaling across worker processes.
+
+Usage:
+    python -m benchmarks.bench_sweep
+"""
+import os
+import time
+
+from simulator.sweep import load_profiles, run_sweep
+
+SPEC = {
+    "grid": {
+        "mode": ["High Performance", "Balance"],
+        "battery": {"start": 1, "stop": 100, "step": 1},
+        "temp": [35, 45, 55, 65, 75],
+    },
+    "duration": 1_800,
+}
+WORKERS = (1, 2, 4, 8)
+
+
+def main():
+    profiles = load_profiles(SPEC)
+    print(f"{len(profiles)} scenarios x {SPEC['duration']} simulated seconds, {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} | {'seconds':>8} | {'scenarios/s':>12} | {'scaling':>8}")
+    print("-" * 46)
+    baseline = reference = None
+    for workers in WORKERS:
+        start = time.perf_counter()
+        results = run_sweep(profiles, workers=workers, batch_size=128)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        # Every worker count must produce the same results
+        assert reference is None or results == reference
+        reference = results
+        print(f"{workers:>8} | {elapsed:>8.2f} | {len(profiles) / elapsed:>12.0f} | {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
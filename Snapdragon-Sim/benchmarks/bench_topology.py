@@ -0,0 +1,50 @@
+"""
+Cost of a fleet tick and an hour's jump-ahead for every built-in chip profile.
+
+A tick must stay far below the 1 s of simulated time it covers for the
+fleet to run in real time, even when each chip has a 128-node RC network.
+
+Usage:
+    python -m benchmarks.bench_topology
+"""
+import time
+
+import numpy as np
+
+from simulator.fleet import Fleet, MODE_CODES
+from simulator.profiles import PROFILES
+
+N_SESSIONS = 1_000
+TICKS = 20
+HORIZON = 3_600
+
+
+def make_fleet(profile):
+    fleet = Fleet(capacity=N_SESSIONS, seed=0, profile=profile)
+    slots = np.array([fleet.allocate() for _ in range(N_SESSIONS)])
+    fleet.power_mode[slots[::2]] = MODE_CODES["High Performance"]
+    return fleet, slots
+
+
+def main():
+    print(f"{N_SESSIONS} sessions")
+    print(f"{'profile':>22} | {'cores':>5} | {'RC':>3} | {'ms / tick':>10} | {'advance 1h ms':>14}")
+    print("-" * 68)
+    for name, profile in PROFILES.items():
+        fleet, slots = make_fleet(profile)
+        start = time.perf_counter()
+        for _ in range(TICKS):
+            fleet.step(slots)
+        per_tick = (time.perf_counter() - start) / TICKS
+
+        fleet, slots = make_fleet(profile)
+        start = time.perf_counter()
+        fleet.advance(slots, HORIZON)
+        jumping = time.perf_counter() - start
+
+        rc = "yes" if profile.network is not None else "no"
+        print(f"{name:>22} | {profile.n_cores:>5} | {rc:>3} | {per_tick * 1e3:>10.2f} | {jumping * 1e3:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
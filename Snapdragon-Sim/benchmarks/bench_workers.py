@@ -0,0 +1,130 @@
+"""
+/telemetry throughput with 1, 2, 4 and 8 uvicorn workers on the shared backend.
+
+Each run starts `uvicorn simulator.chip_api:app --workers N` with
+SIM_SESSION_BACKEND=shared, registers a pool of sessions, then hammers
+/telemetry from several load-generator processes (so the client isn't the
+bottleneck) and reports requests per second. Every request carries a
+session cookie created by whichever worker answered first, so it also
+checks that any worker can serve any session.
+
+Usage:
+    python -m benchmarks.bench_workers [--seconds 5] [--sessions 256]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+WORKER_COUNTS = (1, 2, 4, 8)
+CONCURRENCY = 32
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, port: int, state_dir: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        SIM_SESSION_BACKEND="shared",
+        SIM_SHARED_STATE=os.path.join(state_dir, f"fleet-{workers}.bin"),
+        SIM_REGISTER_FILE=os.path.join(state_dir, f"registers-{workers}.bin"),
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "simulator.chip_api:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/sessions/stats", timeout=1)
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"uvicorn with {workers} workers did not start")
+
+
+async def _hammer(base_url: str, cookies: list, seconds: float) -> tuple:
+    """Runs CONCURRENCY request loops for `seconds`. Returns (ok, errors)."""
+    ok = errors = 0
+    deadline = time.monotonic() + seconds
+
+    async def loop(client, i):
+        nonlocal ok, errors
+        while time.monotonic() < deadline:
+            cookie = cookies[i % len(cookies)]
+            i += CONCURRENCY
+            response = await client.get("/telemetry", headers={"Cookie": f"chip_session={cookie}"})
+            # Every session was created up front, so no response may hand out a new cookie
+            if response.status_code == 200 and "set-cookie" not in response.headers:
+                ok += 1
+            else:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=CONCURRENCY)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        await asyncio.gather(*(loop(client, i) for i in range(CONCURRENCY)))
+    return ok, errors
+
+
+def load_generator(base_url: str, cookies: list, seconds: float, results):
+    results.put(asyncio.run(_hammer(base_url, cookies, seconds)))
+
+
+def measure(workers: int, seconds: float, n_sessions: int, clients: int, state_dir: str) -> tuple:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(workers, port, state_dir)
+    try:
+        cookies = [httpx.get(f"{base_url}/telemetry").cookies["chip_session"] for _ in range(n_sessions)]
+
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        procs = [ctx.Process(target=load_generator, args=(base_url, cookies, seconds, results)) for _ in range(clients)]
+        for p in procs:
+            p.start()
+        totals = [results.get() for _ in procs]
+        for p in procs:
+            p.join()
+        ok = sum(t[0] for t in totals)
+        errors = sum(t[1] for t in totals)
+        return ok / seconds, errors
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--sessions", type=int, default=256)
+    parser.add_argument("--clients", type=int, default=max(2, (os.cpu_count() or 2) // 2),
+                        help="load-generator processes")
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions, {args.clients} client processes x {CONCURRENCY} connections, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'workers':>8} | {'req/s':>10} | {'errors':>7} | {'scaling':>8}")
+    print("-" * 44)
+    baseline = None
+    with tempfile.TemporaryDirectory() as state_dir:
+        for workers in WORKER_COUNTS:
+            rate, errors = measure(workers, args.seconds, args.sessions, args.clients, state_dir)
+            baseline = baseline or rate
+            print(f"{workers:>8} | {rate:>10.0f} | {errors:>7} | {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
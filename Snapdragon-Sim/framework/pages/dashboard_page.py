@@ -1,9 +1,90 @@
+import os
+import time
+from typing import Callable, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode
+
 from playwright.sync_api import Page
 
+
+class CoreCard(NamedTuple):
+    """One core card as displayed."""
+    id: int
+    type: str  # "Prime", "Performance", ...
+    speed: float  # GHz
+    temp: float  # °C
+    prime: bool  # styled as a Prime core
+
+
+class DashboardSnapshot(NamedTuple):
+    """Every dashboard field, read in one go from the same rendered frame."""
+    mode: str  # "High Performance", "Balance", ...
+    global_temp: float
+    thermal_status: str  # "OPTIMAL" or "THROTTLING"
+    throttling_style: bool  # the red blinking class is applied
+    battery: float
+    cores: Tuple[CoreCard, ...]
+
+    @property
+    def prime_core_speed(self) -> float:
+        return self.cores[0].speed
+
+    @classmethod
+    def from_dom(cls, raw: dict) -> "DashboardSnapshot":
+        """Parses the texts collected by _READ_DASHBOARD ("Mode: Balance", "45.2°C", "3.53 GHz", ...)."""
+        cores = []
+        for card in raw["cores"]:
+            # "Prime Core 0"
+            core_type, _, core_id = card["label"].rpartition(" Core ")
+            cores.append(CoreCard(int(core_id), core_type, float(card["speed"].split(" ")[0]),
+                                  float(card["temp"].replace("°C", "")), card["prime"]))
+        return cls(
+            mode=raw["mode"].replace("Mode: ", "", 1),
+            global_temp=float(raw["temp"].replace("°C", "")),
+            thermal_status=raw["status"],
+            throttling_style="throttling" in raw["statusClass"].split(),
+            battery=float(raw["battery"]),
+            cores=tuple(cores),
+        )
+
+
+# Reads every field synchronously inside one JS task. The page renders a
+# frame in one synchronous call too, so a read can never straddle two frames.
+_READ_DASHBOARD = """() => {
+    const text = (id) => document.getElementById(id).innerText;
+    return {
+        mode: text('mode-text'),
+        temp: text('global-temp'),
+        status: text('status-text'),
+        statusClass: document.getElementById('status-text').className,
+        battery: text('bat-val'),
+        cores: Array.from(document.querySelectorAll('.core-card'), (card) => ({
+            label: card.querySelector('small').innerText,
+            speed: card.querySelector('.stat').innerText,
+            temp: card.querySelector('small:last-of-type').innerText,
+            prime: card.classList.contains('prime'),
+        })),
+    };
+}"""
+
+# Resolves with a fresh read as soon as the page shows something other than
+# `seen`: right away if a frame landed since, else once the next frame
+# patches anything on the page or after `timeoutMs`
+_READ_NEXT_FRAME = """({ seen, timeoutMs }) => new Promise((resolve) => {
+    const read = %s;
+    const now = read();
+    if (JSON.stringify(now) !== JSON.stringify(seen)) return resolve(now);
+    const done = () => { observer.disconnect(); clearTimeout(timer); resolve(read()); };
+    const observer = new MutationObserver(done);
+    observer.observe(document.body, { childList: true, characterData: true, attributes: true, subtree: true });
+    const timer = setTimeout(done, timeoutMs);
+})""" % _READ_DASHBOARD
+
+
 class SnapdragonDashboard:
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, base_url: Optional[str] = None):
         self.page = page
-        self.url = "http://127.0.0.1:8000/"
+        # The test rig passes its per-worker server; SIM_BASE_URL points at any other
+        self.url = (base_url or os.environ.get("SIM_BASE_URL") or "http://127.0.0.1:8000").rstrip("/") + "/"
         
         # This locator finds all 8 core cards
         self.core_cards = page.locator(".core-card")
@@ -65,6 +146,50 @@ class SnapdragonDashboard:
         bat_text = self.page.locator("#bat-val").inner_text()
         return float(bat_text)
 
+    def fast_forward(self, seconds: float):
+        """Jumps this browser's chip ahead by N simulated seconds via /advance."""
+        # page.request shares the browser's cookies, so this hits the same chip session
+        response = self.page.request.post(f"{self.url}advance?seconds={seconds}")
+        assert response.ok, f"Fast-forward failed: {response.text()}"
+
+    def wait_for(self, *conditions: str, timeout: float = 60) -> dict:
+        """
+        Blocks until this browser's chip meets every condition (e.g.
+        "battery <= 20") via one /wait_for long-poll, instead of polling the UI.
+        Returns the result; result["frame"] is the telemetry of the crossing tick.
+        """
+        query = urlencode([("condition", condition) for condition in conditions] + [("timeout", timeout)])
+        response = self.page.request.get(f"{self.url}wait_for?{query}", timeout=(timeout + 10) * 1000)
+        assert response.ok, f"Wait failed: {response.text()}"
+        return response.json()
+
     def get_current_mode_text(self) -> str:
         """Reads the current power mode text (e.g., 'Mode: Balance')."""
-        return self.page.locator("#mode-text").inner_text()
\ No newline at end of file
+        return self.page.locator("#mode-text").inner_text()
+
+    def snapshot(self) -> DashboardSnapshot:
+        """
+        Reads every field and core card in one browser round trip. Unlike
+        calling the get_* methods one after another, all values come from
+        the same telemetry frame.
+        """
+        return DashboardSnapshot.from_dom(self.page.evaluate(_READ_DASHBOARD))
+
+    def wait_for_snapshot(self, predicate: Callable[[DashboardSnapshot], bool], timeout: float = 30,
+                          message: Optional[str] = None) -> DashboardSnapshot:
+        """
+        Blocks until `predicate(snapshot)` holds and returns that snapshot.
+        Each check costs one round trip, and between checks the page itself
+        waits for the next rendered frame, so nothing polls faster than the
+        telemetry arrives. Raises AssertionError after `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        raw = self.page.evaluate(_READ_DASHBOARD)
+        snap = DashboardSnapshot.from_dom(raw)
+        while not predicate(snap):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise AssertionError(message or f"Dashboard never matched within {timeout}s; last: {snap}")
+            raw = self.page.evaluate(_READ_NEXT_FRAME, {"seen": raw, "timeoutMs": remaining * 1000})
+            snap = DashboardSnapshot.from_dom(raw)
+        return snap
\ No newline at end of file
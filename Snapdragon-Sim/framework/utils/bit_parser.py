@@ -1,3 +1,20 @@
+from typing import NamedTuple
+
+import numpy as np
+
+# Register layout (see BitParser)
+OVERHEAT_BIT = 0x01
+LOW_VOLTAGE_BIT = 0x02
+CORE_ID_SHIFT = 8
+
+
+class StatusColumns(NamedTuple):
+    """Columnar decode of many status registers: one array per field."""
+    overheat_fault: np.ndarray   # bool
+    voltage_fault: np.ndarray    # bool
+    reporting_core: np.ndarray   # uint8
+
+
 class BitParser:
     """
     Simulates reading a 16-bit status register from a Snapdragon chip.
@@ -25,4 +42,39 @@ class BitParser:
             "overheat_fault": is_overheat,
             "voltage_fault": is_low_voltage,
             "reporting_core": core_id
-        }
\ No newline at end of file
+        }
+
+    @staticmethod
+    def as_registers(data, byteorder: str = "little") -> np.ndarray:
+        """
+        Views raw register data as a uint16 array without copying it.
+
+        Accepts bytes, bytearray, memoryview (e.g. an mmap'd dump) or a NumPy
+        uint16 array. Raw bytes are read in the given byte order.
+        """
+        if isinstance(data, np.ndarray):
+            if data.dtype.kind != "u" or data.dtype.itemsize != 2:
+                raise ValueError(f"Expected a uint16 array, got {data.dtype}")
+            return data
+        if byteorder not in ("little", "big"):
+            raise ValueError("byteorder must be 'little' or 'big'")
+
+        raw = memoryview(data).cast("B")
+        if raw.nbytes % 2:
+            raise ValueError("Register data must be a whole number of 16-bit words")
+        return np.frombuffer(raw, dtype="<u2" if byteorder == "little" else ">u2")
+
+    @staticmethod
+    def parse_status_batch(data, byteorder: str = "little") -> StatusColumns:
+        """
+        Decodes many 16-bit status registers at once into columns.
+
+        No per-record dicts are built: each field comes back as one NumPy
+        array, index-aligned with the input registers.
+        """
+        regs = BitParser.as_registers(data, byteorder)
+        return StatusColumns(
+            overheat_fault=(regs & OVERHEAT_BIT).astype(bool),
+            voltage_fault=(regs & LOW_VOLTAGE_BIT).astype(bool),
+            reporting_core=(regs >> CORE_ID_SHIFT).astype(np.uint8),
+        )
@@ -1,293 +1,940 @@
-from fastapi import FastAPI, HTTPException, Request, Response, Cookie
-from fastapi.responses import HTMLResponse
-from typing import Optional
-import random
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response, Cookie, WebSocket, WebSocketDisconnect
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
+from typing import List, Optional
+from collections.abc import MutableMapping
+from contextlib import asynccontextmanager
+import asyncio
+import math
+import os
+import secrets
+import time
 import uuid
 
-app = FastAPI(title="Snapdragon 8 Elite (Gen 5) HIL Simulator")
+import numpy as np
+
+from pydantic import BaseModel
+
+from simulator import delta, metrics, profiler, snapshot
+from simulator.fleet import Fleet, MODES, MODE_CODES, SAVER_BATTERY, SELECTABLE_MODES, default_fleet
+from simulator.dashboard import dashboard_page
+from simulator.export import iter_history_export
+from simulator.history import NUMERIC_FIELDS, downsample, read_history
+from simulator.session_store import InMemorySessionStore
+from simulator.shared_store import SharedFleet, SharedMemorySessionStore, default_shared_state_path
+from simulator.replay import RecordedRun, RunRecorder, default_record_dir
+from simulator.registers import HEADER_BYTES, RegisterFile, default_register_path
+from simulator.scheduler import TickScheduler
+from simulator.selectors import parse_selector, select
+from simulator.streaming import TelemetryHub
+from simulator.waits import ConditionWaits
+
+# Longest single fast-forward accepted by /advance (one simulated week)
+MAX_ADVANCE_SECONDS = 7 * 24 * 3600
+# Fastest clock accepted by /clock (one simulated day per wall second)
+MAX_TIME_SCALE = 24 * 3600
+# Most buckets /history will downsample into
+MAX_HISTORY_BUCKETS = 1000
+# Longest /wait_for long-poll (wall seconds)
+MAX_WAIT_SECONDS = 300
+# Longest /debug/profile window (wall seconds)
+MAX_PROFILE_SECONDS = 60
+
+# Shared secret for the /debug endpoints, sent as X-Admin-Token; unset disables them
+ADMIN_TOKEN = os.environ.get("SIM_ADMIN_TOKEN")
+
+# --- Status Register File ---
+# Every chip mirrors its 16-bit status register into a memory-mapped file (see REGISTER_FILE below)
+REGISTER_SLOTS = int(os.environ.get("SIM_REGISTER_SLOTS", 65_536))
+
+# --- Session Limits (overridable per deployment) ---
+SESSION_TTL = float(os.environ.get("SIM_SESSION_TTL", 1800))
+MAX_SESSIONS = int(os.environ.get("SIM_MAX_SESSIONS", 10_000))
+SWEEP_INTERVAL = float(os.environ.get("SIM_SWEEP_INTERVAL", 30))
+
+# Fixed rate of the server-side tick scheduler (seconds between ticks)
+TICK_INTERVAL = float(os.environ.get("SIM_TICK_INTERVAL", 1.0))
+# Recent frames each delta-polling chip keeps for /telemetry?since= (0 always sends keyframes)
+DELTA_WINDOW = int(os.environ.get("SIM_DELTA_WINDOW", 8))
+
+# Where /record/start writes run journals
+RECORD_DIR = default_record_dir()
+
+# --- Session Backend ---
+# "memory": sessions live in this process (single worker only)
+# "shared": chip state lives in a memory-mapped file every worker maps, so
+#           `uvicorn --workers N` can serve any session from any worker
+SESSION_BACKEND = os.environ.get("SIM_SESSION_BACKEND", "memory")
+if SESSION_BACKEND not in ("memory", "shared"):
+    raise ValueError(f"SIM_SESSION_BACKEND must be 'memory' or 'shared', not {SESSION_BACKEND!r}")
+
+# --- Checkpoints (memory backend) ---
+# Sessions are saved to SIM_SNAPSHOT_FILE every SIM_SNAPSHOT_INTERVAL seconds
+# (0: only on shutdown) and restored from it at startup; unset disables both
+SNAPSHOT_FILE = snapshot.default_snapshot_path()
+SNAPSHOT_INTERVAL = float(os.environ.get("SIM_SNAPSHOT_INTERVAL", 300))
+if SNAPSHOT_FILE and SESSION_BACKEND == "shared":
+    raise ValueError("SIM_SNAPSHOT_FILE needs the memory backend; the shared backend's state file already persists")
+
+# Shared mode has a fixed capacity of MAX_SESSIONS slots, all in one file
+if SESSION_BACKEND == "shared":
+    session_fleet = SharedFleet(default_shared_state_path(), capacity=MAX_SESSIONS, profile=default_fleet.profile)
+else:
+    session_fleet = default_fleet
+
+REGISTER_FILE = default_register_path(shared=SESSION_BACKEND == "shared")
+if not REGISTER_FILE:
+    status_registers = None
+elif SESSION_BACKEND == "shared":
+    # Every worker maps the same file; only the first one creates it
+    status_registers = RegisterFile.open_or_create(REGISTER_FILE, max(REGISTER_SLOTS, MAX_SESSIONS))
+else:
+    # The per-process default file is removed again when this process exits
+    status_registers = RegisterFile.create(REGISTER_FILE, REGISTER_SLOTS,
+                                           temporary="SIM_REGISTER_FILE" not in os.environ)
+if status_registers is not None:
+    session_fleet.attach_registers(status_registers)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if SNAPSHOT_FILE and os.path.exists(SNAPSHOT_FILE):
+        snapshot.restore_snapshot(user_sessions, session_fleet, SNAPSHOT_FILE, adopt_session)
+    # Background sweeper evicts idle sessions so cookieless traffic can't leak memory
+    sweeper = asyncio.create_task(user_sessions.run_sweeper(SWEEP_INTERVAL))
+    # One tick loop advances every session, caches its frame and feeds the streams
+    ticker = asyncio.create_task(tick_scheduler.run())
+    checkpointer = None
+    if SNAPSHOT_FILE and SNAPSHOT_INTERVAL > 0:
+        checkpointer = asyncio.create_task(
+            snapshot.run_checkpoints(user_sessions, session_fleet, SNAPSHOT_FILE, SNAPSHOT_INTERVAL, snapshot_lock))
+    yield
+    if checkpointer is not None:
+        checkpointer.cancel()
+    ticker.cancel()
+    sweeper.cancel()
+    if SNAPSHOT_FILE:
+        # Nothing runs any more, so the final checkpoint can simply block
+        async with snapshot_lock:
+            snapshot.save_snapshot(user_sessions, session_fleet, SNAPSHOT_FILE)
+
+
+REQUEST_SECONDS = metrics.Histogram(
+    "sim_http_request_duration_seconds", "Time to produce a response, by route", ("route", "method"))
+RESPONSES = metrics.Counter("sim_http_responses_total", "HTTP responses by route and status",
+                            ("route", "method", "status"))
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    Times every request to the route and counts its responses by status.
+    Hooking the route handler (rather than adding an ASGI middleware layer
+    that wraps `send`) keeps this to one perf_counter pair per request.
+    Routes are labelled by their template ("/replay/{run}") so label
+    cardinality stays bounded.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        if not metrics.ENABLED:
+            return handler
+        method = ",".join(sorted(self.methods))
+        latency = REQUEST_SECONDS.labels(self.path, method)
+        responses = {}
+
+        def count(status: int):
+            child = responses.get(status)
+            if child is None:
+                child = responses[status] = RESPONSES.labels(self.path, method, status)
+            child.inc()
+
+        async def instrumented(request: Request) -> Response:
+            start = time.perf_counter()
+            try:
+                response = await handler(request)
+            except HTTPException as exc:
+                count(exc.status_code)
+                raise
+            except RequestValidationError:
+                count(422)
+                raise
+            except Exception:
+                count(500)
+                raise
+            finally:
+                latency.observe(time.perf_counter() - start)
+            count(response.status_code)
+            return response
+
+        return instrumented
+
+
+app = FastAPI(title="Snapdragon 8 Elite (Gen 5) HIL Simulator", lifespan=lifespan)
+app.router.route_class = InstrumentedRoute
+
+class ChipState(MutableMapping):
+    """
+    Dict-style view of one chip's slot in the fleet arrays.
+
+    Reads and writes of the scalar fields go straight to the fleet columns.
+    "cores" is rebuilt on every read, so edit per-core values through the
+    fleet's `core_speed` / `core_temp` arrays instead of the returned list.
+    """
+    KEYS = ("battery_level", "global_temp", "power_mode", "is_throttling", "cores")
+    __slots__ = ("fleet", "slot")
+
+    def __init__(self, fleet: Fleet, slot: int):
+        self.fleet = fleet
+        self.slot = slot
+
+    def __getitem__(self, key):
+        f, slot = self.fleet, self.slot
+        if key == "battery_level":
+            return float(f.battery[slot])
+        if key == "global_temp":
+            return float(f.global_temp[slot])
+        if key == "power_mode":
+            return MODES[f.power_mode[slot]]
+        if key == "is_throttling":
+            return bool(f.is_throttling[slot])
+        if key == "cores":
+            return f.core_list(slot)
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        f, slot = self.fleet, self.slot
+        if key == "battery_level":
+            f.battery[slot] = value
+        elif key == "global_temp":
+            f.global_temp[slot] = value
+        elif key == "power_mode":
+            f.power_mode[slot] = MODE_CODES[value]
+        elif key == "is_throttling":
+            f.is_throttling[slot] = value
+        else:
+            raise KeyError(key)
+        # State changed outside a tick, so any cached frame is now stale
+        f.revision[slot] += 1
+        f.journal(slot, "set", key=key, value=self[key])
+
+    def __delitem__(self, key):
+        raise TypeError("Chip state fields cannot be deleted")
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
 
-# --- Multi-Tenant Store ---
-# This dictionary maps session_id -> SnapdragonSimulator instance
-# This ensures every browser gets its own private "hardware" object
-user_sessions = {}
 
 class SnapdragonSimulator:
-    def __init__(self, session_id: str):
+    """
+    Per-session handle onto one slot of the shared fleet engine.
+
+    All physics runs in `Fleet.step`; this class only remembers which slot
+    belongs to the session and exposes it through the familiar `state` dict.
+    It holds no chip state itself, and its slots keep every session to a
+    handful of pointers.
+    """
+    __slots__ = ("session_id", "fleet", "slot", "_owns_slot", "frame")
+
+    def __init__(self, session_id: str, fleet: Optional[Fleet] = None, slot: Optional[int] = None,
+                 seed: Optional[int] = None, owns_slot: bool = False):
         self.session_id = session_id
-        # Every chip starts at a fresh factory state
-        self.state = {
-            "battery_level": 100.0,
-            "global_temp": 40.0,
-            "power_mode": "Balance",
-            "is_throttling": False,
-            "cores": [
-                {"id": i, "type": "Prime", "speed": 3.53, "temp": 40.0} if i < 2 
-                else {"id": i, "type": "Performance", "speed": 2.80, "temp": 40.0} 
-                for i in range(8)
-            ]
-        }
+        self.fleet = fleet if fleet is not None else default_fleet
+        if slot is None:
+            # Every chip starts at a fresh factory state; `seed` makes its jitter reproducible
+            self.slot = self.fleet.allocate(seed)
+            # Hand the slot back to the fleet once this handle is dropped or closed
+            self._owns_slot = True
+        else:
+            # Attach to an existing slot: one someone else owns (e.g. a shared-memory
+            # session store), or, with owns_slot, one restored from a snapshot
+            self.slot = slot
+            self._owns_slot = owns_slot
+        # Latest serialized telemetry frame, maintained by the tick scheduler
+        self.frame = None
+
+    @property
+    def state(self) -> ChipState:
+        return ChipState(self.fleet, self.slot)
+
+    @property
+    def ticks(self) -> int:
+        return int(self.fleet.ticks[self.slot])
+
+    @property
+    def version(self) -> tuple:
+        """Changes whenever the chip ticks or a command alters its state."""
+        return int(self.fleet.ticks[self.slot]), int(self.fleet.revision[self.slot])
 
     def update_physics(self):
-        s = self.state
-        
-        # 1. Logic for Power Modes
-        if s["battery_level"] <= 5: s["power_mode"] = "Ultra Saver"
-        elif s["battery_level"] <= 20: s["power_mode"] = "Battery Saver"
-
-        if s["power_mode"] == "High Performance":
-            prime_t, perf_t, drain, heat = 4.32, 3.53, 0.45, 2.2
-        elif s["power_mode"] == "Balance":
-            prime_t, perf_t, drain, heat = 3.53, 2.80, 0.15, 0.4
-        else: # Power Savers
-            prime_t, perf_t, drain, heat = 1.20, 0.80, 0.05, -1.5
-
-        # 2. Thermal Throttling Governor
-        if s["global_temp"] > 85: s["is_throttling"] = True
-        elif s["global_temp"] < 65: s["is_throttling"] = False
-
-        if s["is_throttling"]:
-            prime_t, perf_t, heat = 1.80, 1.40, -3.5
-
-        # 3. Apply changes with Silicon Jitter (Randomness)
-        s["battery_level"] = max(0, round(s["battery_level"] - drain, 2))
-        s["global_temp"] = max(35, round(s["global_temp"] + heat + random.uniform(-0.5, 0.5), 1))
-
-        for core in s["cores"]:
-            target = prime_t if core["type"] == "Prime" else perf_t
-            core["speed"] = round(target + random.uniform(-0.03, 0.03), 2)
-            core["temp"] = round(s["global_temp"] + random.uniform(-1.0, 1.0), 1)
-        
-        return s
+        """Runs exactly one physics tick, regardless of the virtual clock."""
+        self.fleet.step(self.slot)
+        return self.state
+
+    def sync(self):
+        """Catches the chip up to the current simulated time."""
+        self.fleet.sync(self.slot)
+        return self.state
+
+    def advance(self, seconds: float):
+        """Fast-forwards the chip by `seconds` of simulated time in one call."""
+        self.fleet.fast_forward(self.slot, seconds)
+        return self.state
+
+    def clock(self) -> dict:
+        f, slot = self.fleet, self.slot
+        return {
+            "sim_time": float(f.sim_time[slot]),
+            "ticks": int(f.ticks[slot]),
+            "time_scale": float(f.time_scale[slot]),
+        }
+
+    def history(self, start: Optional[float] = None, end: Optional[float] = None) -> dict:
+        """
+        Recorded samples between two simulated times, as NumPy columns. The
+        first call starts recording them (see Fleet.track_history).
+        """
+        self.fleet.track_history(self.slot)
+        return read_history(self.fleet, self.slot, start, end)
+
+    @property
+    def seed(self) -> int:
+        """Key of this chip's random stream; the same seed and commands give the same run."""
+        return int(self.fleet.rng_key[self.slot])
+
+    def reset(self, seed: Optional[int] = None):
+        """Restores this chip to factory state without giving up its slot, optionally reseeding it."""
+        with self.fleet.locked(self.slot):
+            if seed is not None:
+                self.fleet.rng_key[self.slot] = seed
+            self.fleet.reset(self.slot)
+
+    def start_recording(self, path: str, seed: Optional[int] = None) -> RunRecorder:
+        """
+        Reboots the chip (optionally reseeding it), then journals its commands
+        and frames to `path` until stop_recording(). Starting from factory
+        state is what lets the journal alone reproduce the run.
+        """
+        self.stop_recording()
+        self.reset(seed)
+        recorder = self.fleet.recorders[self.slot] = RunRecorder(path, self.session_id, self.seed)
+        return recorder
+
+    def stop_recording(self) -> Optional[RunRecorder]:
+        recorder = self.fleet.recorders.pop(self.slot, None)
+        if recorder is not None:
+            recorder.close()
+        return recorder
+
+    def close(self):
+        """Releases the fleet slot. The handle must not be used afterwards."""
+        if self._owns_slot:
+            self._owns_slot = False
+            self.fleet.release(self.slot)
+
+    def __del__(self):
+        # A weakref.finalize per session would cost more than the handle itself
+        self.close()
+
+
+# --- Multi-Tenant Store ---
+# Maps session_id -> SnapdragonSimulator instance, bounded by idle TTL and an LRU cap.
+# This ensures every browser gets its own private "hardware" object
+if SESSION_BACKEND == "shared":
+    user_sessions = SharedMemorySessionStore(
+        session_fleet, lambda session_id, slot: SnapdragonSimulator(session_id, session_fleet, slot=slot),
+        ttl=SESSION_TTL,
+    )
+else:
+    user_sessions = InMemorySessionStore(SnapdragonSimulator, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS)
+
+
+def adopt_session(session_id: str, slot: int) -> SnapdragonSimulator:
+    """Handle for a chip restored from a snapshot; it owns the slot like a freshly created one."""
+    return SnapdragonSimulator(session_id, session_fleet, slot=slot, owns_slot=True)
+
+
+def render_frame(chip_session: str, sim: SnapdragonSimulator) -> dict:
+    """Builds the public telemetry payload for one chip's current state."""
+    # Read straight from the fleet columns; this is the only place the dict is built
+    f, slot = sim.fleet, sim.slot
+    return {
+        "device_id": chip_session,
+        "chipset": f.profile.chipset,
+        "battery": float(f.battery[slot]),
+        "power_mode": MODES[f.power_mode[slot]],
+        "thermal_status": "THROTTLING" if f.is_throttling[slot] else "OPTIMAL",
+        "global_temp": float(f.global_temp[slot]),
+        "cores": f.core_list(slot)
+    }
+
+
+tick_scheduler = TickScheduler(user_sessions, render_frame, interval=TICK_INTERVAL, pack=delta.pack_frame,
+                               window=DELTA_WINDOW)
+
+
+def current_frame(chip_session: str) -> bytes:
+    sim = user_sessions.get_or_create(chip_session)
+    return tick_scheduler.frame_for(chip_session, sim, sync=not tick_scheduler.running).body
+
+
+telemetry_hub = TelemetryHub(current_frame)
+tick_scheduler.listeners.append(telemetry_hub.publish)
+condition_waits = ConditionWaits(render_frame)
+
+# --- Metrics ---
+# Live values are read from their owners at scrape time; see simulator.metrics
+SET_MODE_REJECTED = metrics.Counter(
+    "sim_set_mode_rejected_total", "Mode switches refused, by reason", ("reason",))
+_REJECTED_INVALID = SET_MODE_REJECTED.labels("invalid_mode")
+_REJECTED_BATTERY = SET_MODE_REJECTED.labels("battery_too_low")
+metrics.Gauge("sim_sessions_live", "Live chip sessions", function=lambda: len(user_sessions))
+metrics.Gauge("sim_sessions_throttling", "Live chips currently thermal throttling",
+              function=lambda: int(np.count_nonzero(session_fleet.is_throttling[session_fleet.active_slots()])))
+metrics.Counter("sim_sessions_evicted_total", "Sessions evicted, by reason", ("reason",),
+                function=lambda: {("ttl",): user_sessions.evicted_ttl, ("lru",): user_sessions.evicted_lru})
+metrics.Gauge("sim_stream_subscribers", "Open telemetry streams (WebSocket + SSE)",
+              function=telemetry_hub.subscriber_count)
+metrics.Gauge("sim_condition_waits_pending", "Requests parked in /wait_for", function=lambda: condition_waits.pending)
+DELTA_RESPONSES = metrics.Counter(
+    "sim_telemetry_delta_responses_total", "Responses to /telemetry?since=, by kind", ("kind",))
+_SENT_DELTA = DELTA_RESPONSES.labels("delta")
+_SENT_KEYFRAME = DELTA_RESPONSES.labels("keyframe")
+
+
+def encode_since(frame, since: int) -> bytes:
+    """A delta from frame `since` to `frame`, or a keyframe if `since` isn't in its history."""
+    # No history at all with SIM_DELTA_WINDOW=0
+    body = delta.encode_delta(frame.seq, frame.packed_at(since), frame.history[-1][1]) if frame.history else None
+    if body is not None:
+        _SENT_DELTA.inc()
+        return body
+    _SENT_KEYFRAME.inc()
+    return delta.encode_keyframe(frame.seq, frame.body)
+
 
 @app.get("/telemetry")
-async def get_telemetry(response: Response, chip_session: Optional[str] = Cookie(None)):
+async def get_telemetry(request: Request, chip_session: Optional[str] = Cookie(None)):
+    """
+    The chip's latest frame. With `?since=` (the `seq` of the last frame the
+    client holds, or 0 to start) the response is a delta against that frame,
+    or a keyframe if the server no longer has it; see simulator.delta.
+    """
+    # Read by hand: as a declared parameter its validation would slow every full-frame poll too
+    since = request.query_params.get("since")
+    if since is not None and not (since.isascii() and since.isdigit()):
+        raise HTTPException(status_code=400, detail="since must be a frame sequence number")
+
     # 1. IDENTIFY: If no cookie is present, this is a new browser/visit
-    if not chip_session:
+    new_session = not chip_session
+    if new_session:
         chip_session = str(uuid.uuid4())
-        # Set the cookie so the browser identifies itself in the next request
-        response.set_cookie(key="chip_session", value=chip_session)
     
     # 2. ASSIGN: Create or get the specific simulator for this cookie
-    if chip_session not in user_sessions:
-        user_sessions[chip_session] = SnapdragonSimulator(chip_session)
-    
-    sim = user_sessions[chip_session]
-    state = sim.update_physics()
-    
-    return {
-        "device_id": chip_session,
-        "chipset": "Snapdragon 8 Elite (Gen 5)",
-        "battery": state["battery_level"],
-        "power_mode": state["power_mode"],
-        "thermal_status": "THROTTLING" if state["is_throttling"] else "OPTIMAL",
-        "global_temp": state["global_temp"],
-        "cores": state["cores"]
-    }
+    sim = user_sessions.get_or_create(chip_session)
+
+    # 3. READ: While the scheduler runs its cached frame is at most one tick old,
+    # otherwise catch the chip up on demand (e.g. in-process test clients)
+    if since is not None:
+        # Delta bodies depend on `since`, so there's no ETag to revalidate against
+        frame = tick_scheduler.frame_with_history(chip_session, sim, sync=not tick_scheduler.running)
+        response = Response(encode_since(frame, int(since)), media_type="application/json",
+                            headers={"Cache-Control": "no-cache"})
+    else:
+        frame = tick_scheduler.frame_for(chip_session, sim, sync=not tick_scheduler.running)
+        headers = {"ETag": frame.etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == frame.etag:
+            response = Response(status_code=304, headers=headers)
+        else:
+            response = Response(frame.body, media_type="application/json", headers=headers)
+
+    if new_session:
+        # Set the cookie so the browser identifies itself in the next request
+        response.set_cookie(key="chip_session", value=chip_session)
+    return response
+
+@app.websocket("/telemetry/stream")
+async def stream_telemetry_ws(websocket: WebSocket):
+    """Pushes a telemetry frame every server tick over a WebSocket."""
+    chip_session = websocket.cookies.get("chip_session")
+    if not chip_session:
+        # Browsers pick up their cookie from /telemetry before opening the stream
+        await websocket.close(code=4400, reason="No active session found")
+        return
+
+    await websocket.accept()
+    queue = telemetry_hub.subscribe(chip_session)
+    try:
+        while True:
+            frame = await queue.get()
+            # Streaming counts as activity for the idle TTL
+            user_sessions.get(chip_session)
+            await websocket.send_text(frame.decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        telemetry_hub.unsubscribe(chip_session, queue)
+
+@app.get("/telemetry/stream")
+async def stream_telemetry_sse(chip_session: Optional[str] = Cookie(None), max_frames: Optional[int] = None):
+    """Server-Sent Events fallback for clients without WebSocket support."""
+    if not chip_session:
+        raise HTTPException(status_code=400, detail="No active session found")
+
+    async def events():
+        queue = telemetry_hub.subscribe(chip_session)
+        try:
+            sent = 0
+            # max_frames lets scripts take a bounded sample; browsers stream forever
+            while max_frames is None or sent < max_frames:
+                frame = await queue.get()
+                user_sessions.get(chip_session)
+                yield b"data: " + frame + b"\n\n"
+                sent += 1
+        finally:
+            telemetry_hub.unsubscribe(chip_session, queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+def get_active_session(chip_session: Optional[str]) -> SnapdragonSimulator:
+    sim = user_sessions.get(chip_session) if chip_session else None
+    if sim is None:
+        raise HTTPException(status_code=400, detail="No active session found")
+    return sim
 
 @app.post("/set_mode")
 async def set_mode(mode: str, chip_session: Optional[str] = Cookie(None)):
-    if not chip_session or chip_session not in user_sessions:
-        raise HTTPException(status_code=400, detail="No active session found")
-        
-    sim = user_sessions[chip_session]
-    if mode not in ["High Performance", "Balance"]:
-        raise HTTPException(status_code=400, detail="Invalid mode")
-    
-    if sim.state["battery_level"] <= 20:
-        raise HTTPException(status_code=400, detail="Battery too low for performance modes")
-    
-    sim.state["power_mode"] = mode
+    sim = get_active_session(chip_session)
+    # Check-and-set under the slot lock so another worker can't tick in between
+    with sim.fleet.locked(sim.slot):
+        # Ticks that fell due before the switch still run in the old mode
+        sim.sync()
+        if mode not in SELECTABLE_MODES:
+            _REJECTED_INVALID.inc()
+            raise HTTPException(status_code=400, detail="Invalid mode")
+
+        if sim.state["battery_level"] <= SAVER_BATTERY:
+            _REJECTED_BATTERY.inc()
+            raise HTTPException(status_code=400, detail="Battery too low for performance modes")
+
+        sim.state["power_mode"] = mode
     return {"status": f"Successfully switched to {mode}"}
 
+@app.post("/advance")
+async def advance(seconds: float, chip_session: Optional[str] = Cookie(None)):
+    """Fast-forwards this chip's virtual clock by N simulated seconds in one call."""
+    sim = get_active_session(chip_session)
+    if not 0 <= seconds <= MAX_ADVANCE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be between 0 and {MAX_ADVANCE_SECONDS}")
+
+    sim.advance(seconds)
+    return {"status": f"Advanced {seconds:g}s", **sim.clock()}
+
+@app.get("/wait_for")
+async def wait_for(condition: List[str] = Query(...), timeout: float = 30, chip_session: Optional[str] = Cookie(None)):
+    """
+    Long-polls until this chip's state satisfies every `condition` (selector
+    syntax, e.g. "thermal_status == THROTTLING" or "battery <= 20"; repeat to
+    AND them) and returns the frame of the exact tick it first held. After
+    `timeout` wall seconds it returns matched=false with the current frame.
+    """
+    sim = get_active_session(chip_session)
+    if not 0 <= timeout <= MAX_WAIT_SECONDS:
+        raise HTTPException(status_code=400, detail=f"timeout must be between 0 and {MAX_WAIT_SECONDS}")
+    try:
+        selectors = [parse_selector(text) for text in condition]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    # Without the tick loop (e.g. in-process test clients) the wait drives the chip's clock itself
+    waiter = await condition_waits.wait(chip_session, sim, selectors, timeout,
+                                        poll_interval=tick_scheduler.interval, drive=not tick_scheduler.running)
+    if waiter.matched:
+        return {"matched": True, "condition": condition, "tick": waiter.tick, "frame": waiter.frame}
+    return {"matched": False, "condition": condition, "tick": sim.ticks, "frame": render_frame(chip_session, sim)}
+
+@app.get("/history")
+async def get_history(start: Optional[float] = None, end: Optional[float] = None, buckets: Optional[int] = None,
+                      chip_session: Optional[str] = Cookie(None)):
+    """
+    Recorded telemetry for this chip in columnar form, optionally limited to
+    simulated times [start, end] and downsampled into `buckets` buckets.
+    Recording starts with the chip's first /history call.
+    """
+    sim = get_active_session(chip_session)
+    if buckets is not None and not 1 <= buckets <= MAX_HISTORY_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"buckets must be between 1 and {MAX_HISTORY_BUCKETS}")
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+
+    with sim.fleet.locked(sim.slot):
+        sim.sync()
+        history = sim.history(start, end)
+
+    payload = {"device_id": chip_session, "samples": int(history["sim_time"].size)}
+    if buckets is None:
+        payload.update({name: history[name].tolist() for name in ("sim_time", "is_throttling", *NUMERIC_FIELDS)})
+        payload["power_mode"] = [MODES[code] for code in history["power_mode"]]
+        return payload
+
+    summary = downsample(history, buckets, start, end)
+    payload["buckets"] = {
+        "start": summary["bucket_start"].tolist(),
+        "end": summary["bucket_end"].tolist(),
+        "count": summary["count"].tolist(),
+        "power_mode": [MODES[code] for code in summary["power_mode"]],
+        "throttling_ratio": np.round(summary["throttling_ratio"], 3).tolist(),
+    }
+    for name in NUMERIC_FIELDS:
+        payload["buckets"][name] = {stat: np.round(values, 3).tolist() for stat, values in summary[name].items()}
+    return payload
+
+@app.get("/export")
+async def export_history(scope: str = "session", chip_session: Optional[str] = Cookie(None)):
+    """
+    Streams recorded history as a binary export file (see simulator.export;
+    read it back with `open_export()`). scope=all exports every session this
+    worker serves instead of just the caller's. Only chips whose history is
+    being recorded (see /history) contribute samples.
+    """
+    if scope == "session":
+        sim = get_active_session(chip_session)
+        sessions = [(chip_session, sim)]
+    elif scope == "all":
+        sessions = user_sessions.items()
+    else:
+        raise HTTPException(status_code=400, detail="scope must be 'session' or 'all'")
+
+    async def chunks():
+        # Iterated on the event loop, so each chunk is read between ticks
+        for chunk in iter_history_export(sessions, n_cores=session_fleet.n_cores):
+            yield chunk
+
+    return StreamingResponse(
+        chunks(),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": 'attachment; filename="telemetry.sdx"'},
+    )
+
+@app.get("/clock")
+async def get_clock(chip_session: Optional[str] = Cookie(None)):
+    sim = get_active_session(chip_session)
+    sim.sync()
+    return sim.clock()
+
+@app.post("/clock")
+async def set_clock(time_scale: float, chip_session: Optional[str] = Cookie(None)):
+    """Sets how many simulated seconds pass per wall second (0 pauses the chip)."""
+    sim = get_active_session(chip_session)
+    if not (math.isfinite(time_scale) and 0 <= time_scale <= MAX_TIME_SCALE):
+        raise HTTPException(status_code=400, detail=f"time_scale must be between 0 and {MAX_TIME_SCALE}")
+
+    sim.fleet.set_time_scale(sim.slot, time_scale)
+    return sim.clock()
+
 @app.post("/reboot")
-async def reboot(chip_session: Optional[str] = Cookie(None)):
-    if chip_session in user_sessions:
-        # Reset the simulator object for this specific user
-        user_sessions[chip_session] = SnapdragonSimulator(chip_session)
+async def reboot(seed: Optional[int] = None, chip_session: Optional[str] = Cookie(None)):
+    """Back to factory state. Passing `seed` also fixes the chip's jitter, making the run reproducible."""
+    if seed is not None and not 0 <= seed < 2**64:
+        raise HTTPException(status_code=400, detail="seed must be an unsigned 64-bit integer")
+    sim = user_sessions.get(chip_session) if chip_session else None
+    if sim is not None:
+        # Reset the simulator for this specific user back to factory state
+        sim.reset(seed)
     return {"status": "SoC Rebooted"}
 
-@app.get("/", response_class=HTMLResponse)
-async def get_dashboard():
-    """Responsive Visual Interface for the Snapdragon 8 Elite Monitor"""
-    return """
-    <html>
-        <head>
-            <title>Snapdragon 8 Elite Monitor</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                :root {
-                    --bg: #0a0a0a;
-                    --card: #1a1a1a;
-                    --prime: #f1c40f;
-                    --perf: #3498db;
-                    --danger: #e74c3c;
-                }
-
-                body { font-family: 'Inter', sans-serif; background: var(--bg); color: white; padding: 15px; margin: 0; }
-                
-                /* Responsive Header */
-                .header { 
-                    display: flex; 
-                    flex-direction: column; 
-                    gap: 10px; 
-                    border-bottom: 1px solid #333; 
-                    padding-bottom: 15px; 
-                }
-                
-                /* Desktop Header: Above 1024px */
-                @media (min-width: 1024px) {
-                    .header { flex-direction: row; justify-content: space-between; align-items: center; }
-                    body { padding: 40px; }
-                }
-
-                /* Responsive Grid System */
-                .grid { 
-                    display: grid; 
-                    grid-template-columns: 1fr; /* Mobile: 1 Column */
-                    gap: 15px; 
-                    margin-top: 20px; 
-                }
-
-                /* Tablet: Between 600px and 1023px */
-                @media (min-width: 600px) {
-                    .grid { grid-template-columns: repeat(2, 1fr); }
-                }
-
-                /* Desktop: Above 1024px */
-                @media (min-width: 1024px) {
-                    .grid { grid-template-columns: repeat(4, 1fr); }
-                }
-
-                .core-card { 
-                    background: var(--card); 
-                    padding: 20px; 
-                    border-radius: 12px; 
-                    border-left: 5px solid var(--perf); 
-                    transition: transform 0.2s ease;
-                   
-                }
-                .core-card:hover { transform: translateY(-5px); }
-                .prime { border-left-color: var(--prime); }
-
-                /* Responsive Controls */
-                .controls { 
-                    background: var(--card); 
-                    padding: 20px; 
-                    border-radius: 12px; 
-                    margin-top: 25px; 
-                    display: flex; 
-                    flex-direction: column; 
-                    gap: 12px; 
-                }
-
-                @media (min-width: 768px) {
-                    .controls { flex-direction: row; align-items: center; }
-                }
-
-                .btn { 
-                    padding: 12px 20px; 
-                    border: none; 
-                    border-radius: 6px; 
-                    cursor: pointer; 
-                    font-weight: bold; 
-                    font-size: 0.9em;
-                    transition: 0.3s;
-                    width: 100%; /* Full width on mobile */
-                }
-
-                @media (min-width: 768px) {
-                    .btn { width: auto; }
-                    .btn-reboot { margin-left: auto; }
-                }
-
-                .btn-perf { background: var(--danger); color: white; }
-                .btn-bal { background: var(--perf); color: white; }
-                .btn-reboot { background: #444; color: white; }
-                .btn:active { transform: scale(0.98); }
-
-                .stat { font-size: 1.3em; font-weight: bold; }
-                .throttling { color: var(--danger); animation: blink 1s infinite; }
-                @keyframes blink { 50% { opacity: 0.3; } }
-
-                .battery-bar { width: 100%; background: #333; height: 12px; border-radius: 6px; margin: 15px 0; }
-                #bat-fill { height: 100%; width: 100%; background: #2ecc71; border-radius: 6px; transition: 0.5s; }
-                
-                small { color: #888; text-transform: uppercase; letter-spacing: 1px; }
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <div>
-                    <h1 style="margin:0;">Snapdragon 8 Elite</h1>
-                    <p id="mode-text" style="color:#aaa; margin-top:5px;">Mode: Balance</p>
-                </div>
-                <div style="text-align: right">
-                    <div class="stat" id="global-temp">--°C</div>
-                    <div id="status-text" style="font-weight:bold; letter-spacing:1px; font-size:0.8em;">OPTIMAL</div>
-                </div>
-            </div>
-            
-            <div class="battery-bar"><div id="bat-fill"></div></div>
-            <p style="margin-top:0;">Battery: <span id="bat-val" style="font-weight:bold;">100</span>%</p>
-
-            <div class="controls">
-                <span style="font-weight: bold; font-size:0.8em;">HARDWARE OVERRIDE:</span>
-                <button class="btn btn-perf" onclick="setMode('High Performance')">PERFORMANCE</button>
-                <button class="btn btn-bal" onclick="setMode('Balance')">BALANCED</button>
-                <button class="btn btn-reboot" onclick="rebootChip()">RESET SoC</button>
-            </div>
-
-            <div class="grid" id="core-grid"></div>
-
-            <script>
-                async function setMode(mode) {
-                    try {
-                        const res = await fetch(`/set_mode?mode=${encodeURIComponent(mode)}`, { method: 'POST' });
-                        if (!res.ok) {
-                            const error = await res.json();
-                            alert("PMIC Warning: " + error.detail);
-                        }
-                    } catch (e) { console.error(e); }
-                }
-
-                async function rebootChip() {
-                    await fetch('/reboot', { method: 'POST' });
-                }
-
-                async function update() {
-                    try {
-                        const res = await fetch('/telemetry');
-                        const data = await res.json();
-                        
-                        document.getElementById('mode-text').innerText = "Mode: " + data.power_mode;
-                        document.getElementById('global-temp').innerText = data.global_temp + "°C";
-                        document.getElementById('bat-val').innerText = data.battery;
-                        document.getElementById('bat-fill').style.width = data.battery + "%";
-                        
-                        const status = document.getElementById('status-text');
-                        status.innerText = data.thermal_status;
-                        status.className = data.thermal_status === 'THROTTLING' ? 'throttling' : '';
-
-                        const fill = document.getElementById('bat-fill');
-                        if (data.battery <= 5) fill.style.backgroundColor = '#e74c3c';
-                        else if (data.battery <= 20) fill.style.backgroundColor = '#f1c40f';
-                        else fill.style.backgroundColor = '#2ecc71';
-
-                        const grid = document.getElementById('core-grid');
-                        grid.innerHTML = data.cores.map(c => `
-                            <div class="core-card ${c.type === 'Prime' ? 'prime' : ''}">
-                                <small>${c.type} Core ${c.id}</small>
-                                <div class="stat">${c.speed} GHz</div>
-                                <small style="color:#666">${c.temp}°C</small>
-                            </div>
-                        `).join('');
-                    } catch (e) { console.error("Update Sync Error", e); }
-                }
-                setInterval(update, 1000);
-                update(); 
-            </script>
-        </body>
-    </html>
+# --- Record / Replay ---
+# Runs are journaled to RECORD_DIR/<name>.jsonl (see simulator.replay)
+
+def run_path(run: str) -> str:
+    if not run or os.path.basename(run) != run or run.startswith("."):
+        raise HTTPException(status_code=400, detail="Invalid run name")
+    return os.path.join(RECORD_DIR, f"{run}.jsonl")
+
+def load_run(run: str) -> RecordedRun:
+    path = run_path(run)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail=f"No recorded run named {run}")
+    try:
+        return RecordedRun(path)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+@app.post("/record/start")
+async def start_recording(run: Optional[str] = None, seed: Optional[int] = None,
+                          chip_session: Optional[str] = Cookie(None)):
+    """Reboots this chip and starts journaling its commands and frames (replaces any recording in progress)."""
+    sim = get_active_session(chip_session)
+    if seed is not None and not 0 <= seed < 2**64:
+        raise HTTPException(status_code=400, detail="seed must be an unsigned 64-bit integer")
+    run = run or chip_session
+    os.makedirs(RECORD_DIR, exist_ok=True)
+    sim.start_recording(run_path(run), seed)
+    return {"run": run, "seed": sim.seed}
+
+@app.post("/record/stop")
+async def stop_recording(chip_session: Optional[str] = Cookie(None)):
+    sim = get_active_session(chip_session)
+    recorder = sim.stop_recording()
+    if recorder is None:
+        raise HTTPException(status_code=400, detail="This chip is not being recorded")
+    return {"run": os.path.basename(recorder.path)[:-len(".jsonl")], "events": recorder.events}
+
+@app.get("/replay/{run}")
+async def replay_summary(run: str):
+    return load_run(run).summary()
+
+@app.get("/replay/{run}/telemetry")
+async def replay_telemetry(run: str, tick: int):
+    """Serves the frame recorded at (or last before) `tick` without running any physics."""
+    frame = load_run(run).frame_at(tick)
+    if frame is None:
+        raise HTTPException(status_code=404, detail=f"No frame recorded at or before tick {tick}")
+    return frame
+
+@app.post("/replay/{run}/verify")
+async def replay_verify(run: str):
+    """Re-simulates a recorded run from its seed and reports frames that no longer match."""
+    recorded = load_run(run)
+    fleet = Fleet(capacity=1)
+    mismatches = recorded.diff(
+        lambda seed: SnapdragonSimulator(recorded.session_id, fleet, seed=seed),
+        lambda sim: render_frame(recorded.session_id, sim),
+    )
+    return {"frames": len(recorded.frames), "mismatched_ticks": [m["tick"] for m in mismatches],
+            "mismatches": mismatches[:10]}
+
+# --- Fleet Batch API ---
+# One request acts on many devices, picked by explicit IDs and/or selectors
+# (see simulator.selectors), so a controller needs one call per tick, not one per device.
+
+class FleetCommand(BaseModel):
+    devices: Optional[List[str]] = None
+    select: List[str] = []
+
+
+class FleetModeCommand(FleetCommand):
+    mode: str
+
+
+def resolve_devices(devices: Optional[List[str]], selectors: List[str]):
+    """
+    Looks up the requested devices (default: every session) and groups them
+    by fleet. Returns ({fleet: (device_ids, slots)}, compiled selectors, not_found).
+    """
+    try:
+        compiled = [parse_selector(text) for text in selectors]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    not_found = []
+    if devices is None:
+        sessions = user_sessions.items()
+    else:
+        sessions = []
+        for device_id in dict.fromkeys(devices):
+            sim = user_sessions.get(device_id)
+            if sim is None:
+                not_found.append(device_id)
+            else:
+                sessions.append((device_id, sim))
+
+    groups = {}
+    for device_id, sim in sessions:
+        ids, slots = groups.setdefault(sim.fleet, ([], []))
+        ids.append(device_id)
+        slots.append(sim.slot)
+    groups = {fleet: (ids, np.array(slots, dtype=np.intp)) for fleet, (ids, slots) in groups.items()}
+    return groups, compiled, not_found
+
+
+def fleet_telemetry(command: FleetCommand) -> dict:
+    groups, selectors, not_found = resolve_devices(command.devices, command.select)
+    columns = {name: [] for name in ("devices", "battery", "power_mode", "thermal_status", "global_temp",
+                                     "core_speed", "core_temp")}
+    for fleet, (ids, slots) in groups.items():
+        with fleet.locked(slots):
+            fleet.sync(slots)
+            mask = select(fleet, slots, selectors)
+            slots = slots[mask]
+            columns["devices"] += [device_id for device_id, keep in zip(ids, mask) if keep]
+            columns["battery"] += fleet.battery[slots].tolist()
+            columns["power_mode"] += [MODES[code] for code in fleet.power_mode[slots]]
+            columns["thermal_status"] += np.where(fleet.is_throttling[slots], "THROTTLING", "OPTIMAL").tolist()
+            columns["global_temp"] += fleet.global_temp[slots].tolist()
+            columns["core_speed"] += fleet.core_speed[slots].tolist()
+            columns["core_temp"] += fleet.core_temp[slots].tolist()
+    return {"count": len(columns["devices"]), **columns, "not_found": not_found}
+
+@app.get("/fleet/telemetry")
+async def get_fleet_telemetry(devices: Optional[str] = None, select: Optional[List[str]] = Query(None)):
+    """
+    Columnar telemetry for many devices in one response. `devices` is a
+    comma-separated ID list (default: all); repeat `select` to AND selectors.
+    """
+    return fleet_telemetry(FleetCommand(devices=devices.split(",") if devices else None, select=select or []))
+
+@app.post("/fleet/telemetry")
+async def post_fleet_telemetry(command: FleetCommand):
+    """Same as GET /fleet/telemetry, for ID lists too long for a URL."""
+    return fleet_telemetry(command)
+
+@app.post("/fleet/set_mode")
+async def fleet_set_mode(command: FleetModeCommand):
+    """Switches every selected device, applying the same rules as /set_mode per device."""
+    if command.mode not in SELECTABLE_MODES:
+        raise HTTPException(status_code=400, detail="Invalid mode")
+
+    groups, selectors, not_found = resolve_devices(command.devices, command.select)
+    switched, battery_too_low = [], []
+    for fleet, (ids, slots) in groups.items():
+        with fleet.locked(slots):
+            # Ticks that fell due before the switch still run in the old mode
+            fleet.sync(slots)
+            mask = select(fleet, slots, selectors)
+            low = fleet.battery[slots] <= SAVER_BATTERY
+            ok = mask & ~low
+            fleet.power_mode[slots[ok]] = MODE_CODES[command.mode]
+            fleet.revision[slots[ok]] += 1
+            for slot in slots[ok].tolist():
+                fleet.journal(slot, "set", key="power_mode", value=command.mode)
+        _REJECTED_BATTERY.inc(int(np.count_nonzero(mask & low)))
+        switched += [device_id for device_id, flag in zip(ids, ok) if flag]
+        battery_too_low += [device_id for device_id, flag in zip(ids, mask & low) if flag]
+    return {"mode": command.mode, "switched": switched, "battery_too_low": battery_too_low, "not_found": not_found}
+
+@app.post("/fleet/reboot")
+async def fleet_reboot(command: FleetCommand):
+    """Restores every selected device to factory state."""
+    groups, selectors, not_found = resolve_devices(command.devices, command.select)
+    rebooted = []
+    for fleet, (ids, slots) in groups.items():
+        with fleet.locked(slots):
+            fleet.sync(slots)
+            mask = select(fleet, slots, selectors)
+            if mask.any():
+                fleet.reset(slots[mask])
+        rebooted += [device_id for device_id, flag in zip(ids, mask) if flag]
+    return {"rebooted": rebooted, "not_found": not_found}
+
+def get_register_file() -> RegisterFile:
+    if status_registers is None:
+        raise HTTPException(status_code=404, detail="Status register file is disabled")
+    return status_registers
+
+@app.get("/registers")
+async def get_registers(chip_session: Optional[str] = Cookie(None)):
+    """Where this chip's status register lives in the shared file, and its current value."""
+    sim = get_active_session(chip_session)
+    registers = get_register_file()
+    sim.sync()
+    value = int(registers.registers[sim.slot])
+    return {
+        "path": registers.path,
+        "slot": sim.slot,
+        "offset": HEADER_BYTES + 2 * sim.slot,
+        "value": f"0x{value:04X}",
+        "forced_set": f"0x{int(registers.force_set[sim.slot]):04X}",
+        "forced_clear": f"0x{int(registers.force_clear[sim.slot]):04X}",
+    }
+
+@app.post("/registers/fault")
+async def inject_fault(set_bits: str = "0x0", clear_bits: str = "0x0", chip_session: Optional[str] = Cookie(None)):
+    """Forces status bits on/off for this chip until /registers/fault is DELETEd."""
+    sim = get_active_session(chip_session)
+    registers = get_register_file()
+    try:
+        registers.inject(sim.slot, int(set_bits, 16), int(clear_bits, 16))
+    except (ValueError, IndexError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "Fault injected", "value": f"0x{int(registers.registers[sim.slot]):04X}"}
+
+@app.delete("/registers/fault")
+async def clear_fault(chip_session: Optional[str] = Cookie(None)):
+    sim = get_active_session(chip_session)
+    get_register_file().clear_faults(sim.slot)
+    return {"status": "Faults cleared"}
+
+@app.get("/metrics")
+async def get_metrics():
+    """Counters, gauges and latency histograms in the Prometheus text format."""
+    if not metrics.ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (SIM_METRICS=0)")
+    return Response(metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Debug endpoints are disabled (set SIM_ADMIN_TOKEN)")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+# One profile at a time per process
+profile_lock = asyncio.Lock()
+
+@app.get("/debug/profile", dependencies=[Depends(require_admin)])
+async def debug_profile(seconds: float = 5, interval: float = Query(profiler.DEFAULT_INTERVAL, ge=0.001, le=0.1),
+                        top: int = Query(20, ge=1, le=200), clock: str = "cpu", threads: str = "loop",
+                        format: str = "json"):
+    """
+    Samples this worker's stacks for `seconds` and returns where the time
+    went: collapsed stacks for a flamegraph plus the top-N hot functions
+    (`format=collapsed` returns just the stacks as text). The event loop is
+    sampled on CPU time, or on wall time with `clock=wall` (to see it idle
+    or blocked); `threads=all` samples every thread instead. Nothing is
+    instrumented outside a profile window. With several workers, each
+    request profiles the worker that serves it.
     """
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be between 0 and {MAX_PROFILE_SECONDS}")
+    if clock not in profiler.CLOCKS or threads not in ("loop", "all") or format not in ("json", "collapsed"):
+        raise HTTPException(status_code=400, detail="clock must be cpu|wall, threads loop|all, format json|collapsed")
+    if profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    async with profile_lock:
+        profile = await profiler.profile_for(seconds, interval, all_threads=threads == "all", clock=clock)
+    if format == "collapsed":
+        return PlainTextResponse(profile.collapsed())
+    return {
+        "seconds": round(profile.duration, 3),
+        "interval": profile.interval,
+        "samples": profile.samples,
+        "top": profile.top(top),
+        "collapsed": profile.collapsed(),
+    }
+
+# One checkpoint at a time per process
+snapshot_lock = asyncio.Lock()
+
+@app.post("/debug/snapshot", dependencies=[Depends(require_admin)])
+async def debug_snapshot():
+    """Checkpoints every session to SIM_SNAPSHOT_FILE now, without waiting for the next interval."""
+    if not SNAPSHOT_FILE:
+        raise HTTPException(status_code=404, detail="Checkpoints are disabled (set SIM_SNAPSHOT_FILE)")
+    if snapshot_lock.locked():
+        raise HTTPException(status_code=409, detail="A checkpoint is already being written")
+    async with snapshot_lock:
+        try:
+            return await snapshot.checkpoint(user_sessions, session_fleet, SNAPSHOT_FILE)
+        except (OSError, RuntimeError) as e:
+            raise HTTPException(status_code=500, detail=f"Checkpoint failed: {e}")
+
+@app.get("/profile")
+async def get_profile():
+    """Topology and thermal model of the simulated chip (see SIM_CHIP_PROFILE)."""
+    return session_fleet.profile.describe()
+
+@app.get("/sessions/stats")
+async def session_stats():
+    """Live session count, eviction totals and approximate memory per session."""
+    return user_sessions.stats()
+
+@app.get("/", response_class=HTMLResponse)
+async def get_dashboard(request: Request):
+    """Responsive Visual Interface for the Snapdragon 8 Elite Monitor (see simulator.dashboard)"""
+    return dashboard_page.response(request.headers)
 
 
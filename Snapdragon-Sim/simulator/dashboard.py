@@ -0,0 +1,339 @@
+"""
+The monitoring dashboard, served from bytes encoded once at import.
+
+The page (HTML, CSS and JS in one document) cannot change while the server
+runs, so it is compressed up front: identity, gzip and, when the optional
+`brotli` package is installed, brotli variants, each with its own strong
+ETag. A request only picks a variant by Accept-Encoding, and a browser
+revalidating with If-None-Match gets a bodiless 304.
+
+In the browser the page builds the core grid once and then patches the
+individual values that changed on each frame, rather than re-rendering it.
+"""
+import gzip
+import hashlib
+from typing import Dict, NamedTuple
+
+from fastapi import Response
+
+try:
+    import brotli
+except ImportError:  # gzip alone covers every browser
+    brotli = None
+
+# Tried in this order when a client accepts several at the same q-value (smallest first)
+ENCODINGS = ("br", "gzip", "identity")
+
+
+class Variant(NamedTuple):
+    """One pre-encoded representation of the page."""
+    body: bytes
+    etag: str
+
+
+def _accepted(accept_encoding: str) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}."""
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    return weights
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so a W/ prefix doesn't matter."""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+class PrecompressedPage:
+    """A static page encoded up front, answering conditional and compressed requests."""
+
+    def __init__(self, html: str):
+        raw = html.encode()
+        digest = hashlib.sha256(raw).hexdigest()[:20]
+        # Strong ETags must differ between encodings of the same content
+        self.variants = {"identity": Variant(raw, f'"{digest}"'),
+                         "gzip": Variant(gzip.compress(raw, compresslevel=9, mtime=0), f'"{digest}-gzip"')}
+        if brotli is not None:
+            self.variants["br"] = Variant(brotli.compress(raw, mode=brotli.MODE_TEXT, quality=11), f'"{digest}-br"')
+
+    def negotiate(self, accept_encoding: str) -> str:
+        """The acceptable encoding with the highest q-value, falling back to identity."""
+        weights = _accepted(accept_encoding)
+        default = weights.get("*")
+
+        def q(coding: str) -> float:
+            if coding in weights:
+                return weights[coding]
+            if default is not None:
+                return default
+            # Identity is acceptable unless explicitly refused
+            return 1.0 if coding == "identity" else 0.0
+
+        best = max(
+            (coding for coding in ENCODINGS if coding in self.variants),
+            key=lambda coding: (q(coding), -ENCODINGS.index(coding)),
+        )
+        return best if q(best) > 0 else "identity"
+
+    def response(self, headers) -> Response:
+        encoding = self.negotiate(headers.get("accept-encoding", ""))
+        variant = self.variants[encoding]
+        response_headers = {"ETag": variant.etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+        if _etag_matches(headers.get("if-none-match", ""), variant.etag):
+            return Response(status_code=304, headers=response_headers)
+        if encoding != "identity":
+            response_headers["Content-Encoding"] = encoding
+        return Response(variant.body, media_type="text/html", headers=response_headers)
+
+
+DASHBOARD_HTML = """\
+<html>
+    <head>
+        <title>Snapdragon 8 Elite Monitor</title>
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <style>
+            :root {
+                --bg: #0a0a0a;
+                --card: #1a1a1a;
+                --prime: #f1c40f;
+                --perf: #3498db;
+                --danger: #e74c3c;
+            }
+
+            body { font-family: 'Inter', sans-serif; background: var(--bg); color: white; padding: 15px; margin: 0; }
+
+            /* Responsive Header */
+            .header { 
+                display: flex; 
+                flex-direction: column; 
+                gap: 10px; 
+                border-bottom: 1px solid #333; 
+                padding-bottom: 15px; 
+            }
+
+            /* Desktop Header: Above 1024px */
+            @media (min-width: 1024px) {
+                .header { flex-direction: row; justify-content: space-between; align-items: center; }
+                body { padding: 40px; }
+            }
+
+            /* Responsive Grid System */
+            .grid { 
+                display: grid; 
+                grid-template-columns: 1fr; /* Mobile: 1 Column */
+                gap: 15px; 
+                margin-top: 20px; 
+            }
+
+            /* Tablet: Between 600px and 1023px */
+            @media (min-width: 600px) {
+                .grid { grid-template-columns: repeat(2, 1fr); }
+            }
+
+            /* Desktop: Above 1024px */
+            @media (min-width: 1024px) {
+                .grid { grid-template-columns: repeat(4, 1fr); }
+            }
+
+            .core-card { 
+                background: var(--card); 
+                padding: 20px; 
+                border-radius: 12px; 
+                border-left: 5px solid var(--perf); 
+                transition: transform 0.2s ease;
+
+            }
+            .core-card:hover { transform: translateY(-5px); }
+            .prime { border-left-color: var(--prime); }
+
+            /* Responsive Controls */
+            .controls { 
+                background: var(--card); 
+                padding: 20px; 
+                border-radius: 12px; 
+                margin-top: 25px; 
+                display: flex; 
+                flex-direction: column; 
+                gap: 12px; 
+            }
+
+            @media (min-width: 768px) {
+                .controls { flex-direction: row; align-items: center; }
+            }
+
+            .btn { 
+                padding: 12px 20px; 
+                border: none; 
+                border-radius: 6px; 
+                cursor: pointer; 
+                font-weight: bold; 
+                font-size: 0.9em;
+                transition: 0.3s;
+                width: 100%; /* Full width on mobile */
+            }
+
+            @media (min-width: 768px) {
+                .btn { width: auto; }
+                .btn-reboot { margin-left: auto; }
+            }
+
+            .btn-perf { background: var(--danger); color: white; }
+            .btn-bal { background: var(--perf); color: white; }
+            .btn-reboot { background: #444; color: white; }
+            .btn:active { transform: scale(0.98); }
+
+            .stat { font-size: 1.3em; font-weight: bold; }
+            .throttling { color: var(--danger); animation: blink 1s infinite; }
+            @keyframes blink { 50% { opacity: 0.3; } }
+
+            .battery-bar { width: 100%; background: #333; height: 12px; border-radius: 6px; margin: 15px 0; }
+            #bat-fill { height: 100%; width: 100%; background: #2ecc71; border-radius: 6px; transition: 0.5s; }
+
+            small { color: #888; text-transform: uppercase; letter-spacing: 1px; }
+        </style>
+    </head>
+    <body>
+        <div class="header">
+            <div>
+                <h1 style="margin:0;">Snapdragon 8 Elite</h1>
+                <p id="mode-text" style="color:#aaa; margin-top:5px;">Mode: Balance</p>
+            </div>
+            <div style="text-align: right">
+                <div class="stat" id="global-temp">--°C</div>
+                <div id="status-text" style="font-weight:bold; letter-spacing:1px; font-size:0.8em;">OPTIMAL</div>
+            </div>
+        </div>
+
+        <div class="battery-bar"><div id="bat-fill"></div></div>
+        <p style="margin-top:0;">Battery: <span id="bat-val" style="font-weight:bold;">100</span>%</p>
+
+        <div class="controls">
+            <span style="font-weight: bold; font-size:0.8em;">HARDWARE OVERRIDE:</span>
+            <button class="btn btn-perf" onclick="setMode('High Performance')">PERFORMANCE</button>
+            <button class="btn btn-bal" onclick="setMode('Balance')">BALANCED</button>
+            <button class="btn btn-reboot" onclick="rebootChip()">RESET SoC</button>
+        </div>
+
+        <div class="grid" id="core-grid"></div>
+
+        <script>
+            async function setMode(mode) {
+                try {
+                    const res = await fetch(`/set_mode?mode=${encodeURIComponent(mode)}`, { method: 'POST' });
+                    if (!res.ok) {
+                        const error = await res.json();
+                        alert("PMIC Warning: " + error.detail);
+                    }
+                } catch (e) { console.error(e); }
+            }
+
+            async function rebootChip() {
+                await fetch('/reboot', { method: 'POST' });
+            }
+
+            // Writes only values that differ from what is shown, so a frame
+            // that changes one reading touches one text node
+            function setText(el, text) {
+                if (el.textContent !== text) el.textContent = text;
+            }
+
+            // Per-core elements, built once and then patched in place
+            let cards = [];
+
+            function buildGrid(count) {
+                const grid = document.getElementById('core-grid');
+                grid.innerHTML = `
+                    <div class="core-card">
+                        <small></small>
+                        <div class="stat"></div>
+                        <small style="color:#666"></small>
+                    </div>
+                `.repeat(count);
+                cards = Array.from(grid.children, (card) => ({
+                    card, label: card.children[0], speed: card.children[1], temp: card.children[2],
+                }));
+            }
+
+            function render(data) {
+                setText(document.getElementById('mode-text'), "Mode: " + data.power_mode);
+                setText(document.getElementById('global-temp'), data.global_temp + "°C");
+                setText(document.getElementById('bat-val'), String(data.battery));
+
+                const status = document.getElementById('status-text');
+                setText(status, data.thermal_status);
+                const statusClass = data.thermal_status === 'THROTTLING' ? 'throttling' : '';
+                if (status.className !== statusClass) status.className = statusClass;
+
+                const fill = document.getElementById('bat-fill');
+                const width = data.battery + "%";
+                if (fill.style.width !== width) fill.style.width = width;
+                let color = '#2ecc71';
+                if (data.battery <= 5) color = '#e74c3c';
+                else if (data.battery <= 20) color = '#f1c40f';
+                if (fill.dataset.color !== color) {
+                    fill.dataset.color = color;
+                    fill.style.backgroundColor = color;
+                }
+
+                // Only a different core count (another chip profile) rebuilds the grid
+                if (cards.length !== data.cores.length) buildGrid(data.cores.length);
+                data.cores.forEach((c, i) => {
+                    const card = cards[i];
+                    const prime = c.type === 'Prime';
+                    if (card.card.classList.contains('prime') !== prime) card.card.classList.toggle('prime', prime);
+                    setText(card.label, `${c.type} Core ${c.id}`);
+                    setText(card.speed, `${c.speed} GHz`);
+                    setText(card.temp, `${c.temp}°C`);
+                });
+            }
+
+            async function update() {
+                try {
+                    const res = await fetch('/telemetry');
+                    render(await res.json());
+                } catch (e) { console.error("Update Sync Error", e); }
+            }
+
+            // Server pushes one frame per tick: WebSocket first, then SSE, then polling
+            function connectStream() {
+                const proto = location.protocol === 'https:' ? 'wss' : 'ws';
+                let opened = false;
+                let ws;
+                try {
+                    ws = new WebSocket(`${proto}://${location.host}/telemetry/stream`);
+                } catch (e) { return connectEventSource(); }
+                ws.onopen = () => { opened = true; };
+                ws.onmessage = (e) => render(JSON.parse(e.data));
+                ws.onclose = () => {
+                    if (opened) setTimeout(connectStream, 1000);
+                    else connectEventSource();
+                };
+            }
+
+            function connectEventSource() {
+                if (!window.EventSource) { setInterval(update, 1000); return; }
+                const source = new EventSource('/telemetry/stream');
+                source.onmessage = (e) => render(JSON.parse(e.data));
+            }
+
+            // The first fetch also hands the browser its chip_session cookie
+            update().then(connectStream);
+        </script>
+    </body>
+</html>
+"""
+
+dashboard_page = PrecompressedPage(DASHBOARD_HTML)
@@ -0,0 +1,106 @@
+"""
+Delta-encoded telemetry: send a polling client only what changed.
+
+Every serialized frame carries a sequence number (`Frame.seq`). A client
+that polls `/telemetry?since=<seq>` gets back either
+
+- a delta against the frame it already has, holding only the fields that
+  changed. Numbers are fixed-point integers (the value times SCALE[field];
+  the physics keeps every reading on that grid, so this is exact), and
+  per-core values are flat `[core index, value, ...]` pairs:
+
+      {"seq": 1043, "battery": 9775, "global_temp": 413, "temp": [0, 419, 3, 408]}
+
+- or a keyframe, the full frame as `/telemetry` returns it plus `"seq"`,
+  `"keyframe": true` and the `"scale"` table, whenever the server no longer
+  has (or never had) frame `since` for this chip.
+
+Static fields (device_id, chipset, core ids and types) only ever travel in
+keyframes. To compare frames the server keeps each recent frame's changing
+values packed as int32s (`pack_frame`), and only for chips that have asked
+for deltas at least once (see TickScheduler.frame_with_history).
+`apply_delta` is the reference client-side decoder.
+"""
+import json
+from array import array
+from typing import Optional
+
+from simulator.fleet import MODES, MODE_CODES
+
+# Leading entries of a packed frame; per-core speeds, then temperatures, follow
+SCALARS = ("battery", "power_mode", "thermal_status", "global_temp")
+# Core fields carried in deltas, in packed order
+CORE_FIELDS = ("speed", "temp")
+# Fixed-point scale of each numeric field: battery 0.01 %, temperatures 0.1 °C, speeds 10 MHz
+SCALE = {"battery": 100, "global_temp": 10, "speed": 100, "temp": 10}
+_SCALE_JSON = json.dumps(SCALE, separators=(",", ":")).encode()
+
+
+def pack_frame(frame: dict) -> Optional[bytes]:
+    """
+    The frame's changing values as int32 bytes: SCALARS, then each
+    CORE_FIELDS column. None if a value is off its fixed-point grid (e.g. a
+    custom profile's clock before the first tick), which forces keyframes.
+    """
+    values = [round(frame["battery"] * SCALE["battery"]), MODE_CODES[frame["power_mode"]],
+              int(frame["thermal_status"] == "THROTTLING"), round(frame["global_temp"] * SCALE["global_temp"])]
+    if values[0] / SCALE["battery"] != frame["battery"] or values[3] / SCALE["global_temp"] != frame["global_temp"]:
+        return None
+    for field in CORE_FIELDS:
+        scale = SCALE[field]
+        for core in frame["cores"]:
+            fixed = round(core[field] * scale)
+            if fixed / scale != core[field]:
+                return None
+            values.append(fixed)
+    return array("i", values).tobytes()
+
+
+def encode_delta(seq: int, base: Optional[bytes], current: Optional[bytes]) -> Optional[bytes]:
+    """
+    JSON body of the delta from packed frame `base` to `current` (seq
+    `seq`), or None when the two can't be compared (either wasn't packable,
+    or the core count differs), which calls for a keyframe instead.
+    """
+    if base is None or current is None or len(base) != len(current):
+        return None
+    old, new = memoryview(base).cast("i").tolist(), memoryview(current).cast("i").tolist()
+    # Written out by hand rather than through json.dumps: every field is an
+    # int or a fixed string, and this runs once per delta poll
+    parts = ['{"seq":%d' % seq]
+    for i, name in enumerate(SCALARS):
+        if old[i] != new[i]:
+            if name == "power_mode":
+                parts.append('"power_mode":"%s"' % MODES[new[i]])
+            elif name == "thermal_status":
+                parts.append('"thermal_status":"%s"' % ("THROTTLING" if new[i] else "OPTIMAL"))
+            else:
+                parts.append('"%s":%d' % (name, new[i]))
+    n_cores = (len(new) - len(SCALARS)) // len(CORE_FIELDS)
+    for f, field in enumerate(CORE_FIELDS):
+        start = len(SCALARS) + f * n_cores
+        flat = ["%d,%d" % (core, new[start + core]) for core in range(n_cores)
+                if old[start + core] != new[start + core]]
+        if flat:
+            parts.append('"%s":[%s]' % (field, ",".join(flat)))
+    return (",".join(parts) + "}").encode()
+
+
+def encode_keyframe(seq: int, body: bytes) -> bytes:
+    """The full frame `body` (a JSON object), tagged with its sequence number and the delta scales."""
+    return b'{"seq":%d,"keyframe":true,"scale":%s,%s' % (seq, _SCALE_JSON, body[1:])
+
+
+def apply_delta(frame: Optional[dict], update: dict) -> dict:
+    """Client side: the full frame after `update`, a keyframe or a delta against `frame`."""
+    if update.get("keyframe"):
+        return {key: value for key, value in update.items() if key not in ("seq", "keyframe", "scale")}
+    frame = dict(frame, cores=[dict(core) for core in frame["cores"]])
+    for name in SCALARS:
+        if name in update:
+            frame[name] = update[name] / SCALE[name] if name in SCALE else update[name]
+    for field in CORE_FIELDS:
+        pairs = update.get(field, ())
+        for i in range(0, len(pairs), 2):
+            frame["cores"][pairs[i]][field] = pairs[i + 1] / SCALE[field]
+    return frame
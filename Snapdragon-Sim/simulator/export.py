@@ -0,0 +1,224 @@
+"""
+Bulk telemetry export in a fixed-width binary format that streams and memory-maps.
+
+File layout (all little-endian):
+
+    "SDEXP001" | u4 header length | header JSON (record dtype), zero-padded to 64 bytes
+    records: fixed-width packed rows, one per sample (export_dtype(cores))
+    footer JSON ({"rows": n, "sessions": [...]}) | u8 footer length | "SDEXPEND"
+
+Rows are written as they're produced and the counts only go in the footer,
+so the writer never needs the whole recording in memory or even its length
+up front. The reader finds the footer from the end of the file and maps the
+record block with `np.memmap`, so every column is a zero-copy (strided) view
+no matter how large the file is.
+
+Each row's `session` field indexes the footer's `sessions` list. The per-core
+fields are as wide as the chip profile's core count; the header's dtype says
+how wide.
+"""
+import itertools
+import json
+import struct
+from typing import BinaryIO, Iterable, Iterator, List
+
+import numpy as np
+
+from simulator.fleet import N_CORES, TICK_SECONDS
+
+MAGIC = b"SDEXP001"
+END_MAGIC = b"SDEXPEND"
+_ALIGN = 64
+
+
+def export_dtype(n_cores: int = N_CORES) -> np.dtype:
+    """Row layout for chips with `n_cores` cores."""
+    return np.dtype([
+        ("session", "<u4"),
+        ("sim_time", "<f8"),
+        ("battery", "<f4"),
+        ("global_temp", "<f4"),
+        ("power_mode", "i1"),
+        ("is_throttling", "?"),
+        ("core_speed", "<f4", (n_cores,)),
+        ("core_temp", "<f4", (n_cores,)),
+    ])
+
+
+# Rows of the default 8-core chip
+EXPORT_DTYPE = export_dtype()
+
+# Sessions whose history is gathered per chunk when exporting
+CHUNK_SESSIONS = 64
+
+
+def _header(dtype: np.dtype) -> bytes:
+    header = json.dumps({"version": 1, "dtype": np.lib.format.dtype_to_descr(dtype)}).encode()
+    prefix = MAGIC + struct.pack("<I", len(header))
+    padding = -(len(prefix) + len(header)) % _ALIGN
+    return prefix + header + b"\0" * padding
+
+
+def _footer(rows: int, sessions: List[str]) -> bytes:
+    footer = json.dumps({"rows": rows, "sessions": sessions}).encode()
+    return footer + struct.pack("<Q", len(footer)) + END_MAGIC
+
+
+# --- Writing ---
+
+def history_rows(fleet, slots, session_index) -> np.ndarray:
+    """
+    Gathers the retained history of the given slots into export rows, tagged
+    with one session index per slot. One vectorized gather for the whole
+    group; slots whose history isn't being recorded contribute no rows.
+    """
+    slots = np.asarray(slots, dtype=np.intp)
+    ring_rows = fleet.hist_row[slots]
+    recorded = ring_rows >= 0
+    if not recorded.any():
+        return np.empty(0, dtype=export_dtype(fleet.n_cores))
+    ring = fleet.history_ring()
+    ring_rows = np.where(recorded, ring_rows, 0)
+    counts = np.where(recorded, np.minimum(ring.count[ring_rows], ring.depth), 0)
+    row = np.repeat(ring_rows, counts)
+    # Ring position of each row: oldest retained sample first, per slot
+    offsets = np.arange(row.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    pos = (np.repeat(ring.count[ring_rows] - counts, counts) + offsets) % ring.depth
+
+    rows = np.empty(row.size, dtype=export_dtype(fleet.n_cores))
+    rows["session"] = np.repeat(np.asarray(session_index, dtype=np.uint32), counts)
+    rows["sim_time"] = ring.tick[row, pos] * TICK_SECONDS
+    rows["battery"] = ring.battery[row, pos] / 100
+    rows["global_temp"] = ring.temp[row, pos] / 10
+    rows["power_mode"] = ring.mode[row, pos]
+    rows["is_throttling"] = ring.throttling[row, pos]
+    rows["core_speed"] = ring.core_speed[row, pos] / 100
+    rows["core_temp"] = ring.core_temp[row, pos] / 10
+    return rows
+
+
+def state_rows(fleet, slots, session_index) -> np.ndarray:
+    """Export rows for the slots' current (live) state."""
+    slots = np.asarray(slots, dtype=np.intp)
+    rows = np.empty(slots.size, dtype=export_dtype(fleet.n_cores))
+    rows["session"] = session_index
+    rows["sim_time"] = fleet.ticks[slots] * TICK_SECONDS
+    rows["battery"] = fleet.battery[slots]
+    rows["global_temp"] = fleet.global_temp[slots]
+    rows["power_mode"] = fleet.power_mode[slots]
+    rows["is_throttling"] = fleet.is_throttling[slots]
+    rows["core_speed"] = fleet.core_speed[slots]
+    rows["core_temp"] = fleet.core_temp[slots]
+    return rows
+
+
+def iter_history_export(sessions: Iterable, chunk_sessions: int = CHUNK_SESSIONS,
+                        n_cores: int = N_CORES) -> Iterator[bytes]:
+    """
+    Yields a complete export file, chunk by chunk, of the recorded history
+    of `sessions` ((session_id, chip) pairs, all on `n_cores`-core chips).
+    Memory use is bounded by one chunk of `chunk_sessions` sessions.
+    """
+    yield _header(export_dtype(n_cores))
+    names, rows = [], 0
+    sessions = iter(sessions)
+    while True:
+        batch = list(itertools.islice(sessions, chunk_sessions))
+        if not batch:
+            break
+        by_fleet = {}
+        for session_id, chip in batch:
+            by_fleet.setdefault(chip.fleet, []).append((len(names), chip.slot))
+            names.append(session_id)
+        for fleet, group in by_fleet.items():
+            index, slots = zip(*group)
+            with fleet.locked(list(slots)):
+                chunk = history_rows(fleet, slots, index)
+            rows += chunk.size
+            yield chunk.tobytes()
+    yield _footer(rows, names)
+
+
+class ExportWriter:
+    """Appends export rows to a binary file object; `close()` writes the footer."""
+
+    def __init__(self, f: BinaryIO, sessions: List[str], n_cores: int = N_CORES):
+        self.f = f
+        self.sessions = list(sessions)
+        self.rows = 0
+        self.dtype = export_dtype(n_cores)
+        f.write(_header(self.dtype))
+
+    def write(self, rows: np.ndarray):
+        self.f.write(np.ascontiguousarray(rows, dtype=self.dtype).tobytes())
+        self.rows += rows.size
+
+    def close(self):
+        self.f.write(_footer(self.rows, self.sessions))
+        self.f.flush()
+
+
+def record_run(fleet, slots, sessions: List[str], ticks: int, path: str, every: int = 1):
+    """
+    Steps `slots` tick by tick for `ticks` ticks and streams every `every`-th
+    tick's state straight to an export file at `path`. Memory use stays
+    constant however long the run, e.g. a day (86,400 ticks) of 1k devices.
+    """
+    slots = np.asarray(slots, dtype=np.intp)
+    index = np.arange(slots.size, dtype=np.uint32)
+    with open(path, "wb") as f:
+        writer = ExportWriter(f, sessions, fleet.n_cores)
+        writer.write(state_rows(fleet, slots, index))
+        for tick in range(1, ticks + 1):
+            fleet.step(slots)
+            if tick % every == 0:
+                writer.write(state_rows(fleet, slots, index))
+        writer.close()
+
+
+# --- Reading ---
+
+class TelemetryExport:
+    """A memory-mapped export file. `records` is a structured array backed by the file."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a telemetry export")
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len))
+            offset = len(MAGIC) + 4 + header_len
+            offset += -offset % _ALIGN
+
+            f.seek(-(8 + len(END_MAGIC)), 2)
+            footer_len_bytes, end_magic = f.read(8), f.read(len(END_MAGIC))
+            if end_magic != END_MAGIC:
+                raise ValueError(f"{path} is truncated (no export footer)")
+            (footer_len,) = struct.unpack("<Q", footer_len_bytes)
+            f.seek(-(8 + len(END_MAGIC) + footer_len), 2)
+            footer = json.loads(f.read(footer_len))
+
+        self.path = path
+        self.dtype = np.lib.format.descr_to_dtype(header["dtype"])
+        self.sessions: List[str] = footer["sessions"]
+        self.rows: int = footer["rows"]
+        if self.rows:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=offset, shape=(self.rows,))
+        else:
+            self.records = np.empty(0, dtype=self.dtype)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        """One column as a zero-copy view, e.g. export["global_temp"]."""
+        return self.records[field]
+
+    def session(self, session_id: str) -> np.ndarray:
+        """Rows belonging to one session (a copy, in recorded order)."""
+        return self.records[self.records["session"] == self.sessions.index(session_id)]
+
+
+def open_export(path: str) -> TelemetryExport:
+    """Memory-maps an export file written by the API or `record_run()`."""
+    return TelemetryExport(path)
@@ -0,0 +1,889 @@
+"""
+Vectorized physics engine for every simulated Snapdragon 8 Elite in the process.
+
+Instead of one Python dict per chip, the whole fleet lives in NumPy
+structure-of-arrays buffers: one contiguous column per state field, indexed by
+a "slot" number. A single `step()` call advances every chip (or any subset of
+slots) at once. Silicon jitter comes from a counter-based RNG keyed per chip
+(see simulator.rng), so each chip's run is reproducible from its key alone.
+
+The power-mode and thermal-throttling rules are exactly the ones the original
+per-dict `update_physics` used:
+
+- Battery <= 5%  -> "Ultra Saver", battery <= 20% -> "Battery Saver"
+- Throttling latches on above 85°C and releases below 65°C (hysteresis)
+
+Each slot also carries its own virtual clock. Physics ticks happen once per
+simulated second, and simulated time runs at `time_scale` x wall time, so a
+chip's state depends on how much simulated time has passed rather than on
+how often somebody polls it. `sync()` catches slots up to "now" and
+`fast_forward()` jumps them ahead by an arbitrary number of seconds.
+
+A slot can also be watched for a condition on its state (`watch()`). While a
+watch is pending, the slot's catch-up runs exactly and pauses on the first
+tick the condition holds, so the watcher sees that very state.
+
+The CPU topology (clusters, core counts, per-mode frequencies) and the core
+thermal model come from the fleet's chip profile (see simulator.profiles);
+the default is the original 2 Prime + 6 Performance chip.
+"""
+import os
+import time
+from contextlib import nullcontext
+from typing import NamedTuple
+
+import numpy as np
+
+from simulator import metrics, rng
+from simulator.profiles import DEFAULT_PROFILE, MODES, SNAPDRAGON_8_ELITE, ChipProfile, get_profile
+from simulator.registers import encode_status
+
+# --- Power Modes ---
+# Modes are stored as small integer codes; MODES (defined with the chip
+# profiles, whose clusters list a frequency per mode) maps a code back to its label.
+MODE_HIGH_PERFORMANCE, MODE_BALANCE, MODE_BATTERY_SAVER, MODE_ULTRA_SAVER = range(len(MODES))
+MODE_CODES = {name: code for code, name in enumerate(MODES)}
+# Modes a client may request; the saver modes are only entered by the PMIC
+SELECTABLE_MODES = MODES[:2]
+
+# Per-mode chip physics, indexed by mode code: [battery drain %/tick, die heat °C/tick]
+# (core frequencies per mode come from the chip profile)
+MODE_TABLE = np.array([
+    [0.45, 2.2],   # High Performance
+    [0.15, 0.4],   # Balance
+    [0.05, -1.5],  # Battery Saver
+    [0.05, -1.5],  # Ultra Saver
+])
+
+# --- Thermal Governor ---
+THROTTLE_ON_TEMP = 85
+THROTTLE_OFF_TEMP = 65
+THROTTLE_HEAT = -3.5
+
+# --- PMIC Thresholds ---
+SAVER_BATTERY = 20
+ULTRA_SAVER_BATTERY = 5
+
+# --- Silicon Jitter (uniform half-widths) ---
+TEMP_JITTER = 0.5
+SPEED_JITTER = 0.03
+CORE_TEMP_JITTER = 1.0
+
+AMBIENT_FLOOR = 35
+
+# --- Factory State ---
+# Core count of the default profile
+N_CORES = SNAPDRAGON_8_ELITE.n_cores
+FACTORY_BATTERY = 100.0
+FACTORY_TEMP = 40.0
+FACTORY_MODE = MODE_BALANCE
+
+# --- Virtual Clock ---
+TICK_SECONDS = 1.0
+DEFAULT_TIME_SCALE = float(os.environ.get("SIM_TIME_SCALE", 1.0))
+# Absorbs float drift in accumulated simulated time when flooring to ticks
+_TICK_EPSILON = 1e-9
+
+# --- Jump-Ahead ---
+# Per-tick temperature jitter lands on the 0.1°C grid: round(U(-0.5, 0.5), 1)
+# takes the values -5..+5 tenths, with the two end values half as likely.
+# Variance in tenths^2: sum(v^2 * p) = 8.5
+_JITTER_TENTHS_VAR = 8.5
+# Segments up to this many ticks sum their jitter exactly instead of via the normal
+EXACT_JITTER_TICKS = 32
+
+# --- Random Lanes ---
+# Each tick's draws (see simulator.rng): die temp, then core speeds, then core
+# temps (n_cores lanes each); two more lanes after those feed the normal draw
+# of a long jump-ahead segment
+_LANE_TEMP = 0
+_LANE_CORES = 1
+
+# --- Telemetry History ---
+# Samples kept per recorded chip; once its ring is full the oldest are overwritten
+HISTORY_DEPTH = int(os.environ.get("SIM_HISTORY_DEPTH", 600))
+
+
+# --- Instrumentation (see simulator.metrics) ---
+PHYSICS_SECONDS = metrics.Histogram(
+    "sim_physics_seconds", "Wall time of one physics call (a call may cover many chips)", ("op",))
+PHYSICS_TICKS = metrics.Counter("sim_physics_ticks_total", "Chip-ticks simulated", ("op",))
+THROTTLE_ONSETS = metrics.Counter("sim_throttle_onsets_total", "Times a chip entered thermal throttling")
+_STEP_SECONDS, _ADVANCE_SECONDS = PHYSICS_SECONDS.labels("step"), PHYSICS_SECONDS.labels("advance")
+_STEP_TICKS, _ADVANCE_TICKS = PHYSICS_TICKS.labels("step"), PHYSICS_TICKS.labels("advance")
+
+
+class _Trace(NamedTuple):
+    """Per-tick state of one slot across a jump segment, shaped like fleet columns for watch conditions."""
+    battery: np.ndarray
+    global_temp: np.ndarray
+    power_mode: np.ndarray
+    is_throttling: np.ndarray
+    ticks: np.ndarray
+
+
+def fleet_fields(profile: ChipProfile) -> tuple:
+    """Column layout of a fleet of `profile` chips: (name, dtype, per-slot shape)."""
+    cores = (profile.n_cores,)
+    fields = (
+        ("battery", np.float64, ()),
+        ("global_temp", np.float64, ()),
+        ("core_speed", np.float64, cores),
+        ("core_temp", np.float64, cores),
+        ("power_mode", np.int8, ()),
+        ("is_throttling", np.bool_, ()),
+        ("active", np.bool_, ()),
+        # Virtual clock
+        ("ticks", np.int64, ()),
+        ("sim_time", np.float64, ()),
+        ("synced_at", np.float64, ()),
+        ("time_scale", np.float64, ()),
+        # Bumped whenever a command changes state outside a tick (mode switch, reboot)
+        ("revision", np.int64, ()),
+        # Key of the chip's counter-based random stream
+        ("rng_key", np.uint64, ()),
+        # Row of the chip's ring in Fleet.history_ring(), -1 while its history
+        # isn't being recorded (see Fleet.track_history)
+        ("hist_row", np.int32, ()),
+    )
+    if profile.network is not None:
+        # RC core node temperatures, unrounded (core_temp reports them on the 0.1°C grid)
+        fields += (("node_temp", np.float64, cores),)
+    return fields
+
+
+def history_fields(n_cores: int, depth: int = HISTORY_DEPTH) -> tuple:
+    """
+    Column layout of a HistoryRing: (name, dtype, per-row shape). Values
+    already sit on a 0.01 or 0.1 grid, so they're stored losslessly as small
+    integers in those units.
+    """
+    return (
+        ("count", np.int64, ()),  # samples recorded since the row was claimed or its chip reset
+        ("tick", np.int64, (depth,)),
+        ("battery", np.uint16, (depth,)),  # 0.01 %
+        ("temp", np.int16, (depth,)),  # 0.1 °C
+        ("mode", np.int8, (depth,)),
+        ("throttling", np.bool_, (depth,)),
+        ("core_speed", np.uint16, (depth, n_cores)),  # 0.01 GHz
+        ("core_temp", np.int16, (depth, n_cores)),  # 0.1 °C
+    )
+
+
+def columns_nbytes(fields, capacity: int) -> int:
+    """Size of a byte buffer holding every column of `fields` for `capacity` rows (see carve_columns)."""
+    return sum((capacity * np.dtype(dtype).itemsize * int(np.prod(shape)) + 7) & ~7 for _, dtype, shape in fields)
+
+
+def carve_columns(fields, buffer: np.ndarray, capacity: int) -> dict:
+    """Column views of `buffer` for `capacity` slots: columns back to back, each 8-byte aligned."""
+    columns = {}
+    offset = 0
+    for name, dtype, shape in fields:
+        columns[name] = np.ndarray((capacity,) + shape, dtype=dtype, buffer=buffer, offset=offset)
+        offset += (capacity * np.dtype(dtype).itemsize * int(np.prod(shape)) + 7) & ~7
+    return columns
+
+
+class Fleet:
+    """
+    Structure-of-arrays store for a fleet of simulated chips.
+
+    Every per-chip field is a NumPy column carved out of one contiguous byte
+    buffer, so the whole fleet can be stepped, copied or persisted in bulk.
+    Slots are handed out by `allocate()` and recycled by `release()`; the
+    buffer doubles in size whenever it runs out of free slots. Every chip in
+    a fleet shares one chip profile, which sizes the per-core columns.
+    """
+
+    # Columns subclasses add after the profile's (see fleet_fields)
+    EXTRA_FIELDS = ()
+
+    def __init__(self, capacity: int = 1024, seed=None, time_scale: float = DEFAULT_TIME_SCALE, wall=time.monotonic,
+                 profile=None):
+        # A ChipProfile or a registered profile name (default: SIM_CHIP_PROFILE)
+        self.profile = profile if isinstance(profile, ChipProfile) else get_profile(profile or DEFAULT_PROFILE)
+        self.n_cores = self.profile.n_cores
+        self.fields = fleet_fields(self.profile) + self.EXTRA_FIELDS
+        # Random lanes per tick: die temp, then a speed and (lumped cores only) a temp lane per core
+        self.tick_lanes = 1 + (1 if self.profile.network is not None else 2) * self.n_cores
+        self._lane_jump_normal = 1 + 2 * self.n_cores
+        # Only used to pick keys for chips allocated without an explicit seed
+        self.rng = np.random.default_rng(seed)
+        # Clock settings: new chips run at default_time_scale x the `wall` clock
+        self.default_time_scale = time_scale
+        self.wall = wall
+        # Optional memory-mapped status register file, written after every tick
+        self.registers = None
+        # slot -> run recorder journaling that chip's physics (see simulator.replay)
+        self.recorders = {}
+        # slot -> [(condition, callback)] pending watches (see watch())
+        self.watches = {}
+        # Telemetry history of the chips being recorded; made on first use (see history_ring())
+        self._history = None
+        self.capacity = 0
+        self._free = []
+        self._allocate_buffer(max(1, capacity))
+
+    # --- Buffer Management ---
+
+    def slot_nbytes(self) -> int:
+        """Bytes of column storage used by a single slot."""
+        return sum(np.dtype(dtype).itemsize * int(np.prod(shape)) for _, dtype, shape in self.fields)
+
+    def buffer_nbytes(self, capacity: int) -> int:
+        """Size of the byte buffer holding every column for `capacity` slots."""
+        return columns_nbytes(self.fields, capacity)
+
+    def _carve(self, buffer: np.ndarray, capacity: int):
+        """Points every column at its region of `buffer` (see carve_columns)."""
+        for name, column in carve_columns(self.fields, buffer, capacity).items():
+            setattr(self, name, column)
+        self.buffer = buffer
+        self.capacity = capacity
+
+    def _allocate_buffer(self, capacity: int):
+        old_capacity = self.capacity
+        old_columns = {name: getattr(self, name) for name, _, _ in self.fields} if old_capacity else {}
+
+        # 1. Carve a fresh buffer and carry over the old rows
+        self._carve(np.zeros(self.buffer_nbytes(capacity), dtype=np.uint8), capacity)
+        for name, column in old_columns.items():
+            getattr(self, name)[:old_capacity] = column
+
+        # 2. New slots go on the free list, lowest slot first
+        self._free.extend(range(capacity - 1, old_capacity - 1, -1))
+
+    def adopt_buffer(self, buffer: np.ndarray, capacity: int, used: int):
+        """
+        Makes `buffer` (laid out for `capacity` slots) the fleet's storage, with
+        its first `used` slots live, e.g. a snapshot mapped copy-on-write.
+        Nothing is copied, so only an empty fleet can adopt a buffer.
+        """
+        if len(self):
+            raise RuntimeError("Only an empty fleet can adopt a buffer")
+        if buffer.nbytes != self.buffer_nbytes(capacity):
+            raise ValueError(f"Buffer holds {buffer.nbytes} bytes; {capacity} slots need {self.buffer_nbytes(capacity)}")
+        self._carve(buffer, capacity)
+        self._free = list(range(capacity - 1, used - 1, -1))
+        # History rings aren't part of the buffer, so adopted chips start without one
+        self.hist_row[:used] = -1
+        self._publish_registers(np.arange(used))
+
+    def load_rows(self, columns: dict, count: int) -> np.ndarray:
+        """Claims `count` free slots and copies the first `count` rows of every column into them."""
+        while len(self._free) < count:
+            self._allocate_buffer(self.capacity * 2)
+        slots = np.array(self._free[len(self._free) - count:][::-1], dtype=np.intp)
+        del self._free[len(self._free) - count:]
+        for name, _, _ in self.fields:
+            getattr(self, name)[slots] = columns[name][:count]
+        self.hist_row[slots] = -1
+        self._publish_registers(slots)
+        return slots
+
+    def allocate(self, seed=None) -> int:
+        """
+        Claims a free slot, resets it to factory state and returns its index.
+        `seed` fixes the chip's random stream; by default a fresh key is drawn.
+        """
+        if not self._free:
+            self._allocate_buffer(self.capacity * 2)
+        slot = self._free.pop()
+        self._init_slot(slot, seed)
+        return slot
+
+    def _init_slot(self, slot: int, seed=None):
+        self.rng_key[slot] = self.new_key() if seed is None else seed
+        self.hist_row[slot] = -1
+        self.reset(slot)
+        self.time_scale[slot] = self.default_time_scale
+        self.active[slot] = True
+
+    def new_key(self) -> int:
+        return int(self.rng.integers(0, 2**64, dtype=np.uint64))
+
+    def release(self, slot: int):
+        """Returns a slot to the free list. Its data is left as-is until reused."""
+        if self.active[slot]:
+            self.active[slot] = False
+            self._free.append(slot)
+            self._drop_slot(slot)
+
+    def _drop_slot(self, slot: int):
+        if self.registers is not None:
+            self.registers.clear(slot)
+        recorder = self.recorders.pop(slot, None)
+        if recorder is not None:
+            recorder.close()
+        self.watches.pop(slot, None)
+        row = int(self.hist_row[slot])
+        if row >= 0:
+            self.hist_row[slot] = -1
+            self.history_ring().release(row)
+
+    def reset(self, slots):
+        """Restores the given slot(s) to a fresh factory state (like a reboot)."""
+        self.battery[slots] = FACTORY_BATTERY
+        self.global_temp[slots] = FACTORY_TEMP
+        self.power_mode[slots] = FACTORY_MODE
+        self.is_throttling[slots] = False
+        self.core_speed[slots] = self.profile.freq_table[FACTORY_MODE]
+        self.core_temp[slots] = FACTORY_TEMP
+        if self.profile.network is not None:
+            self.node_temp[slots] = FACTORY_TEMP
+        self.revision[slots] += 1
+        # A reboot restarts the chip's clock but keeps its time scale
+        self.ticks[slots] = 0
+        self.sim_time[slots] = 0.0
+        self.synced_at[slots] = self.wall()
+        # History restarts with the factory state as its first sample
+        idx = np.atleast_1d(np.asarray(slots, dtype=np.intp))
+        self._record(idx, restart=True)
+        self._publish_registers(idx)
+        self._journal(idx, "reboot")
+
+    def locked(self, slots):
+        """
+        Context manager guarding a read-modify-write of the given slots.
+        A process-local fleet needs no locking; shared fleets override this.
+        """
+        return nullcontext()
+
+    def rows(self, slots) -> "FleetRows":
+        """Copies the current state of the given slots (see FleetRows)."""
+        return FleetRows(self, self._resolve(slots))
+
+    def active_slots(self) -> np.ndarray:
+        return np.flatnonzero(self.active)
+
+    def __len__(self) -> int:
+        return self.capacity - len(self._free)
+
+    def _resolve(self, slots) -> np.ndarray:
+        if slots is None:
+            return self.active_slots()
+        return np.atleast_1d(np.asarray(slots, dtype=np.intp))
+
+    # --- Physics ---
+
+    def _tick_rules(self, idx: np.ndarray):
+        """
+        Applies the start-of-tick rules to the given slots and returns
+        (mode, throttling, core targets in GHz, drain, heat) for the coming tick.
+        """
+        battery = self.battery[idx]
+        temp = self.global_temp[idx]
+
+        # 1. Logic for Power Modes (PMIC override)
+        mode = self.power_mode[idx]
+        mode = np.where(battery <= ULTRA_SAVER_BATTERY, MODE_ULTRA_SAVER,
+                        np.where(battery <= SAVER_BATTERY, MODE_BATTERY_SAVER, mode)).astype(np.int8)
+        drain, heat = MODE_TABLE[mode].T
+
+        # 2. Thermal Throttling Governor (with hysteresis)
+        throttling = (temp > THROTTLE_ON_TEMP) | (self.is_throttling[idx] & ~(temp < THROTTLE_OFF_TEMP))
+        targets = np.where(throttling[:, None], self.profile.throttle_freqs, self.profile.freq_table[mode])
+        heat = np.where(throttling, THROTTLE_HEAT, heat)
+        return mode, throttling, targets, drain, heat
+
+    def _sample_cores(self, idx: np.ndarray, targets, temp, draws: np.ndarray):
+        """Sets core speeds and temperatures from `draws`, the tick's core lanes (speeds, then temps)."""
+        n = self.n_cores
+        self.core_speed[idx] = np.round(targets + (2 * draws[:, :n] - 1) * SPEED_JITTER, 2)
+        if self.profile.network is None:
+            # Lumped: every core reads the die temperature plus sensor noise
+            self.core_temp[idx] = np.round(temp[:, None] + (2 * draws[:, n:] - 1) * CORE_TEMP_JITTER, 1)
+        else:
+            self.core_temp[idx] = np.round(self.node_temp[idx], 1)
+
+    def step(self, slots=None) -> np.ndarray:
+        """
+        Advances the given slots (default: every active chip) by one tick.
+        Returns the slot indices that were stepped.
+        """
+        idx = self._resolve(slots)
+        if idx.size == 0:
+            return idx
+        start = time.perf_counter()
+        self._journal(idx, "step")
+
+        mode, throttling, targets, drain, heat = self._tick_rules(idx)
+
+        # 3. Apply changes with Silicon Jitter (all of the tick's draws in one batch)
+        draws = rng.uniform(self.rng_key[idx], self.ticks[idx], self.tick_lanes)
+        jitter = (2 * draws[:, _LANE_TEMP] - 1) * TEMP_JITTER
+        battery = np.maximum(0, np.round(self.battery[idx] - drain, 2))
+        temp = np.maximum(AMBIENT_FLOOR, np.round(self.global_temp[idx] + heat + jitter, 1))
+
+        # 4. Scatter the results back into the fleet columns
+        self.battery[idx] = battery
+        self.global_temp[idx] = temp
+        self.power_mode[idx] = mode
+        self._set_throttling(idx, throttling)
+        network = self.profile.network
+        if network is not None:
+            self.node_temp[idx] = network.step(self.node_temp[idx], self.profile.power(targets), temp)
+        self._sample_cores(idx, targets, temp, draws[:, _LANE_CORES:])
+        self.ticks[idx] += 1
+        self._record(idx)
+        self._publish_registers(idx)
+        if self.watches:
+            self.check_watches(idx)
+        _STEP_TICKS.inc(idx.size)
+        _STEP_SECONDS.observe(time.perf_counter() - start)
+        return idx
+
+    def _set_throttling(self, idx: np.ndarray, throttling: np.ndarray):
+        THROTTLE_ONSETS.inc(int(np.count_nonzero(throttling & ~self.is_throttling[idx])))
+        self.is_throttling[idx] = throttling
+
+    # --- Jump-Ahead ---
+
+    def advance(self, slots, ticks, exact: bool = False) -> np.ndarray:
+        """
+        Advances each slot by `ticks` physics ticks (a scalar or one count per
+        slot) without stepping through them one by one.
+
+        Between threshold crossings the model is piecewise linear: battery
+        drains by a constant, temperature moves by a constant heat delta plus
+        bounded jitter. Each pass therefore works out, per chip, the longest
+        run of ticks in which no rule can change its outcome:
+
+        - the next PMIC battery threshold (exact, battery is deterministic)
+        - the throttle on/off temperature, using the worst-case jitter bound
+        - the 35°C floor, so the clamp never fires mid-segment
+
+        and jumps the whole run at once. The jitter over a run is the sum of
+        the per-tick 0.1°C-grid jitter: drawn exactly for short runs and from
+        its matching normal distribution for long ones. Chips close to a
+        threshold fall back to exact single ticks until they're clear of it.
+
+        `exact` draws every tick's jitter however long the run, which reaches
+        the very state stepping would. Watched slots always run exactly until
+        their watches have fired.
+        """
+        idx = self._resolve(slots)
+        remaining = np.broadcast_to(np.asarray(ticks, dtype=np.int64), idx.shape)
+        idx, remaining = idx[remaining > 0], remaining[remaining > 0]
+        if idx.size == 0:
+            return idx
+        start = time.perf_counter()
+        _ADVANCE_TICKS.inc(int(remaining.sum()))
+        if self.watches:
+            # Only the watched slots leave the vectorized path
+            watched = self._watched(idx)
+            if watched.any():
+                remaining[watched] -= self._advance_watched(idx[watched], remaining[watched])
+                idx, remaining = idx[remaining > 0], remaining[remaining > 0]
+        self._journal(idx, "advance", remaining, exact)
+        while idx.size:
+            jumped = self._jump(idx, remaining, exact)
+            remaining = remaining - jumped
+            idx, remaining = idx[remaining > 0], remaining[remaining > 0]
+        _ADVANCE_SECONDS.observe(time.perf_counter() - start)
+        return idx
+
+    def _segment(self, idx: np.ndarray, remaining: np.ndarray):
+        """
+        Length of each slot's next rule-stable segment (at most `remaining`),
+        with the tick rules that hold across it and the floor-pinned mask.
+        """
+        battery = self.battery[idx]
+        temp = self.global_temp[idx]
+        rules = self._tick_rules(idx)
+        mode, throttling, targets, drain, heat = rules
+
+        # 1. Battery works in exact hundredths; count ticks until the next PMIC threshold
+        battery_c = np.rint(battery * 100).astype(np.int64)
+        drain_c = np.rint(drain * 100).astype(np.int64)
+        threshold_c = np.select([mode == MODE_ULTRA_SAVER, mode == MODE_BATTERY_SAVER],
+                                [-1, ULTRA_SAVER_BATTERY * 100], SAVER_BATTERY * 100)
+        k = np.where(mode == MODE_ULTRA_SAVER, remaining, -((threshold_c - battery_c) // drain_c))
+        k = np.minimum(k, remaining)
+
+        # 2. Throttle state must hold at the start of every tick inside the segment
+        up, down = heat + TEMP_JITTER, heat - TEMP_JITTER
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k_on = np.where(up > 0, np.floor((THROTTLE_ON_TEMP - temp) / up + _TICK_EPSILON) + 1, np.inf)
+            k_off = np.where(down < 0, np.floor((temp - THROTTLE_OFF_TEMP) / -down + _TICK_EPSILON) + 1, np.inf)
+            # 3. ...and the temperature must stay off the 35°C floor so the clamp never fires
+            k_floor = np.where(down < 0, np.floor((temp - AMBIENT_FLOOR) / -down + _TICK_EPSILON), np.inf)
+        # A chip already sitting on the floor with net cooling stays pinned there exactly
+        pinned = ~throttling & (up <= 0) & (temp <= AMBIENT_FLOOR + _TICK_EPSILON)
+        k_floor = np.where(pinned, np.inf, k_floor)
+
+        k_temp = np.minimum(np.where(throttling, k_off, k_on), k_floor)
+        k = np.maximum(1, np.minimum(k, k_temp)).astype(np.int64)
+        return k, rules, pinned
+
+    def _jump(self, idx: np.ndarray, remaining: np.ndarray, exact: bool = False) -> np.ndarray:
+        """Advances each slot by one rule-stable segment. Returns the ticks taken per slot."""
+        n = idx.size
+        k, rules, pinned = self._segment(idx, remaining)
+
+        # 4. Aggregate jitter in 0.1°C units: exact sums for short runs (the very
+        # draws stepping would make), normal for long ones
+        key, tick = self.rng_key[idx], self.ticks[idx]
+        short = (k <= EXACT_JITTER_TICKS) | exact
+        jitter = np.empty(n)
+        k_short, k_long = k[short], k[~short]
+        width = int(k_short.max(initial=0))
+        counters = tick[short][:, None] + np.arange(width)
+        draws = rng.uniform(key[short][:, None], counters, 1, _LANE_TEMP)[..., 0]
+        tenths = np.rint((2 * draws - 1) * TEMP_JITTER * 10)
+        tenths[np.arange(width) >= k_short[:, None]] = 0
+        jitter[short] = tenths.sum(axis=1)
+        normal = rng.standard_normal(key[~short], tick[~short], self._lane_jump_normal)
+        jitter[~short] = np.clip(np.rint(normal * np.sqrt(_JITTER_TENTHS_VAR * k_long)), -5 * k_long, 5 * k_long)
+        path = None
+        if self.profile.network is not None:
+            # The RC network follows the short segments' exact die path tick by tick
+            path = np.zeros((n, max(width, 1)))
+            path[short, :width] = np.cumsum(tenths, axis=1)
+        self._end_segment(idx, k, rules, pinned, jitter, path, short)
+        return k
+
+    @staticmethod
+    def _segment_temp(temp, steps, heat, jitter, pinned):
+        """Temperature `steps` ticks into a segment whose jitter summed to `jitter` tenths of a degree."""
+        new_temp = np.round(temp + steps * heat + jitter / 10, 1)
+        return np.where(pinned, AMBIENT_FLOOR, np.maximum(AMBIENT_FLOOR, new_temp))
+
+    def _end_segment(self, idx: np.ndarray, k: np.ndarray, rules, pinned: np.ndarray, jitter: np.ndarray,
+                     path: np.ndarray = None, exact_path: np.ndarray = None):
+        """
+        Scatters the state at the end of a k-tick segment; cores reflect the
+        segment's last tick. `path` holds each slot's cumulative die jitter
+        (tenths) per tick where known (`exact_path`), for the RC network.
+        """
+        mode, throttling, targets, drain, heat = rules
+        battery_c = np.rint(self.battery[idx] * 100).astype(np.int64)
+        drain_c = np.rint(drain * 100).astype(np.int64)
+        temp = self.global_temp[idx]
+        new_temp = self._segment_temp(temp, k, heat, jitter, pinned)
+        key, tick = self.rng_key[idx], self.ticks[idx]
+
+        self.battery[idx] = np.maximum(0, battery_c - k * drain_c) / 100
+        self.global_temp[idx] = new_temp
+        self.power_mode[idx] = mode
+        self._set_throttling(idx, throttling)
+        if self.profile.network is not None:
+            self._network_segment(idx, k, targets, temp, new_temp, heat, pinned, path, exact_path)
+        core_draws = rng.uniform(key, tick + k - 1, self.tick_lanes - 1, _LANE_CORES)
+        self._sample_cores(idx, targets, new_temp, core_draws)
+        self.ticks[idx] += k
+        # A jumped segment leaves one history sample: its end state
+        self._record(idx)
+        self._publish_registers(idx)
+
+    def _network_segment(self, idx: np.ndarray, k: np.ndarray, targets, temp, end_temp, heat, pinned,
+                         path: np.ndarray = None, exact_path: np.ndarray = None):
+        """
+        Carries the RC core network across a k-tick segment (core power is
+        constant within it). Slots with an exact die path step the network
+        through every tick, reaching the state stepping would. The others only
+        step its last `settle_ticks`, starting from the steady state at the die
+        temperature there, with the die temperature interpolated linearly; by
+        then the network has forgotten where it started.
+        """
+        network = self.profile.network
+        power = self.profile.power(targets)
+        nodes = self.node_temp[idx]
+        n = idx.size
+        exact_path = np.zeros(n, dtype=bool) if exact_path is None else exact_path
+        run = np.where(exact_path, k, np.minimum(k, network.settle_ticks))
+        skip = k - run
+        rows = np.arange(n)
+
+        def die_after(j):
+            linear = temp + (end_temp - temp) * j / k
+            if path is None:
+                return linear
+            tenths = path[rows, np.clip(j - 1, 0, path.shape[1] - 1)]
+            return np.where(exact_path, self._segment_temp(temp, j, heat, tenths, pinned), linear)
+
+        settled = skip > 0
+        if settled.any():
+            nodes[settled] = network.steady_state(power[settled], die_after(skip)[settled])
+        for step in range(int(run.max(initial=0))):
+            live = step < run
+            nodes[live] = network.step(nodes[live], power[live], die_after(skip + step + 1)[live])
+        self.node_temp[idx] = nodes
+
+    # --- Watches ---
+
+    def watch(self, slot: int, condition, callback):
+        """
+        Calls `callback()` once, at the first tick where `condition(columns,
+        slots) -> mask` (a selector, see simulator.selectors) holds for the
+        slot; the fleet holds that tick's state during the call. Watches are
+        process-local and dropped with the slot.
+        """
+        self.watches.setdefault(slot, []).append((condition, callback))
+
+    def unwatch(self, slot: int, callback):
+        pending = [w for w in self.watches.get(slot, ()) if w[1] is not callback]
+        if pending:
+            self.watches[slot] = pending
+        else:
+            self.watches.pop(slot, None)
+
+    def _watched(self, idx: np.ndarray) -> np.ndarray:
+        """Mask of the slots in idx that have pending watches."""
+        return np.isin(idx, np.fromiter(self.watches, dtype=np.intp, count=len(self.watches)))
+
+    def check_watches(self, slots):
+        """Fires the watches whose condition holds in the slots' current state."""
+        idx = self._resolve(slots)
+        for slot in idx[self._watched(idx)].tolist():
+            for condition, callback in self.watches.get(slot, [])[:]:
+                if condition(self, np.array([slot]))[0]:
+                    self.unwatch(slot, callback)
+                    callback()
+
+    def _advance_watched(self, idx: np.ndarray, remaining: np.ndarray) -> np.ndarray:
+        """Runs the watched slots among idx exactly until their watches fire. Returns the ticks taken per slot."""
+        taken = np.zeros_like(remaining)
+        for i, slot in enumerate(idx.tolist()):
+            start = int(self.ticks[slot])
+            while slot in self.watches and taken[i] < remaining[i]:
+                taken[i] += self._jump_watched(slot, int(remaining[i] - taken[i]))
+            recorder = self.recorders.get(slot)
+            if recorder is not None and taken[i]:
+                recorder.log("advance", start, ticks=int(taken[i]), exact=True)
+        return taken
+
+    def _jump_watched(self, slot: int, remaining: int) -> int:
+        """
+        One exact segment of a watched slot. Every tick of the segment is drawn
+        and traced, and the segment stops on the first tick one of the slot's
+        conditions holds, firing it there. Returns the ticks taken.
+        """
+        idx = np.array([slot])
+        k, rules, pinned = self._segment(idx, np.array([remaining]))
+        mode, throttling, targets, drain, heat = rules
+        n, tick = int(k[0]), int(self.ticks[slot])
+
+        draws = rng.uniform(self.rng_key[slot], tick + np.arange(n), 1, _LANE_TEMP)[:, 0]
+        jitter = np.cumsum(np.rint((2 * draws - 1) * TEMP_JITTER * 10))
+        steps = np.arange(1, n + 1)
+        battery_c = np.rint(self.battery[slot] * 100).astype(np.int64)
+        drain_c = np.rint(drain[0] * 100).astype(np.int64)
+        trace = _Trace(
+            battery=np.maximum(0, battery_c - steps * drain_c) / 100,
+            global_temp=self._segment_temp(self.global_temp[slot], steps, heat[0], jitter, pinned[0]),
+            power_mode=np.full(n, mode[0]),
+            is_throttling=np.full(n, throttling[0]),
+            ticks=tick + steps,
+        )
+
+        # Offset of the first tick each condition holds on (n: not in this segment)
+        watches = self.watches[slot]
+        hits = []
+        for condition, _ in watches:
+            mask = condition(trace, np.arange(n))
+            hits.append(int(np.argmax(mask)) if mask.any() else n)
+        first = min(hits)
+        taken = min(first + 1, n)
+
+        self._end_segment(idx, np.array([taken]), rules, pinned, jitter[taken - 1:taken], jitter[None, :taken],
+                          np.array([True]))
+        for hit, (_, callback) in zip(hits, watches[:]):
+            if hit == first < n:
+                self.unwatch(slot, callback)
+                callback()
+        return taken
+
+    # --- Virtual Clock ---
+
+    def sync(self, slots=None, now: float = None) -> np.ndarray:
+        """
+        Moves each slot's simulated time up to wall time `now` (scaled by its
+        time_scale) and runs every physics tick that fell due. Returns the slots.
+        """
+        idx = self._resolve(slots)
+        now = self.wall() if now is None else now
+        self.sim_time[idx] += (now - self.synced_at[idx]) * self.time_scale[idx]
+        self.synced_at[idx] = now
+        self._run_due_ticks(idx)
+        return idx
+
+    def fast_forward(self, slots, seconds: float) -> np.ndarray:
+        """Catches the slots up to now, then jumps them `seconds` of simulated time ahead."""
+        idx = self.sync(slots)
+        self.sim_time[idx] += seconds
+        self._run_due_ticks(idx)
+        return idx
+
+    def set_time_scale(self, slots, time_scale: float):
+        """Changes how fast simulated time runs. Time already elapsed keeps the old scale."""
+        idx = self.sync(slots)
+        self.time_scale[idx] = time_scale
+
+    def due_ticks(self, idx: np.ndarray) -> np.ndarray:
+        """Ticks each slot still owes according to its simulated time."""
+        target = np.floor(self.sim_time[idx] / TICK_SECONDS + _TICK_EPSILON).astype(np.int64)
+        return np.maximum(target - self.ticks[idx], 0)
+
+    def _run_due_ticks(self, idx: np.ndarray):
+        self.advance(idx, self.due_ticks(idx))
+
+    # --- Telemetry History ---
+
+    def history_ring(self) -> "HistoryRing":
+        """The ring recorded chips' samples go to, made when first needed."""
+        if self._history is None:
+            self._history = self._open_history()
+        return self._history
+
+    def _open_history(self) -> "HistoryRing":
+        return HistoryRing(self.n_cores)
+
+    def track_history(self, slot: int):
+        """
+        Starts recording the slot's telemetry history, its current state
+        being the first sample. Chips nobody asks about keep no history.
+        """
+        if self.hist_row[slot] < 0:
+            self.hist_row[slot] = self.history_ring().claim(slot)
+            self._record(np.array([slot], dtype=np.intp), restart=True)
+
+    def _record(self, idx: np.ndarray, restart: bool = False):
+        """
+        Appends the current state of each recorded slot to its history ring
+        (one vectorized write); `restart` empties the rings first.
+        """
+        rows = self.hist_row[idx]
+        recorded = rows >= 0
+        if not recorded.any():
+            return
+        idx, rows = idx[recorded], rows[recorded]
+        ring = self.history_ring()
+        if restart:
+            ring.count[rows] = 0
+        pos = ring.count[rows] % ring.depth
+        ring.tick[rows, pos] = self.ticks[idx]
+        ring.battery[rows, pos] = np.rint(self.battery[idx] * 100)
+        ring.temp[rows, pos] = np.rint(self.global_temp[idx] * 10)
+        ring.mode[rows, pos] = self.power_mode[idx]
+        ring.throttling[rows, pos] = self.is_throttling[idx]
+        ring.core_speed[rows, pos] = np.rint(self.core_speed[idx] * 100)
+        ring.core_temp[rows, pos] = np.rint(self.core_temp[idx] * 10)
+        ring.count[rows] += 1
+
+    # --- Run Recording ---
+
+    def journal(self, slot: int, op: str, **fields):
+        """Logs a command against one slot if a run recorder is attached to it."""
+        recorder = self.recorders.get(slot)
+        if recorder is not None:
+            recorder.log(op, int(self.ticks[slot]), **fields)
+
+    def _journal(self, idx: np.ndarray, op: str, ticks=None, exact: bool = False):
+        """Logs a physics operation for every recorded slot in idx (free when nothing records)."""
+        if not self.recorders:
+            return
+        for i, slot in enumerate(idx.tolist()):
+            if slot in self.recorders:
+                if ticks is None:
+                    self.journal(slot, op)
+                elif exact:
+                    self.journal(slot, op, ticks=int(ticks[i]), exact=True)
+                else:
+                    self.journal(slot, op, ticks=int(ticks[i]))
+
+    # --- Status Registers ---
+
+    def attach_registers(self, registers):
+        """Starts mirroring every chip's status register into a RegisterFile."""
+        self.registers = registers
+        self._publish_registers(self.active_slots())
+
+    def _publish_registers(self, idx: np.ndarray):
+        if self.registers is None or idx.size == 0:
+            return
+        values = encode_status(self.is_throttling[idx], self.battery[idx], self.core_temp[idx], ULTRA_SAVER_BATTERY)
+        self.registers.publish(idx, values)
+
+    # --- Views ---
+
+    def core_list(self, slot: int) -> list:
+        """Builds the JSON-friendly per-core list for one slot."""
+        return [
+            {"id": i, "type": label, "speed": speed, "temp": temp}
+            for i, (label, speed, temp) in enumerate(zip(self.profile.core_labels, self.core_speed[slot].tolist(),
+                                                         self.core_temp[slot].tolist()))
+        ]
+
+
+class HistoryRing:
+    """
+    Telemetry history of the chips being recorded, in columns of its own
+    (see history_fields) rather than in the fleet's buffer: `depth` samples
+    per row, the oldest overwritten first. Rows are claimed per chip and
+    double in number when they run out, like fleet slots. A ring over a
+    given `buffer` (e.g. a shared mapping) has a fixed row for every slot.
+    """
+
+    def __init__(self, n_cores: int, depth: int = HISTORY_DEPTH, capacity: int = 16, buffer: np.ndarray = None):
+        self.fields = history_fields(n_cores, depth)
+        self.depth = depth
+        self.fixed = buffer is not None
+        self.capacity = 0
+        self._free = []
+        if self.fixed:
+            self._carve(buffer, capacity)
+        else:
+            self._grow(capacity)
+
+    def _carve(self, buffer: np.ndarray, capacity: int):
+        for name, column in carve_columns(self.fields, buffer, capacity).items():
+            setattr(self, name, column)
+        self.buffer = buffer
+        self.capacity = capacity
+
+    def _grow(self, capacity: int):
+        old_capacity = self.capacity
+        old_columns = {name: getattr(self, name) for name, _, _ in self.fields} if old_capacity else {}
+        self._carve(np.zeros(columns_nbytes(self.fields, capacity), dtype=np.uint8), capacity)
+        for name, column in old_columns.items():
+            getattr(self, name)[:old_capacity] = column
+        self._free.extend(range(capacity - 1, old_capacity - 1, -1))
+
+    def claim(self, slot: int) -> int:
+        """A row for `slot`'s samples."""
+        if self.fixed:
+            return slot
+        if not self._free:
+            self._grow(self.capacity * 2)
+        return self._free.pop()
+
+    def release(self, row: int):
+        if not self.fixed:
+            self._free.append(row)
+
+    def positions(self, row: int) -> np.ndarray:
+        """Ring positions of a row's retained samples, oldest first."""
+        count = int(self.count[row])
+        return np.arange(max(0, count - self.depth), count) % self.depth
+
+
+class FleetRows:
+    """
+    A copy of some slots' current state, laid out like a fleet whose slot i
+    is `slots[i]`. Lets frames be rendered from a consistent snapshot after
+    the fleet's lock is dropped.
+    """
+
+    def __init__(self, fleet: Fleet, slots):
+        self.profile = fleet.profile
+        self.n_cores = fleet.n_cores
+        for name, _, _ in fleet.fields:
+            setattr(self, name, getattr(fleet, name)[slots])
+
+    core_list = Fleet.core_list
+
+
+# The process-wide fleet every SnapdragonSimulator lives in by default
+default_fleet = Fleet()
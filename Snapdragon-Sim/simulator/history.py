@@ -0,0 +1,99 @@
+"""
+Range queries and downsampling over a chip's telemetry history ring.
+
+Once a chip's history has been asked for (`Fleet.track_history`), the fleet
+records one sample of it after every tick into a fixed-size ring
+(`Fleet.history_ring()`). A tick-by-tick step leaves one sample per simulated
+second; a jump-ahead segment leaves a single sample for its end state. This
+module reads a slot's ring back in time order and reduces it:
+
+- `read_history()` decodes the samples inside a simulated-time range
+- `downsample()` folds them into N equal-width time buckets, reporting
+  min / max / mean per numeric field, the share of samples spent throttling
+  and the power mode at the end of each bucket
+"""
+from typing import Optional
+
+import numpy as np
+
+from simulator.fleet import TICK_SECONDS
+
+# Fields reduced to min / max / mean per bucket
+NUMERIC_FIELDS = ("battery", "global_temp", "core_speed", "core_temp")
+
+
+def read_history(fleet, slot: int, start: Optional[float] = None, end: Optional[float] = None) -> dict:
+    """
+    Returns the slot's recorded samples with start <= sim_time <= end, oldest
+    first, as a dict of NumPy columns (per-core fields are n x n_cores). A
+    slot whose history isn't being recorded has no samples.
+    """
+    row = int(fleet.hist_row[slot])
+    if row < 0:
+        return {
+            "sim_time": np.empty(0), "battery": np.empty(0), "global_temp": np.empty(0),
+            "power_mode": np.empty(0, dtype=np.int8), "is_throttling": np.empty(0, dtype=bool),
+            "core_speed": np.empty((0, fleet.n_cores)), "core_temp": np.empty((0, fleet.n_cores)),
+        }
+    ring = fleet.history_ring()
+    pos = ring.positions(row)
+    sim_time = ring.tick[row, pos] * TICK_SECONDS
+    keep = np.ones(pos.size, dtype=bool)
+    if start is not None:
+        keep &= sim_time >= start
+    if end is not None:
+        keep &= sim_time <= end
+    pos = pos[keep]
+
+    return {
+        "sim_time": sim_time[keep],
+        "battery": ring.battery[row, pos] / 100,
+        "global_temp": ring.temp[row, pos] / 10,
+        "power_mode": ring.mode[row, pos].copy(),
+        "is_throttling": ring.throttling[row, pos].copy(),
+        "core_speed": ring.core_speed[row, pos] / 100,
+        "core_temp": ring.core_temp[row, pos] / 10,
+    }
+
+
+def downsample(history: dict, buckets: int, start: Optional[float] = None, end: Optional[float] = None) -> dict:
+    """
+    Folds samples from `read_history()` into `buckets` equal-width time
+    buckets spanning [start, end] (default: the first and last sample).
+    Buckets that received no samples are left out.
+    """
+    sim_time = history["sim_time"]
+    if sim_time.size == 0:
+        empty = np.empty(0)
+        result = {"bucket_start": empty, "bucket_end": empty, "count": empty.astype(np.int64),
+                  "power_mode": empty.astype(np.int8), "throttling_ratio": empty}
+        result.update({name: {"min": empty, "max": empty, "mean": empty} for name in NUMERIC_FIELDS})
+        return result
+
+    lo = sim_time[0] if start is None else start
+    hi = sim_time[-1] if end is None else end
+    width = max(hi - lo, TICK_SECONDS) / buckets
+
+    # Samples are in time order, so each bucket is one contiguous run
+    bucket = np.minimum(((sim_time - lo) // width).astype(np.int64), buckets - 1)
+    occupied, first = np.unique(bucket, return_index=True)
+    count = np.diff(np.append(first, sim_time.size))
+    last = first + count - 1
+
+    result = {
+        "bucket_start": lo + occupied * width,
+        "bucket_end": lo + (occupied + 1) * width,
+        "count": count,
+        "power_mode": history["power_mode"][last],
+        "throttling_ratio": np.add.reduceat(history["is_throttling"].astype(np.int64), first) / count,
+    }
+    for name in NUMERIC_FIELDS:
+        values = history[name]
+        # count broadcasts over the per-core axis too
+        scale = count if values.ndim == 1 else count[:, None]
+        result[name] = {
+            "min": np.minimum.reduceat(values, first),
+            "max": np.maximum.reduceat(values, first),
+            "mean": np.add.reduceat(values, first) / scale,
+        }
+    return result
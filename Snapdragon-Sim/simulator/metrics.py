@@ -0,0 +1,233 @@
+"""
+Low-overhead instrumentation exposed in the Prometheus text format.
+
+Three metric types, each optionally split by labels:
+
+- `Counter`: a monotonically increasing total (requests, rejections, ...)
+- `Gauge`: a value that goes up and down (live sessions, subscribers, ...)
+- `Histogram`: observations (latencies) counted into fixed, cumulative
+  buckets, plus their sum and count
+
+Hot paths bind a labelled child once (`metric.labels(...)`) and then only
+pay for a perf_counter pair and a bisect per observation. Values that are
+already tracked elsewhere (session counts, eviction totals) are read through
+a callback at scrape time instead of being mirrored on every change.
+
+Metrics are per process: with `uvicorn --workers N` each worker reports its
+own, and Prometheus sums them across targets as usual.
+"""
+import bisect
+import math
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Default latency buckets (seconds): 50µs .. 10s
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    text = ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels)
+    return f"{{{text}}}" if text else ""
+
+
+class Registry:
+    """A set of metrics rendered together by one scrape."""
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+
+    def register(self, metric: "_Metric"):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional["_Metric"]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry served by /metrics
+REGISTRY = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# SIM_METRICS=0 turns every metric into a no-op (e.g. to measure the instrumentation's own cost)
+ENABLED = os.environ.get("SIM_METRICS", "1") != "0"
+
+
+class _Null:
+    """Stand-in child for disabled metrics."""
+    __slots__ = ()
+
+    def inc(self, amount: float = 1.0):
+        pass
+
+    def dec(self, amount: float = 1.0):
+        pass
+
+    def set(self, value: float):
+        pass
+
+    def observe(self, value: float):
+        pass
+
+
+_NULL = _Null()
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # label values -> child holding the value(s)
+        self._children: Dict[tuple, object] = {}
+        if not self.labelnames:
+            self._children[()] = self._make_child()
+        if registry is not None:
+            registry.register(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _make_child(self):
+        return self._new_child() if ENABLED else _NULL
+
+    def labels(self, *values):
+        """The child for one combination of label values (created on first use; bind it once in hot paths)."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}")
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._make_child()
+        return child
+
+    def _labelled(self):
+        for values, child in self._children.items():
+            if child is not _NULL:
+                yield list(zip(self.labelnames, values)), child
+
+    def samples(self) -> List[tuple]:
+        """(name suffix, [(label, value)], value) for every exposed series."""
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class _CallbackMixin:
+    """
+    Lets a counter or gauge read its value from `function` at scrape time.
+    With labels, the function returns {(label values...): value}.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY, function: Optional[Callable] = None):
+        self.function = function
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _Value()
+
+    def samples(self):
+        if self.function is None:
+            return [("", labels, child.value) for labels, child in self._labelled()]
+        if not self.labelnames:
+            return [("", [], self.function())]
+        return [("", list(zip(self.labelnames, values)), value) for values, value in self.function().items()]
+
+    # Unlabelled metrics are used directly
+    def inc(self, amount: float = 1.0):
+        self._children[()].inc(amount)
+
+
+class Counter(_CallbackMixin, _Metric):
+    type = "counter"
+
+
+class Gauge(_CallbackMixin, _Metric):
+    type = "gauge"
+
+    def set(self, value: float):
+        self._children[()].set(value)
+
+    def dec(self, amount: float = 1.0):
+        self._children[()].dec(amount)
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # counts[i]: observations in (bounds[i-1], bounds[i]]; the last slot is +Inf
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 registry: Optional[Registry] = REGISTRY, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float):
+        self._children[()].observe(value)
+
+    def samples(self):
+        samples = []
+        for labels, child in self._labelled():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                samples.append(("_bucket", labels + [("le", _format_value(bound))], cumulative))
+            samples.append(("_sum", labels, child.sum))
+            samples.append(("_count", labels, cumulative))
+        return samples
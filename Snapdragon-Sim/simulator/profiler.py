@@ -0,0 +1,217 @@
+"""
+On-demand sampling profiler for the live server process.
+
+A profile counts identical Python stacks, sampled every `interval` seconds,
+over a fixed window. Nothing is hooked into the interpreter (no tracing or
+setprofile callback), so code runs at full speed between samples, and when
+no profile is running nothing is installed at all.
+
+Two samplers, picked by what is being profiled:
+
+- `SignalSampler` (the event loop, which uvicorn runs on the main thread):
+  an interval timer raises a signal and the handler records the stack the
+  main thread was interrupted in. With the "cpu" clock (ITIMER_PROF) only
+  time spent on CPU is sampled; the "wall" clock (ITIMER_REAL) also samples
+  the loop sitting idle in the selector or blocked on a lock.
+- `ThreadSampler` (other threads): a background thread reads every thread's
+  current frame. It can only run while it holds the GIL, which the sampled
+  threads mostly hand over at blocking calls, so its samples lean towards
+  those; use it to see what worker threads are doing, not for fine CPU
+  attribution.
+
+Results come as collapsed stacks, the input format of flamegraph.pl and
+speedscope ("thread;outer;...;leaf count" per line), and as a top-N table of
+the functions with the most samples on-CPU (self) and on-stack (total).
+"""
+import asyncio
+import collections
+import os
+import signal
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+DEFAULT_INTERVAL = 0.005
+
+# Paths are shown relative to these (longest match first), to keep frame names short
+_PATH_ROOTS = sorted({os.path.dirname(os.path.dirname(os.path.abspath(__file__))), *sys.path[1:]},
+                     key=len, reverse=True)
+
+_TIMERS = {
+    "cpu": (signal.ITIMER_PROF, signal.SIGPROF),
+    "wall": (signal.ITIMER_REAL, signal.SIGALRM),
+}
+CLOCKS = tuple(_TIMERS)
+
+
+def _short_path(path: str) -> str:
+    for root in _PATH_ROOTS:
+        if root and path.startswith(root + os.sep):
+            return path[len(root) + 1:]
+    return path
+
+
+def _stack(frame) -> tuple:
+    """Code objects of `frame` and its callers, outermost first."""
+    codes = []
+    while frame is not None:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    codes.reverse()
+    return tuple(codes)
+
+
+class Profile:
+    """Stack samples collected over one profiling window."""
+
+    def __init__(self, stacks: Dict[tuple, int], duration: float, interval: float):
+        # (thread name, code objects outermost first) -> samples
+        self.stacks = stacks
+        self.duration = duration
+        self.interval = interval
+        self.samples = sum(stacks.values())
+        self._labels = {}
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            # ';' separates frames in the collapsed format
+            name = f"{code.co_qualname} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+            label = self._labels[code] = name.replace(";", ",")
+        return label
+
+    def collapsed(self) -> str:
+        """One "thread;frame;...;frame count" line per distinct stack, hottest first."""
+        lines = []
+        for (thread, codes), count in sorted(self.stacks.items(), key=lambda item: -item[1]):
+            frames = ";".join([thread.replace(";", ","), *(self._label(code) for code in codes)])
+            lines.append(f"{frames} {count}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def top(self, n: int = 20) -> List[dict]:
+        """The `n` functions with the most self samples, with their share of all samples."""
+        own = collections.Counter()
+        total = collections.Counter()
+        for (_, codes), count in self.stacks.items():
+            if not codes:
+                continue
+            own[codes[-1]] += count
+            # Recursive functions count once per stack
+            for code in set(codes):
+                total[code] += count
+        samples = self.samples or 1
+        ranked = sorted(total, key=lambda code: (-own[code], -total[code]))[:n]
+        return [
+            {
+                "function": self._label(code),
+                "self": own[code],
+                "total": total[code],
+                "self_percent": round(100 * own[code] / samples, 2),
+                "total_percent": round(100 * total[code] / samples, 2),
+            }
+            for code in ranked
+        ]
+
+
+class _Sampler:
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self.running = False
+        self._stacks = collections.Counter()
+        self._started = 0.0
+
+    def start(self):
+        if self.running:
+            raise RuntimeError("Profiler is already running")
+        self._stacks.clear()
+        self._started = time.perf_counter()
+        self._install()
+        self.running = True
+
+    def stop(self) -> Profile:
+        self._uninstall()
+        self.running = False
+        return Profile(dict(self._stacks), time.perf_counter() - self._started, self.interval)
+
+    def _install(self):
+        raise NotImplementedError
+
+    def _uninstall(self):
+        raise NotImplementedError
+
+
+class SignalSampler(_Sampler):
+    """Samples the main thread from an interval-timer signal; start and stop it on the main thread."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, clock: str = "cpu"):
+        super().__init__(interval)
+        self.timer, self.signum = _TIMERS[clock]
+        self._previous = None
+
+    def _install(self):
+        # signal.signal raises ValueError off the main thread
+        self._previous = signal.signal(self.signum, self._sample)
+        signal.setitimer(self.timer, self.interval, self.interval)
+
+    def _uninstall(self):
+        signal.setitimer(self.timer, 0)
+        signal.signal(self.signum, self._previous)
+
+    def _sample(self, signum, frame):
+        self._stacks["MainThread", _stack(frame)] += 1
+
+
+class ThreadSampler(_Sampler):
+    """Samples `thread_ids` (None: every thread but its own) from a background thread."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, thread_ids: Optional[tuple] = None):
+        super().__init__(interval)
+        self.thread_ids = thread_ids
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _install(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="sim-profiler", daemon=True)
+        self._thread.start()
+
+    def _uninstall(self):
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (self.thread_ids is not None and ident not in self.thread_ids):
+                    continue
+                name = names.get(ident)
+                if name is None:
+                    names.update((thread.ident, thread.name) for thread in threading.enumerate())
+                    name = names.setdefault(ident, f"thread-{ident}")
+                self._stacks[name, _stack(frame)] += 1
+
+
+async def profile_for(seconds: float, interval: float = DEFAULT_INTERVAL, all_threads: bool = False,
+                      clock: str = "cpu") -> Profile:
+    """
+    Profiles the process for `seconds` without blocking the event loop.
+    By default only the loop's own thread is sampled, since that is where
+    requests are served (by timer signal when it is the main thread, else
+    by thread sampling); `all_threads` samples every thread instead.
+    """
+    if all_threads:
+        sampler = ThreadSampler(interval)
+    elif threading.current_thread() is threading.main_thread():
+        sampler = SignalSampler(interval, clock)
+    else:
+        sampler = ThreadSampler(interval, (threading.get_ident(),))
+    sampler.start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profile = sampler.stop()
+    return profile
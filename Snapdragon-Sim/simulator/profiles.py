@@ -0,0 +1,224 @@
+"""
+Chip profiles: the CPU topology and core thermal model of a simulated SoC.
+
+A profile lists the chip's clusters in core order. Each cluster has a core
+count, a target frequency per power mode, its throttled frequency and a
+dynamic-power coefficient. A profile can also have an RC thermal network
+for its cores. Profiles are looked up by name in a registry, and every chip
+in a Fleet shares one profile: the fleet's per-core columns are sized by its
+core count.
+
+Two core thermal models:
+
+- Lumped (no network): each core reads the die temperature plus sensor
+  noise. This is the original Snapdragon 8 Elite model and stays the default.
+- RC network: every core is a thermal node with heat capacity C, heated by
+  its own power draw (P = k f^3 at its target frequency f) and joined by
+  conductances to its floorplan neighbours, to the die and to ambient:
+
+      C dT/dt = P - sum_j g_core (T - T_j) - g_die (T - T_die) - g_amb (T - T_amb)
+
+  The die temperature keeps its per-mode law, because the governor, the
+  PMIC rules and jump-ahead are all built on it. In the network it is a
+  boundary node, like ambient. Each tick is one backward-Euler step, which
+  is stable for any conductances:
+
+      (C/dt + G) T' = C/dt T + P + g_die T_die + g_amb T_amb
+
+  G (core-to-core Laplacian plus the die and ambient terms) is sparse, but
+  it is also constant. Its system matrix is therefore inverted once per
+  profile, and a tick of the whole fleet becomes one (chips x cores) @
+  (cores x cores) product.
+
+Profiles can be registered from code (`register_profile`) or loaded from a
+JSON spec (`profile_from_dict`). SIM_CHIP_PROFILE picks the default profile
+by name or by the path of a .json spec.
+"""
+import enum
+import json
+import math
+import os
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Power modes, in the order every cluster lists its target frequencies
+# (fleets store a chip's mode as its index in this tuple)
+MODES = ("High Performance", "Balance", "Battery Saver", "Ultra Saver")
+
+# Network modes (eigenvalues of the per-tick transition) decay below this
+# before a long jump-ahead starts the network from its steady state
+SETTLE_TOLERANCE = 1e-6
+# Most ticks a jump-ahead segment steps the network through (its tail)
+MAX_SETTLE_TICKS = 256
+
+
+class Cluster(NamedTuple):
+    """A run of identical cores."""
+    name: str  # label in telemetry frames, e.g. "Prime"
+    cores: int
+    freqs: Tuple[float, ...]  # target GHz per power mode, in MODES order
+    throttle_freq: float  # GHz while the thermal governor throttles
+    watts_per_ghz3: float = 0.06  # dynamic power P = k f^3 (RC network only)
+
+
+class ThermalNetwork(NamedTuple):
+    """Lumped RC parameters shared by every core node (SI units; one tick = `dt` seconds)."""
+    columns: int  # floorplan: cores laid out row-major on a grid this wide
+    capacitance: float = 2.0  # J/K per core
+    core_to_core: float = 0.5  # W/K between grid neighbours
+    core_to_die: float = 1.0  # W/K
+    core_to_ambient: float = 0.05  # W/K
+    ambient: float = 25.0  # °C
+
+
+class ChipProfile:
+    """A validated profile with its per-core tables (and network solver) precomputed."""
+
+    def __init__(self, name: str, chipset: str, clusters: Tuple[Cluster, ...],
+                 thermal: Optional[ThermalNetwork] = None, dt: float = 1.0):
+        if not clusters or any(c.cores < 1 for c in clusters):
+            raise ValueError(f"{name}: every profile needs at least one cluster of at least one core")
+        if len({len(c.freqs) for c in clusters}) != 1:
+            raise ValueError(f"{name}: clusters list different numbers of frequencies")
+        if len(clusters[0].freqs) != len(MODES):
+            raise ValueError(f"{name}: every cluster needs a frequency for each of the {len(MODES)} power modes")
+        if len({c.name for c in clusters}) != len(clusters):
+            raise ValueError(f"{name}: cluster names label core types, so they must be unique")
+        self.name = name
+        self.chipset = chipset
+        self.clusters = tuple(clusters)
+        self.thermal = thermal
+
+        # Core types: an IntEnum named after the clusters, in profile order
+        # (e.g. CoreType.Prime == 0). Cores store them as small ints; the
+        # labels only appear in serialized frames.
+        self.core_types = enum.IntEnum("CoreType", [(c.name, i) for i, c in enumerate(clusters)])
+
+        # Per-core tables, by core id
+        self.core_cluster = np.repeat(np.array(list(self.core_types), dtype=np.uint8), [c.cores for c in clusters])
+        self.n_cores = self.core_cluster.size
+        self.core_labels = tuple(self.core_types(t).name for t in self.core_cluster.tolist())
+        # [mode, core] -> target GHz
+        self.freq_table = np.array([c.freqs for c in clusters]).T[:, self.core_cluster]
+        self.throttle_freqs = np.array([c.throttle_freq for c in clusters])[self.core_cluster]
+        self.power_coeffs = np.array([c.watts_per_ghz3 for c in clusters])[self.core_cluster]
+        self.network = RCNetwork(thermal, self.n_cores, dt) if thermal is not None else None
+
+    def power(self, freqs: np.ndarray) -> np.ndarray:
+        """Watts dissipated by cores running at `freqs` GHz."""
+        return self.power_coeffs * freqs ** 3
+
+    def describe(self) -> dict:
+        """JSON-friendly summary of the topology."""
+        return {
+            "name": self.name,
+            "chipset": self.chipset,
+            "cores": self.n_cores,
+            "clusters": [c._asdict() for c in self.clusters],
+            "thermal": self.thermal._asdict() if self.thermal is not None else None,
+        }
+
+    def __repr__(self):
+        return f"ChipProfile({self.name!r}, {self.n_cores} cores)"
+
+
+def grid_conductance(n_cores: int, columns: int, core_to_core: float) -> np.ndarray:
+    """Core-to-core conductance Laplacian for cores laid out row-major on a grid."""
+    ids = np.arange(n_cores)
+    right = ids[(ids % columns < columns - 1) & (ids + 1 < n_cores)]
+    down = ids[ids + columns < n_cores]
+    a = np.concatenate([right, down])
+    b = np.concatenate([right + 1, down + columns])
+    laplacian = np.zeros((n_cores, n_cores))
+    laplacian[a, b] = laplacian[b, a] = -core_to_core
+    laplacian[ids, ids] = -laplacian.sum(axis=1)
+    return laplacian
+
+
+class RCNetwork:
+    """Backward-Euler solver for a profile's core RC network, batched over chips."""
+
+    def __init__(self, spec: ThermalNetwork, n_cores: int, dt: float):
+        if spec.columns < 1 or min(spec.capacitance, spec.core_to_die + spec.core_to_ambient) <= 0:
+            raise ValueError("RC network needs columns >= 1, a positive capacitance and a path to die or ambient")
+        self.spec = spec
+        # G: the full conductance matrix, sparse in structure (neighbours + diagonal)
+        self.conductance = grid_conductance(n_cores, spec.columns, spec.core_to_core)
+        self.conductance[np.diag_indices(n_cores)] += spec.core_to_die + spec.core_to_ambient
+        self.c_dt = spec.capacitance / dt
+        # (C/dt + G)^-1 and G^-1, both symmetric, so they apply from the right as-is
+        self.system = np.linalg.inv(self.c_dt * np.eye(n_cores) + self.conductance)
+        self.steady = np.linalg.inv(self.conductance)
+        # Slowest mode of the per-tick transition C/dt (C/dt + G)^-1 bounds how long the network remembers
+        rho = float(np.max(np.abs(np.linalg.eigvalsh(self.c_dt * self.system))))
+        settle = math.ceil(math.log(SETTLE_TOLERANCE) / math.log(rho)) if rho > 0 else 1
+        self.settle_ticks = int(min(max(settle, 1), MAX_SETTLE_TICKS))
+
+    def _sources(self, power: np.ndarray, die: np.ndarray) -> np.ndarray:
+        spec = self.spec
+        return power + spec.core_to_ambient * spec.ambient + spec.core_to_die * np.asarray(die)[..., None]
+
+    def step(self, temps: np.ndarray, power: np.ndarray, die: np.ndarray) -> np.ndarray:
+        """Core temperatures one tick on, for (chips x cores) temps/power and each chip's die temp."""
+        return (self.c_dt * temps + self._sources(power, die)) @ self.system
+
+    def steady_state(self, power: np.ndarray, die: np.ndarray) -> np.ndarray:
+        """Core temperatures the network settles at for constant power and die temp."""
+        return self._sources(power, die) @ self.steady
+
+
+# --- Registry ---
+
+PROFILES: Dict[str, ChipProfile] = {}
+
+
+def register_profile(profile: ChipProfile) -> ChipProfile:
+    PROFILES[profile.name] = profile
+    return profile
+
+
+def profile_from_dict(spec: dict) -> ChipProfile:
+    """
+    Builds a profile from a JSON-style spec:
+
+        {"name": "mesh-16", "chipset": "Mesh 16", "thermal": {"columns": 4},
+         "clusters": [{"name": "Big", "cores": 4, "freqs": [3.6, 3.0, 1.2, 1.0], "throttle_freq": 1.8}, ...]}
+    """
+    try:
+        clusters = tuple(Cluster(**cluster) for cluster in spec["clusters"])
+        thermal = ThermalNetwork(**spec["thermal"]) if spec.get("thermal") else None
+        return ChipProfile(spec["name"], spec.get("chipset", spec["name"]), clusters, thermal)
+    except (KeyError, TypeError) as exc:
+        raise ValueError(f"Invalid chip profile spec: {exc}") from None
+
+
+def get_profile(name: str) -> ChipProfile:
+    """A registered profile by name, or one loaded from the path of a .json spec."""
+    if name in PROFILES:
+        return PROFILES[name]
+    if name.endswith(".json") and os.path.exists(name):
+        with open(name) as f:
+            return register_profile(profile_from_dict(json.load(f)))
+    raise ValueError(f"Unknown chip profile {name!r} (known: {', '.join(sorted(PROFILES))})")
+
+
+# --- Built-in Profiles ---
+
+# The original chip: 2 Prime + 6 Performance cores, cores read as die temp plus noise
+_ELITE_CLUSTERS = (
+    Cluster("Prime", 2, (4.32, 3.53, 1.20, 1.20), 1.80),
+    Cluster("Performance", 6, (3.53, 2.80, 0.80, 0.80), 1.40),
+)
+SNAPDRAGON_8_ELITE = register_profile(ChipProfile("snapdragon-8-elite", "Snapdragon 8 Elite (Gen 5)", _ELITE_CLUSTERS))
+# Same chip with per-core heat: Prime cores run hotter and warm their neighbours
+register_profile(ChipProfile("snapdragon-8-elite-rc", "Snapdragon 8 Elite (Gen 5)", _ELITE_CLUSTERS,
+                             ThermalNetwork(columns=4)))
+# Many-core mesh chips: a quarter big cores, the rest efficiency cores, on an RC floorplan
+for _cores, _columns in ((64, 8), (128, 16)):
+    register_profile(ChipProfile(f"mesh-{_cores}", f"Mesh {_cores}-core", (
+        Cluster("Big", _cores // 4, (3.80, 3.20, 1.60, 1.20), 2.00, 0.05),
+        Cluster("Efficiency", _cores - _cores // 4, (2.80, 2.20, 1.20, 0.80), 1.40, 0.02),
+    ), ThermalNetwork(columns=_columns)))
+
+DEFAULT_PROFILE = os.environ.get("SIM_CHIP_PROFILE", SNAPDRAGON_8_ELITE.name)
@@ -0,0 +1,156 @@
+"""
+Memory-mapped status register file shared with external test processes.
+
+Real firmware exposes a 16-bit status register per device; HIL rigs read it
+without going through the web API. The simulator mirrors that with one file:
+
+    header (16 bytes) | registers[capacity] | force_set[capacity] | force_clear[capacity]
+
+All three tables are little-endian uint16 arrays indexed by fleet slot, so a
+chip's register always lives at the same fixed offset. After every tick the
+fleet writes each chip's register using the layout `BitParser` decodes:
+
+- Bit 0: Overheat Interruption (chip is thermally throttling)
+- Bit 1: Low Voltage Warning (battery at or below the Ultra Saver threshold)
+- Bit 8-15: Reporting core (the hottest core)
+
+`force_set` / `force_clear` are fault-injection masks applied on top of the
+simulated value, for negative tests. Any process can map the file, read
+thousands of registers zero-copy, or inject faults by writing the masks.
+"""
+import fcntl
+import os
+import tempfile
+import weakref
+from typing import Optional
+
+import numpy as np
+
+from framework.utils.bit_parser import CORE_ID_SHIFT, LOW_VOLTAGE_BIT, OVERHEAT_BIT
+
+MAGIC = b"SDREG001"
+HEADER_BYTES = 16
+_HEADER = np.dtype([("magic", "S8"), ("capacity", "<u4"), ("reserved", "<u4")])
+
+
+class RegisterFile:
+    """A memory-mapped table of per-slot 16-bit status registers."""
+
+    def __init__(self, path: str, mode: str = "r+"):
+        header = np.fromfile(path, dtype=_HEADER, count=1)
+        if header.size != 1 or header["magic"][0] != MAGIC:
+            raise ValueError(f"{path} is not a simulator register file")
+
+        self.path = path
+        self.capacity = int(header["capacity"][0])
+        self._map = np.memmap(path, dtype="<u2", mode=mode, offset=HEADER_BYTES, shape=(3, self.capacity))
+        # Zero-copy views onto the three tables
+        self.registers = self._map[0]
+        self.force_set = self._map[1]
+        self.force_clear = self._map[2]
+
+    @classmethod
+    def create(cls, path: str, capacity: int, temporary: bool = False) -> "RegisterFile":
+        """
+        Creates (or truncates) a zeroed register file with `capacity` slots.
+        A temporary file is deleted once the mapping is garbage collected or
+        the creating process exits.
+        """
+        with open(path, "wb") as f:
+            np.array([(MAGIC, capacity, 0)], dtype=_HEADER).tofile(f)
+            f.truncate(HEADER_BYTES + 3 * 2 * capacity)
+        registers = cls(path)
+        if temporary:
+            weakref.finalize(registers, _remove, path, os.getpid())
+        return registers
+
+    @classmethod
+    def open(cls, path: str, readonly: bool = True) -> "RegisterFile":
+        """Maps an existing register file, read-only unless faults need injecting."""
+        return cls(path, mode="r" if readonly else "r+")
+
+    @classmethod
+    def open_or_create(cls, path: str, capacity: int) -> "RegisterFile":
+        """
+        Maps the register file if one with at least `capacity` slots exists,
+        otherwise creates it. Safe to call from several worker processes at once.
+        """
+        with open(path, "ab") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                header = np.fromfile(path, dtype=_HEADER, count=1)
+                if header.size != 1 or header["magic"][0] != MAGIC or header["capacity"][0] < capacity:
+                    return cls.create(path, capacity)
+                return cls(path)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    # --- Simulator Side ---
+
+    def publish(self, slots: np.ndarray, values: np.ndarray):
+        """Writes freshly simulated register values, with any injected faults applied."""
+        in_range = slots < self.capacity
+        slots, values = slots[in_range], values[in_range]
+        self.registers[slots] = (values | self.force_set[slots]) & ~self.force_clear[slots]
+
+    def clear(self, slot: int):
+        """Zeroes a slot's register and fault masks when its chip goes away."""
+        if slot < self.capacity:
+            self._map[:, slot] = 0
+
+    # --- Fault Injection ---
+
+    def inject(self, slot: int, set_bits: int = 0, clear_bits: int = 0):
+        """
+        Forces bits on (set_bits) or off (clear_bits) for a slot. The masks stay
+        in effect on every tick until `clear_faults()`; the register updates now.
+        """
+        if not 0 <= slot < self.capacity:
+            raise IndexError(f"Slot {slot} is outside the register file ({self.capacity} slots)")
+        force_set = (int(self.force_set[slot]) | set_bits) & ~clear_bits & 0xFFFF
+        force_clear = (int(self.force_clear[slot]) | clear_bits) & ~set_bits & 0xFFFF
+        self.force_set[slot] = force_set
+        self.force_clear[slot] = force_clear
+        self.registers[slot] = (int(self.registers[slot]) | force_set) & ~force_clear & 0xFFFF
+
+    def clear_faults(self, slot: int):
+        """Removes injected faults; the simulated value returns on the next tick."""
+        self.force_set[slot] = 0
+        self.force_clear[slot] = 0
+
+    def flush(self):
+        self._map.flush()
+
+
+def _remove(path: str, owner_pid: int):
+    # Forked children (e.g. a background checkpoint) inherit the finalizer; only the creator deletes
+    if os.getpid() == owner_pid:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+def encode_status(is_throttling: np.ndarray, battery: np.ndarray, core_temp: np.ndarray,
+                  low_voltage_battery: float) -> np.ndarray:
+    """Packs chip state into 16-bit status registers (vectorized over chips)."""
+    hottest = np.argmax(core_temp, axis=1).astype(np.uint16)
+    return (
+        np.where(is_throttling, OVERHEAT_BIT, 0)
+        | np.where(battery <= low_voltage_battery, LOW_VOLTAGE_BIT, 0)
+        | (hottest << CORE_ID_SHIFT)
+    ).astype(np.uint16)
+
+
+def default_register_path(shared: bool = False) -> Optional[str]:
+    """
+    SIM_REGISTER_FILE if set (empty disables the file), else a file in the
+    temp dir. Only the workers of a shared fleet share the default file; any
+    other process gets its own, so starting one never truncates another's
+    (create it with temporary=True so it goes away with the process).
+    """
+    path = os.environ.get("SIM_REGISTER_FILE")
+    if path is None:
+        name = "snapdragon_sim_registers.bin" if shared else f"snapdragon_sim_registers-{os.getpid()}.bin"
+        return os.path.join(tempfile.gettempdir(), name)
+    return path or None
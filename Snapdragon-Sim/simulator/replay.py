@@ -0,0 +1,127 @@
+"""
+Record and replay simulator runs.
+
+A `RunRecorder` attached to a chip journals, one JSON object per line:
+
+- a header with the session id and the chip's RNG key
+- every physics operation exactly as the fleet ran it: `step`, and
+  `advance` with the tick count (clock syncs and fast-forwards alike) and
+  whether it ran exactly (as it does while a condition wait is pending)
+- every command that changed state outside a tick: `reboot`, `set`
+  (e.g. a mode switch)
+- every telemetry frame served, with the tick it was built at
+
+Because jitter comes from the chip's counter-based random stream, the log
+fully determines the run. `RecordedRun` reads a log back and can either
+serve the recorded frames directly (no physics at all) or re-simulate the
+commands from the key and diff the result against the recording, e.g. to
+check a new build against a cached golden run.
+"""
+import bisect
+import json
+import os
+import tempfile
+from typing import Callable, List, Optional
+
+FORMAT = "snapdragon-run/1"
+
+
+class RunRecorder:
+    """Appends a chip's command/frame journal to a JSON-lines file."""
+
+    def __init__(self, path: str, session_id: str, rng_key: int):
+        self.path = path
+        self.events = 0
+        self._f = open(path, "w")
+        self._write({"format": FORMAT, "session": session_id, "rng_key": rng_key})
+
+    def _write(self, entry: dict):
+        self._f.write(json.dumps(entry) + "\n")
+
+    def log(self, op: str, tick: int, **fields):
+        self._write({"op": op, "tick": tick, **fields})
+        self.events += 1
+
+    def frame(self, tick: int, body: bytes):
+        """Journals a serialized telemetry frame without re-encoding it."""
+        self._f.write(f'{{"op": "frame", "tick": {tick}, "frame": {body.decode()}}}\n')
+        self.events += 1
+
+    def close(self):
+        if not self._f.closed:
+            self._f.close()
+
+
+class RecordedRun:
+    """A run log loaded back from disk."""
+
+    def __init__(self, path: str):
+        with open(path) as f:
+            header = json.loads(f.readline())
+            if header.get("format") != FORMAT:
+                raise ValueError(f"{path} is not a recorded simulator run")
+            entries = [json.loads(line) for line in f]
+
+        self.path = path
+        self.session_id: str = header["session"]
+        self.rng_key: int = header["rng_key"]
+        # Physics operations and commands, in order (frames excluded)
+        self.commands = [e for e in entries if e["op"] != "frame"]
+        self.entries = entries
+        self.frames = [e["frame"] for e in entries if e["op"] == "frame"]
+        self._frame_ticks = [e["tick"] for e in entries if e["op"] == "frame"]
+
+    def frame_at(self, tick: int) -> Optional[dict]:
+        """The last frame recorded at or before `tick` (None before the first frame)."""
+        i = bisect.bisect_right(self._frame_ticks, tick)
+        return self.frames[i - 1] if i else None
+
+    def summary(self) -> dict:
+        return {
+            "session": self.session_id,
+            "commands": len(self.commands),
+            "frames": len(self.frames),
+            "first_tick": self._frame_ticks[0] if self.frames else None,
+            "last_tick": self._frame_ticks[-1] if self.frames else None,
+        }
+
+    def resimulate(self, make_chip: Callable, render: Callable) -> List[dict]:
+        """
+        Re-runs the journal through the physics engine on a fresh chip seeded
+        with the recorded key and returns the frame rendered at each point a
+        frame was recorded. `make_chip(seed)` builds the chip; `render(chip)`
+        turns it into a frame dict.
+        """
+        chip = make_chip(self.rng_key)
+        fleet, slot = chip.fleet, chip.slot
+        frames = []
+        try:
+            for entry in self.entries:
+                op = entry["op"]
+                if op == "step":
+                    fleet.step(slot)
+                elif op == "advance":
+                    fleet.advance(slot, entry["ticks"], exact=entry.get("exact", False))
+                elif op == "reboot":
+                    fleet.reset(slot)
+                elif op == "set":
+                    chip.state[entry["key"]] = entry["value"]
+                elif op == "frame":
+                    frames.append(render(chip))
+        finally:
+            chip.close()
+        return frames
+
+    def diff(self, make_chip: Callable, render: Callable) -> List[dict]:
+        """Frames whose re-simulation differs from the recording, as {tick, recorded, simulated}."""
+        simulated = self.resimulate(make_chip, render)
+        return [
+            {"tick": tick, "recorded": recorded, "simulated": frame}
+            for tick, recorded, frame in zip(self._frame_ticks, self.frames, simulated)
+            if recorded != frame
+        ]
+
+
+def default_record_dir() -> str:
+    """SIM_RECORD_DIR if set, else a directory in the temp dir."""
+    return os.environ.get("SIM_RECORD_DIR") or os.path.join(tempfile.gettempdir(), "snapdragon_runs")
@@ -0,0 +1,58 @@
+"""
+Counter-based random numbers for the physics engine.
+
+Each chip owns a 64-bit key. Every random value it ever needs is a pure
+function of (key, tick, lane), computed by hashing those numbers with the
+SplitMix64 finalizer, instead of being pulled from a shared generator.
+As a result:
+
+- a chip's run depends only on its key and the commands it receives, not on
+  which other chips were stepped in the same batch, in which order, or by
+  which worker process
+- the draws for any tick can be recomputed without replaying earlier ticks
+
+A tick's draws form a block of lanes (e.g. one for the die temperature and
+one per core); a whole block for many chips is hashed in one vectorized pass.
+"""
+import numpy as np
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MUL1 = np.uint64(0xBF58476D1CE4E5B9)
+_MUL2 = np.uint64(0x94D049BB133111EB)
+_S30, _S27, _S31, _S11 = np.uint64(30), np.uint64(27), np.uint64(31), np.uint64(11)
+_U53 = 1.0 / (1 << 53)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer (in place): a bijective, well-avalanched 64-bit hash."""
+    x ^= x >> _S30
+    x *= _MUL1
+    x ^= x >> _S27
+    x *= _MUL2
+    x ^= x >> _S31
+    return x
+
+
+def random_bits(key, counter, lanes: int, first_lane: int = 0) -> np.ndarray:
+    """
+    64 random bits for lanes first_lane .. first_lane + lanes - 1 of each
+    (key, counter) block. key and counter broadcast; the result has a
+    trailing lanes axis.
+    """
+    block = np.asarray(counter).astype(np.uint64) + _GOLDEN
+    block = _mix(_mix(block) ^ np.asarray(key, dtype=np.uint64))
+    lane_offsets = np.arange(first_lane + 1, first_lane + lanes + 1, dtype=np.uint64) * _GOLDEN
+    return _mix(block[..., None] + lane_offsets)
+
+
+def uniform(key, counter, lanes: int, first_lane: int = 0) -> np.ndarray:
+    """Uniform floats in [0, 1), one per lane (see random_bits)."""
+    return (random_bits(key, counter, lanes, first_lane) >> _S11) * _U53
+
+
+def standard_normal(key, counter, lane: int) -> np.ndarray:
+    """One standard normal per (key, counter), from lanes `lane` and `lane + 1` (Box-Muller)."""
+    bits = random_bits(key, counter, 2, lane) >> _S11
+    u1 = (bits[..., 0] + 1) * _U53  # (0, 1], keeps log() finite
+    u2 = bits[..., 1] * _U53
+    return np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
@@ -0,0 +1,204 @@
+"""
+Fixed-rate tick scheduler with a pre-serialized telemetry frame cache.
+
+One asyncio loop advances every session at a fixed rate. After each tick the
+session's telemetry frame is serialized to JSON bytes exactly once and cached
+on the chip itself (so it disappears with the session). `/telemetry` reads
+then become a lookup of those bytes, and the frame's ETag lets clients skip
+the body entirely with `If-None-Match`. A tick only holds the fleet lock to
+sync the chips and copy out the stale ones' current state; frames are
+rendered from that copy afterwards, off the event loop when run() drives it.
+
+Chips whose clients poll for deltas (see simulator.delta) also keep the
+packed values of their last few frames, so a delta can be cut against any
+of them.
+"""
+import asyncio
+import itertools
+import json
+import secrets
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+from simulator import metrics
+
+TICK_DURATION = metrics.Histogram("sim_scheduler_tick_seconds", "Wall time of one scheduler tick over every session")
+FRAMES_SERIALIZED = metrics.Counter("sim_frames_serialized_total", "Telemetry frames serialized into the cache")
+
+
+class Frame(NamedTuple):
+    """One serialized telemetry frame."""
+    version: tuple
+    etag: str
+    body: bytes
+    seq: int = 0
+    # (seq, packed values) of this frame and its predecessors, oldest first;
+    # empty unless the chip's clients have asked for deltas
+    history: tuple = ()
+
+    def packed_at(self, seq: int) -> Optional[bytes]:
+        """Packed values of frame `seq`, if it's still in this frame's history."""
+        for past, packed in self.history:
+            if past == seq:
+                return packed
+        return None
+
+
+class TickScheduler:
+    """Advances all sessions at a fixed rate and keeps each one's latest frame serialized."""
+
+    def __init__(self, sessions, render: Callable, interval: float = 1.0, pack: Optional[Callable] = None,
+                 window: int = 8):
+        self.sessions = sessions
+        # (session_id, chip) -> frame dict. On ticks it's handed a stand-in whose
+        # `fleet` is a FleetRows copy, so it may only read `chip.fleet` and `chip.slot`
+        self.render = render
+        self.interval = interval
+        self.running = False
+        # Called with (session_id, frame) for every frame that changed on a tick
+        self.listeners: List[Callable] = []
+        # render() output -> packed bytes, and how many frames a chip's history keeps
+        self.pack = pack
+        self.window = window
+        # Ids start at a random point so ids from other worker processes (shared
+        # backend) don't name this process's frames; they stay below 2**53 for JS
+        self._frame_ids = itertools.count(secrets.randbits(40) << 12)
+
+    def _serialize(self, session_id: str, chip) -> Frame:
+        data = self.render(session_id, chip)
+        body = json.dumps(data).encode()
+        packed = self.pack(data) if chip.frame is not None and chip.frame.history else None
+        return self._install(chip, chip.version, body, packed, chip.fleet.recorders.get(chip.slot))
+
+    def _install(self, chip, version: tuple, body: bytes, packed: Optional[bytes], recorder) -> Frame:
+        """Makes `body` the chip's cached frame, extending its history if it keeps one."""
+        seq = next(self._frame_ids)
+        previous = chip.frame
+        history = ()
+        if previous is not None and previous.history:
+            history = (previous.history + ((seq, packed),))[-self.window:]
+        frame = Frame(version, f'"{seq:x}"', body, seq, history)
+        chip.frame = frame
+        FRAMES_SERIALIZED.inc()
+        if recorder is not None:
+            recorder.frame(version[0], body)
+        return frame
+
+    def frame_for(self, session_id: str, chip, sync: bool = True) -> Frame:
+        """
+        Returns the chip's cached frame, re-serializing only if the chip has
+        ticked (or was changed by a command) since the frame was built.
+        Versions live in the fleet columns, so this also notices changes made
+        by other worker processes sharing the same fleet.
+        """
+        with chip.fleet.locked(chip.slot):
+            if sync:
+                chip.sync()
+            frame = chip.frame
+            if frame is None or frame.version != chip.version:
+                frame = self._serialize(session_id, chip)
+        return frame
+
+    def frame_with_history(self, session_id: str, chip, sync: bool = True) -> Frame:
+        """
+        Like frame_for, but also makes the chip keep its recent frames from now
+        on, which is what deltas are cut against.
+        """
+        frame = self.frame_for(session_id, chip, sync)
+        if not frame.history and self.pack is not None and self.window > 0:
+            frame = chip.frame = frame._replace(history=((frame.seq, self.pack(json.loads(frame.body))),))
+        return frame
+
+    def _collect(self) -> list:
+        """
+        Syncs every session and copies the state of those whose frame is
+        stale, one fleet lock at a time. Returns [(rows, [_Pending])]; the
+        copies are what _encode renders from, with no lock held.
+        """
+        by_fleet = {}
+        for session_id, chip in self.sessions.items():
+            by_fleet.setdefault(chip.fleet, []).append((session_id, chip))
+
+        batches = []
+        for fleet, group in by_fleet.items():
+            slots = [chip.slot for _, chip in group]
+            # Hold the fleet still (other workers included) only while it's synced and copied
+            with fleet.locked(slots):
+                # 1. One batched clock sync per fleet
+                fleet.sync(slots)
+                ticks, revisions = fleet.ticks[slots].tolist(), fleet.revision[slots].tolist()
+                stale = []
+                for (session_id, chip), version in zip(group, zip(ticks, revisions)):
+                    frame = chip.frame
+                    if frame is None or frame.version != version:
+                        stale.append(_Pending(session_id, chip, frame, version, fleet.recorders.get(chip.slot)))
+                # 2. Copy out just the stale rows
+                if stale:
+                    batches.append((fleet.rows([p.chip.slot for p in stale]), stale))
+        return batches
+
+    def _encode(self, batches: list) -> list:
+        """Renders and serializes each pending frame from the copied rows; touches no shared state."""
+        encoded = []
+        for rows, pending in batches:
+            for i, p in enumerate(pending):
+                data = self.render(p.session_id, _Row(rows, i))
+                packed = self.pack(data) if p.previous is not None and p.previous.history else None
+                encoded.append((p, json.dumps(data).encode(), packed))
+        return encoded
+
+    def _publish(self, encoded: list, start: float):
+        changed = []
+        for p, body, packed in encoded:
+            chip = p.chip
+            if chip.frame is not p.previous:
+                # A request rebuilt the frame meanwhile; keep it if it's of the same state,
+                # and leave a newer one (a command landed) to the next tick
+                if chip.frame is not None and chip.frame.version == p.version:
+                    changed.append((p.session_id, chip.frame))
+                continue
+            recorder = p.recorder
+            if recorder is not None and chip.fleet.recorders.get(chip.slot) is not recorder:
+                recorder = None  # recording stopped (or the slot moved on) meanwhile
+            changed.append((p.session_id, self._install(chip, p.version, body, packed, recorder)))
+        TICK_DURATION.observe(time.perf_counter() - start)
+
+        # 3. Notify listeners outside the lock
+        for session_id, frame in changed:
+            for listener in self.listeners:
+                listener(session_id, frame)
+
+    def tick(self):
+        """Advances every session to the current simulated time and refreshes changed frames."""
+        start = time.perf_counter()
+        self._publish(self._encode(self._collect()), start)
+
+    async def run(self):
+        """
+        Scheduler loop; runs until cancelled. Frames are encoded on a worker
+        thread, so requests keep being served while a large tick serializes.
+        """
+        self.running = True
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                start = time.perf_counter()
+                encoded = await asyncio.to_thread(self._encode, self._collect())
+                self._publish(encoded, start)
+        finally:
+            self.running = False
+
+
+class _Pending(NamedTuple):
+    """A session whose frame is stale, as seen under the fleet lock."""
+    session_id: str
+    chip: object
+    previous: Optional[Frame]
+    version: tuple
+    recorder: object
+
+
+class _Row(NamedTuple):
+    """Stands in for a chip handle when rendering from copied rows: `fleet` is a FleetRows."""
+    fleet: object
+    slot: int
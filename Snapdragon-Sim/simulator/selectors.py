@@ -0,0 +1,94 @@
+"""
+Device selectors for the fleet batch API.
+
+A selector picks devices by their live state and is evaluated over the fleet
+columns in one vectorized pass:
+
+- "all"
+- "throttling" / "optimal" (thermal status)
+- "mode=<power mode>", e.g. "mode=High Performance", or "mode ~ <text>" for
+  every mode whose name contains the text, e.g. "mode ~ Saver"
+- "thermal_status == THROTTLING" / "thermal_status == OPTIMAL" (or !=)
+- "<field> <op> <number>" with field battery, temp or ticks and op one of
+  <, <=, >, >=, ==, !=, e.g. "battery < 20"
+
+Several selectors combine with AND. The same syntax describes the conditions
+a client can wait for (see simulator.waits).
+"""
+import re
+from typing import Callable, Iterable
+
+import numpy as np
+
+from simulator.fleet import MODE_CODES
+
+# Selector field -> fleet column
+COLUMNS = {"battery": "battery", "battery_level": "battery", "temp": "global_temp", "global_temp": "global_temp", "ticks": "ticks"}
+
+OPERATORS = {
+    "<=": np.less_equal,
+    ">=": np.greater_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+    "=": np.equal,
+    "<": np.less,
+    ">": np.greater,
+}
+
+_COMPARISON = re.compile(r"^\s*(\w+)\s*(<=|>=|==|!=|=|<|>|~)\s*(.+?)\s*$")
+
+THERMAL_STATUSES = ("OPTIMAL", "THROTTLING")
+
+Selector = Callable[[object, np.ndarray], np.ndarray]
+
+
+def parse_selector(text: str) -> Selector:
+    """Compiles one selector into fn(fleet, slots) -> boolean mask. Raises ValueError if malformed."""
+    keyword = text.strip().lower()
+    if keyword == "all":
+        return lambda fleet, slots: np.ones(slots.size, dtype=bool)
+    if keyword == "throttling":
+        return lambda fleet, slots: fleet.is_throttling[slots].copy()
+    if keyword == "optimal":
+        return lambda fleet, slots: ~fleet.is_throttling[slots]
+
+    match = _COMPARISON.match(text)
+    if match is None:
+        raise ValueError(f"Unrecognised selector {text!r}")
+    field, op, value = match.groups()
+
+    if field in ("mode", "power_mode"):
+        if op == "~":
+            codes = [code for name, code in MODE_CODES.items() if value.lower() in name.lower()]
+            if not codes:
+                raise ValueError(f"No power mode contains {value!r}")
+            return lambda fleet, slots: np.isin(fleet.power_mode[slots], codes)
+        if op not in ("=", "==", "!=") or value not in MODE_CODES:
+            raise ValueError(f"Mode selectors look like 'mode=<{'|'.join(MODE_CODES)}>'")
+        code = MODE_CODES[value]
+        return lambda fleet, slots: OPERATORS[op](fleet.power_mode[slots], code)
+
+    if field == "thermal_status":
+        if op not in ("=", "==", "!=") or value.upper() not in THERMAL_STATUSES:
+            raise ValueError(f"Thermal status selectors look like 'thermal_status == <{'|'.join(THERMAL_STATUSES)}>'")
+        throttling = value.upper() == "THROTTLING"
+        return lambda fleet, slots: OPERATORS[op](fleet.is_throttling[slots], throttling)
+
+    if op == "~":
+        raise ValueError("Only mode selectors support '~'")
+    if field not in COLUMNS:
+        raise ValueError(f"Unknown selector field {field!r}; expected one of {', '.join(COLUMNS)}, mode or thermal_status")
+    try:
+        number = float(value)
+    except ValueError:
+        raise ValueError(f"Selector {text!r} must compare {field} with a number") from None
+    column = COLUMNS[field]
+    return lambda fleet, slots: OPERATORS[op](getattr(fleet, column)[slots], number)
+
+
+def select(fleet, slots: np.ndarray, selectors: Iterable[Selector]) -> np.ndarray:
+    """Mask of the slots matching every selector."""
+    mask = np.ones(slots.size, dtype=bool)
+    for selector in selectors:
+        mask &= selector(fleet, slots)
+    return mask
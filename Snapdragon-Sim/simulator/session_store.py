@@ -0,0 +1,193 @@
+"""
+Session stores: map a `chip_session` cookie to its simulated chip.
+
+`SessionStore` is the interface the API talks to. `InMemorySessionStore`
+keeps sessions in the current process and bounds them two ways:
+
+- Idle TTL: a session untouched for `ttl` seconds is dropped by `sweep()`
+- Max sessions: once the cap is hit, the least recently used session is evicted
+
+Evicted chips release their fleet slot. If the same cookie shows up again it
+simply gets a brand-new factory-state chip, exactly like after `/reboot`.
+"""
+import asyncio
+import sys
+import time
+from collections import OrderedDict
+from typing import Callable, Iterator, Optional
+
+# Rough per-entry cost of an OrderedDict slot (hash entry + linked-list node)
+_DICT_ENTRY_OVERHEAD = 104
+
+
+class SessionStore:
+    """Interface every session backend implements."""
+
+    def get(self, session_id: str):
+        """Returns the chip for session_id (refreshing its idle timer) or None."""
+        raise NotImplementedError
+
+    def get_or_create(self, session_id: str):
+        """Returns the chip for session_id, creating a factory-state chip if needed."""
+        raise NotImplementedError
+
+    def discard(self, session_id: str) -> bool:
+        """Drops a session and frees its chip. Returns True if it existed."""
+        raise NotImplementedError
+
+    def sweep(self) -> int:
+        """Evicts every idle-expired session. Returns how many were evicted."""
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """Live counts and approximate memory usage."""
+        raise NotImplementedError
+
+    def items(self) -> list:
+        """Snapshot of (session_id, chip) pairs. Does not refresh idle timers."""
+        raise NotImplementedError
+
+    def __contains__(self, session_id) -> bool:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __iter__(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    async def run_sweeper(self, interval: float):
+        """Background task: calls sweep() every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store with idle TTL, an LRU-evicted size cap and memory accounting."""
+
+    def __init__(self, factory: Callable, ttl: Optional[float] = 1800, max_sessions: Optional[int] = 10_000,
+                 clock: Callable[[], float] = time.monotonic):
+        self.factory = factory
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.clock = clock
+        # session_id -> (chip, last_access); ordered oldest access first
+        self._sessions = OrderedDict()
+        self.evicted_ttl = 0
+        self.evicted_lru = 0
+
+    def _touch(self, session_id: str):
+        chip, _ = self._sessions[session_id]
+        self._sessions[session_id] = (chip, self.clock())
+        self._sessions.move_to_end(session_id)
+        return chip
+
+    def get(self, session_id: str):
+        if session_id not in self._sessions:
+            return None
+        return self._touch(session_id)
+
+    def get_or_create(self, session_id: str):
+        if session_id in self._sessions:
+            return self._touch(session_id)
+
+        # Make room first so the new chip can reuse the evicted fleet slot
+        if self.max_sessions is not None:
+            while len(self._sessions) >= self.max_sessions:
+                self._evict_oldest()
+                self.evicted_lru += 1
+
+        chip = self.factory(session_id)
+        self._sessions[session_id] = (chip, self.clock())
+        return chip
+
+    def discard(self, session_id: str) -> bool:
+        entry = self._sessions.pop(session_id, None)
+        if entry is None:
+            return False
+        entry[0].close()
+        return True
+
+    def _evict_oldest(self):
+        _, (chip, _) = self._sessions.popitem(last=False)
+        chip.close()
+
+    def sweep(self) -> int:
+        if self.ttl is None:
+            return 0
+        deadline = self.clock() - self.ttl
+        evicted = 0
+        # Entries are in access order, so stop at the first one still fresh
+        while self._sessions:
+            _, last_access = next(iter(self._sessions.values()))
+            if last_access > deadline:
+                break
+            self._evict_oldest()
+            evicted += 1
+        self.evicted_ttl += evicted
+        return evicted
+
+    def bytes_per_session(self) -> int:
+        """Approximate resident bytes for one session: Python objects plus its fleet slot."""
+        if not self._sessions:
+            return 0
+        session_id, (chip, _) = next(reversed(self._sessions.items()))
+        python_bytes = sys.getsizeof(chip) + sys.getsizeof(session_id)
+        # Chips with __slots__ carry no per-instance dict
+        if hasattr(chip, "__dict__"):
+            python_bytes += sys.getsizeof(vars(chip))
+        # Cached telemetry frame bytes, if the scheduler has built one
+        frame = getattr(chip, "frame", None)
+        if frame is not None:
+            python_bytes += sys.getsizeof(frame) + sys.getsizeof(frame.body)
+        return python_bytes + _DICT_ENTRY_OVERHEAD + chip.fleet.slot_nbytes()
+
+    def stats(self) -> dict:
+        per_session = self.bytes_per_session()
+        return {
+            "backend": "memory",
+            "live_sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl,
+            "evicted_ttl": self.evicted_ttl,
+            "evicted_lru": self.evicted_lru,
+            "approx_bytes_per_session": per_session,
+            "approx_total_bytes": per_session * len(self._sessions),
+        }
+
+    def items(self) -> list:
+        return [(session_id, chip) for session_id, (chip, _) in self._sessions.items()]
+
+    def entries(self) -> list:
+        """(session_id, chip, last_access) for every session, least recently used first."""
+        return [(session_id, chip, last_access) for session_id, (chip, last_access) in self._sessions.items()]
+
+    def load(self, entries):
+        """
+        Adds existing chips (e.g. restored from a snapshot) as (session_id, chip,
+        last_access) entries, least recently used first, replacing any live
+        session with the same id. The size cap then evicts the least recently
+        used sessions as usual.
+        """
+        if not self._sessions:
+            self._sessions = OrderedDict((session_id, (chip, last_access)) for session_id, chip, last_access in entries)
+        else:
+            for session_id, chip, last_access in entries:
+                self.discard(session_id)
+                self._sessions[session_id] = (chip, last_access)
+            # Keep access order, which sweep() relies on
+            self._sessions = OrderedDict(sorted(self._sessions.items(), key=lambda entry: entry[1][1]))
+        if self.max_sessions is not None:
+            while len(self._sessions) > self.max_sessions:
+                self._evict_oldest()
+                self.evicted_lru += 1
+
+    def __contains__(self, session_id) -> bool:
+        return session_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._sessions))
@@ -0,0 +1,349 @@
+"""
+Multi-process session backend: chip state in a memory-mapped file.
+
+`InMemorySessionStore` keeps sessions in one process's heap, so running
+uvicorn with `--workers N` breaks them: a cookie created on one worker is
+unknown to the next. `SharedFleet` instead carves the fleet columns out of a
+single mmap'd file that every worker maps, and `SharedMemorySessionStore`
+keeps the session-id -> slot directory in that same file. Any worker can
+then serve any session.
+
+File layout:
+
+    header (16 bytes) | fleet columns for `capacity` slots (see fleet_fields)
+
+Telemetry history goes to a sidecar `<path>.history` holding a HistoryRing
+row for every slot. The file is sparse, so only the rows of chips whose
+history is recorded take up disk and memory.
+
+Writers coordinate with POSIX byte-range locks on a sidecar `<path>.lock`:
+
+- byte 0 is the fleet-wide lock: single-slot operations hold it shared,
+  batch operations (a scheduler tick, sweeping, allocating) hold it exclusive
+- byte 1 + slot is that slot's lock, held exclusive for single-slot operations
+
+So requests for different chips never wait on each other, while a tick or a
+new session briefly has the file to itself.
+"""
+import fcntl
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+
+from simulator.fleet import DEFAULT_TIME_SCALE, Fleet, HistoryRing, columns_nbytes, history_fields
+from simulator.session_store import SessionStore
+
+MAGIC = b"SDFLEET1"
+HEADER_BYTES = 16
+_HEADER = np.dtype([("magic", "S8"), ("capacity", "<u4"), ("slot_nbytes", "<u4")])
+
+# Session ids longer than this are stored as their SHA-256 hex digest
+SESSION_KEY_BYTES = 64
+
+
+class _FileLocks:
+    """Fleet-wide and per-slot byte-range locks on one lock file."""
+
+    def __init__(self, path: str):
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        # fcntl locks belong to the process, so threads are kept apart separately
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+
+    def _lock(self, mode: int, byte: int):
+        fcntl.lockf(self._fd, mode, 1, byte)
+
+    @contextmanager
+    def hold(self, slot: Optional[int] = None):
+        """
+        Locks one slot (fleet-wide lock shared) or, with slot=None, the whole
+        fleet. Nested calls reuse the outermost lock.
+        """
+        with self._thread_lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+
+            if slot is None:
+                self._lock(fcntl.LOCK_EX, 0)
+            else:
+                self._lock(fcntl.LOCK_SH, 0)
+                self._lock(fcntl.LOCK_EX, 1 + slot)
+            self._depth = 1
+            try:
+                yield
+            finally:
+                self._depth = 0
+                if slot is not None:
+                    self._lock(fcntl.LOCK_UN, 1 + slot)
+                self._lock(fcntl.LOCK_UN, 0)
+
+    def close(self):
+        os.close(self._fd)
+
+
+class SharedFleet(Fleet):
+    """
+    A fixed-capacity Fleet whose columns live in a memory-mapped file.
+
+    Opening the same path from several processes gives each of them a view
+    of the same chips. Every state-changing method runs under the file locks.
+    """
+
+    EXTRA_FIELDS = (
+        # Session directory: which session owns the slot, and when it was last used
+        ("session_key", f"S{SESSION_KEY_BYTES}", ()),
+        ("last_access", np.float64, ()),
+    )
+
+    def __init__(self, path: str, capacity: int = 1024, seed=None, time_scale: float = DEFAULT_TIME_SCALE,
+                 wall=time.time, profile=None):
+        # Wall time, not monotonic: clock columns are compared across processes
+        self.path = path
+        self.locks = _FileLocks(path + ".lock")
+        super().__init__(capacity, seed=seed, time_scale=time_scale, wall=wall, profile=profile)
+
+    def _allocate_buffer(self, capacity: int):
+        if self.capacity:
+            raise RuntimeError(f"Shared fleet {self.path} is full ({self.capacity} slots)")
+
+        nbytes = self.buffer_nbytes(capacity)
+        with self.locks.hold():
+            header = np.fromfile(self.path, dtype=_HEADER, count=1) if os.path.exists(self.path) else None
+            if header is None or header.size != 1 or header["magic"][0] != MAGIC:
+                # First worker in: lay out a zeroed file
+                with open(self.path, "wb") as f:
+                    np.array([(MAGIC, capacity, self.slot_nbytes())], dtype=_HEADER).tofile(f)
+                    f.truncate(HEADER_BYTES + nbytes)
+            elif header["capacity"][0] != capacity or header["slot_nbytes"][0] != self.slot_nbytes():
+                raise ValueError(
+                    f"{self.path} holds {header['capacity'][0]} slots of {header['slot_nbytes'][0]} bytes; "
+                    f"expected {capacity} of {self.slot_nbytes()}. Remove it or use another path."
+                )
+            buffer = np.memmap(self.path, dtype=np.uint8, mode="r+", offset=HEADER_BYTES, shape=(nbytes,))
+        self._carve(buffer, capacity)
+
+    def _open_history(self) -> HistoryRing:
+        """Maps the history sidecar, laying it out (sparse) if no worker has yet."""
+        path = self.path + ".history"
+        nbytes = columns_nbytes(history_fields(self.n_cores), self.capacity)
+        with self.locks.hold():
+            if not os.path.exists(path):
+                with open(path, "wb") as f:
+                    f.truncate(nbytes)
+            elif os.path.getsize(path) != nbytes:
+                raise ValueError(f"{path} holds {os.path.getsize(path)} bytes of history; expected {nbytes}. "
+                                 f"Remove it or use another path.")
+            buffer = np.memmap(path, dtype=np.uint8, mode="r+", shape=(nbytes,))
+        return HistoryRing(self.n_cores, capacity=self.capacity, buffer=buffer)
+
+    # --- Slots ---
+
+    def allocate(self, seed=None) -> int:
+        """Claims the lowest inactive slot. Raises RuntimeError if every slot is taken."""
+        with self.locks.hold():
+            free = np.flatnonzero(~self.active)
+            if free.size == 0:
+                raise RuntimeError(f"Shared fleet {self.path} is full ({self.capacity} slots)")
+            slot = int(free[0])
+            self.session_key[slot] = b""
+            self._init_slot(slot, seed)
+            return slot
+
+    def release(self, slot: int):
+        with self.locks.hold():
+            if self.active[slot]:
+                self.active[slot] = False
+                self.session_key[slot] = b""
+                self._drop_slot(slot)
+
+    def locked(self, slots):
+        """Locks a single slot, or the whole fleet for anything else."""
+        if np.ndim(slots) == 0 and slots is not None:
+            return self.locks.hold(int(slots))
+        return self.locks.hold()
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.active))
+
+    # --- Locked State Changes ---
+
+    def reset(self, slots):
+        with self.locked(slots):
+            super().reset(slots)
+
+    def step(self, slots=None) -> np.ndarray:
+        with self.locked(slots):
+            return super().step(slots)
+
+    def advance(self, slots, ticks, exact: bool = False) -> np.ndarray:
+        with self.locked(slots):
+            return super().advance(slots, ticks, exact)
+
+    def sync(self, slots=None, now: float = None) -> np.ndarray:
+        with self.locked(slots):
+            return super().sync(slots, now)
+
+    def fast_forward(self, slots, seconds: float) -> np.ndarray:
+        with self.locked(slots):
+            return super().fast_forward(slots, seconds)
+
+    def set_time_scale(self, slots, time_scale: float):
+        with self.locked(slots):
+            super().set_time_scale(slots, time_scale)
+
+    def flush(self):
+        self.buffer.flush()
+
+
+class SharedMemorySessionStore(SessionStore):
+    """
+    Session store over a SharedFleet, usable from any number of worker processes.
+
+    The authoritative session directory is the fleet's `session_key` column.
+    Each process also keeps a local cache of chip handles, re-validated
+    against that column on every lookup so evictions by other workers are
+    noticed. The idle TTL and the LRU cap (the fleet's capacity) are enforced
+    on the shared `last_access` column.
+    """
+
+    def __init__(self, fleet: SharedFleet, factory: Callable, ttl: Optional[float] = 1800,
+                 clock: Callable[[], float] = time.time):
+        self.fleet = fleet
+        # factory(session_id, slot) -> chip handle attached to that slot
+        self.factory = factory
+        self.ttl = ttl
+        self.clock = clock
+        # session_id -> chip handle, for sessions this process has served
+        self._local = {}
+        self.evicted_ttl = 0
+        self.evicted_lru = 0
+
+    @staticmethod
+    def _key(session_id: str) -> bytes:
+        key = session_id.encode()
+        if len(key) > SESSION_KEY_BYTES:
+            key = hashlib.sha256(key).hexdigest().encode()
+        return key
+
+    def _find_slot(self, key: bytes) -> Optional[int]:
+        """Looks a session up in the shared directory (one vectorized scan)."""
+        found = np.flatnonzero(self.fleet.active & (self.fleet.session_key == key))
+        return int(found[0]) if found.size else None
+
+    def _lookup(self, session_id: str):
+        """Returns a valid handle for session_id, or None if no worker has it."""
+        key = self._key(session_id)
+        chip = self._local.get(session_id)
+        if chip is not None:
+            if self.fleet.active[chip.slot] and self.fleet.session_key[chip.slot] == key:
+                return chip
+            # Evicted (and maybe reused) by another worker
+            del self._local[session_id]
+
+        slot = self._find_slot(key)
+        if slot is None:
+            return None
+        chip = self._local[session_id] = self.factory(session_id, slot)
+        return chip
+
+    def get(self, session_id: str):
+        chip = self._lookup(session_id)
+        if chip is not None:
+            self.fleet.last_access[chip.slot] = self.clock()
+        return chip
+
+    def get_or_create(self, session_id: str):
+        chip = self.get(session_id)
+        if chip is not None:
+            return chip
+
+        fleet = self.fleet
+        with fleet.locked(None):
+            # Another worker may have created it while we waited for the lock
+            chip = self._lookup(session_id)
+            if chip is None:
+                if len(fleet) >= fleet.capacity:
+                    # Full: evict the least recently used session in the whole fleet
+                    live = fleet.active_slots()
+                    fleet.release(int(live[np.argmin(fleet.last_access[live])]))
+                    self.evicted_lru += 1
+                slot = fleet.allocate()
+                fleet.session_key[slot] = self._key(session_id)
+                chip = self._local[session_id] = self.factory(session_id, slot)
+            fleet.last_access[chip.slot] = self.clock()
+        return chip
+
+    def discard(self, session_id: str) -> bool:
+        with self.fleet.locked(None):
+            chip = self._lookup(session_id)
+            if chip is None:
+                return False
+            self.fleet.release(chip.slot)
+            del self._local[session_id]
+            return True
+
+    def sweep(self) -> int:
+        if self.ttl is None:
+            return 0
+        fleet = self.fleet
+        with fleet.locked(None):
+            expired = np.flatnonzero(fleet.active & (fleet.last_access <= self.clock() - self.ttl))
+            for slot in expired:
+                fleet.release(int(slot))
+        self._prune()
+        self.evicted_ttl += expired.size
+        return int(expired.size)
+
+    def _prune(self):
+        """Drops local handles whose slot no longer belongs to their session."""
+        for session_id, chip in list(self._local.items()):
+            if not self.fleet.active[chip.slot] or self.fleet.session_key[chip.slot] != self._key(session_id):
+                del self._local[session_id]
+
+    def stats(self) -> dict:
+        per_session = self.fleet.slot_nbytes()
+        return {
+            "backend": "shared",
+            "path": self.fleet.path,
+            "live_sessions": len(self.fleet),
+            "local_sessions": len(self._local),
+            "max_sessions": self.fleet.capacity,
+            "ttl_seconds": self.ttl,
+            # Eviction counts are per worker
+            "evicted_ttl": self.evicted_ttl,
+            "evicted_lru": self.evicted_lru,
+            "approx_bytes_per_session": per_session,
+            # The mapping is sized for the full capacity up front
+            "approx_total_bytes": per_session * self.fleet.capacity,
+        }
+
+    def items(self) -> list:
+        """Sessions this worker has served that still exist in the shared fleet."""
+        self._prune()
+        return list(self._local.items())
+
+    def __contains__(self, session_id) -> bool:
+        return self._lookup(session_id) is not None
+
+    def __len__(self) -> int:
+        return len(self.fleet)
+
+    def __iter__(self) -> Iterator[str]:
+        self._prune()
+        return iter(list(self._local))
+
+
+def default_shared_state_path() -> str:
+    """SIM_SHARED_STATE if set, else a file in the temp dir."""
+    return os.environ.get("SIM_SHARED_STATE") or os.path.join(tempfile.gettempdir(), "snapdragon_sim_fleet.bin")
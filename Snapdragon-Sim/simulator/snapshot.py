@@ -0,0 +1,272 @@
+"""
+Session checkpoints: the whole in-memory session store in one binary file.
+
+A snapshot holds every live session's fleet rows plus the session directory
+(ids, idle times), so a restarted or redeployed simulator comes back with the
+same chips mid-run. Run recorders and /wait_for watches are not included.
+
+File layout:
+
+    magic | u32 header length | JSON header | padding to a page boundary
+    | fleet buffer for `capacity` slots (see fleet.carve_columns)
+
+The buffer is laid out exactly as a Fleet's own, with the saved sessions
+compacted into its first `count` rows and the spare rows left as a hole in a
+sparse file. Restoring maps the buffer copy-on-write and hands it to the
+(empty) fleet as its storage, so nothing is read or copied up front: pages
+fault in from the page cache as chips are touched, and writes stay private to
+the process.
+
+Writing a checkpoint from the server forks a child that saves a frozen
+copy-on-write image of the process, the way Redis BGSAVE does, so the event
+loop (and /telemetry) only pays for the fork itself.
+"""
+import asyncio
+import gc
+import json
+import mmap
+import os
+import struct
+import time
+import traceback
+from contextlib import nullcontext
+from typing import Callable, List, NamedTuple, Optional
+
+import numpy as np
+
+from simulator import metrics
+from simulator.fleet import Fleet, carve_columns
+
+MAGIC = b"SDSNAP01"
+VERSION = 1
+# Rows gathered and written per column at a time, bounding the writer's scratch memory
+CHUNK_ROWS = 4096
+
+SNAPSHOT_SECONDS = metrics.Histogram("sim_snapshot_seconds", "Time to write or restore a session snapshot", ("op",),
+                                     buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
+SNAPSHOT_FAILURES = metrics.Counter("sim_snapshot_failures_total", "Background checkpoints that failed")
+
+
+def default_snapshot_path() -> Optional[str]:
+    """SIM_SNAPSHOT_FILE, or None when checkpointing is off."""
+    return os.environ.get("SIM_SNAPSHOT_FILE") or None
+
+
+def _layout(fleet: Fleet) -> list:
+    return [[name, np.lib.format.dtype_to_descr(np.dtype(dtype)), list(shape)] for name, dtype, shape in fleet.fields]
+
+
+class _Capture(NamedTuple):
+    """Which rows a snapshot saves, taken at one instant."""
+    sessions: List[str]
+    idle: List[float]  # seconds since each session's last access
+    slots: np.ndarray
+    saved_at: float  # the fleet's wall clock
+
+
+def _capture(store, fleet: Fleet) -> _Capture:
+    now = store.clock()
+    entries = store.entries()
+    if any(chip.fleet is not fleet for _, chip, _ in entries):
+        raise ValueError("Every session in a snapshot must live in the snapshot's fleet")
+    return _Capture(
+        [session_id for session_id, _, _ in entries],
+        [now - last_access for _, _, last_access in entries],
+        np.array([chip.slot for _, chip, _ in entries], dtype=np.intp),
+        fleet.wall(),
+    )
+
+
+def _write(path: str, fleet: Fleet, capture: _Capture, rows: Callable[[str, int, int], np.ndarray]) -> int:
+    """
+    Writes the snapshot to a temp file and renames it over `path`, so a crash
+    mid-write leaves the previous checkpoint intact. `rows(name, start, stop)`
+    returns rows start..stop of a column in saved order. Returns bytes written.
+    """
+    count = len(capture.sessions)
+    # Room to grow after a restore before the fleet has to copy itself
+    capacity = 1 << max(count - 1, 0).bit_length()
+    header = json.dumps({
+        "version": VERSION,
+        "profile": fleet.profile.name,
+        "fields": _layout(fleet),
+        "capacity": capacity,
+        "count": count,
+        "saved_at": capture.saved_at,
+        "created": time.time(),
+        "sessions": capture.sessions,
+        "idle": capture.idle,
+    }).encode()
+    prefix = MAGIC + struct.pack("<I", len(header))
+    data_offset = -(-(len(prefix) + len(header)) // mmap.ALLOCATIONGRANULARITY) * mmap.ALLOCATIONGRANULARITY
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    written = len(prefix) + len(header)
+    try:
+        with open(tmp, "wb") as f:
+            f.write(prefix + header)
+            offset = data_offset
+            for name, dtype, shape in fleet.fields:
+                f.seek(offset)
+                for start in range(0, count, CHUNK_ROWS):
+                    chunk = np.ascontiguousarray(rows(name, start, min(start + CHUNK_ROWS, count)))
+                    f.write(chunk.data)
+                    written += chunk.nbytes
+                offset += (capacity * np.dtype(dtype).itemsize * int(np.prod(shape)) + 7) & ~7
+            # Spare rows stay a hole
+            f.truncate(data_offset + fleet.buffer_nbytes(capacity))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return written
+
+
+def save_snapshot(store, fleet: Fleet, path: str) -> dict:
+    """Writes every session in `store` to `path`, blocking until done (e.g. on shutdown)."""
+    start = time.perf_counter()
+    capture = _capture(store, fleet)
+    written = _write(path, fleet, capture, lambda name, a, b: getattr(fleet, name)[capture.slots[a:b]])
+    return _saved(path, len(capture.sessions), written, start)
+
+
+def _saved(path: str, sessions: int, written: int, start: float) -> dict:
+    seconds = time.perf_counter() - start
+    SNAPSHOT_SECONDS.labels("save").observe(seconds)
+    return {"path": path, "sessions": sessions, "bytes": written, "seconds": round(seconds, 4)}
+
+
+async def checkpoint(store, fleet: Fleet, path: str) -> dict:
+    """
+    Writes a snapshot without stalling the event loop. A forked child writes
+    it from the process image at the moment of the fork. Without fork the
+    rows are gathered here, which is one consistent copy, and written from a
+    thread.
+    """
+    start = time.perf_counter()
+    if not hasattr(os, "fork"):
+        capture = _capture(store, fleet)
+        copies = {name: getattr(fleet, name)[capture.slots] for name, _, _ in fleet.fields}
+        written = await asyncio.to_thread(_write, path, fleet, capture, lambda name, a, b: copies[name][a:b])
+        return _saved(path, len(capture.sessions), written, start)
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Child: save, report, and leave without running any of the parent's cleanup
+        code = 1
+        try:
+            os.close(read_fd)
+            info = save_snapshot(store, fleet, path)
+            os.write(write_fd, json.dumps(info).encode())
+            code = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(code)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as report:
+        _, status = await asyncio.to_thread(os.waitpid, pid, 0)
+        output = report.read()
+    code = os.waitstatus_to_exitcode(status)
+    if code != 0 or not output:
+        raise RuntimeError(f"Snapshot writer exited with status {code}")
+    info = json.loads(output)
+    # Timed as the server sees it, fork included
+    return _saved(path, info["sessions"], info["bytes"], start)
+
+
+async def run_checkpoints(store, fleet: Fleet, path: str, interval: float, lock: Optional[asyncio.Lock] = None):
+    """Background task: checkpoints every `interval` seconds (holding `lock`) until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with lock or nullcontext():
+                await checkpoint(store, fleet, path)
+        except (OSError, RuntimeError, ValueError):
+            # Keep the previous checkpoint and try again next interval
+            SNAPSHOT_FAILURES.inc()
+
+
+# --- Restoring ---
+
+class Snapshot:
+    """A snapshot file's header, with its fleet buffer mapped copy-on-write."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a session snapshot")
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len))
+            if header["version"] != VERSION:
+                raise ValueError(f"{path} is a version {header['version']} snapshot; expected {VERSION}")
+            data_offset = -(-(len(MAGIC) + 4 + header_len) // mmap.ALLOCATIONGRANULARITY) * mmap.ALLOCATIONGRANULARITY
+            # ACCESS_COPY: the fleet can write its rows without touching the file
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY, offset=data_offset)
+
+        self.path = path
+        self.profile: str = header["profile"]
+        self.fields: list = header["fields"]
+        self.capacity: int = header["capacity"]
+        self.count: int = header["count"]
+        self.saved_at: float = header["saved_at"]
+        self.created: float = header["created"]
+        self.sessions: List[str] = header["sessions"]
+        self.idle: List[float] = header["idle"]
+        self.buffer = np.frombuffer(self._map, dtype=np.uint8)
+
+    def check(self, fleet: Fleet):
+        if self.fields != _layout(fleet):
+            raise ValueError(
+                f"{self.path} holds {self.profile!r} chips with a different column layout than this fleet "
+                f"({fleet.profile.name!r}). Remove it or use another path."
+            )
+
+    def columns(self, fleet: Fleet) -> dict:
+        """Zero-copy column views over the mapped buffer."""
+        return carve_columns(fleet.fields, self.buffer, self.capacity)
+
+
+def open_snapshot(path: str) -> Snapshot:
+    return Snapshot(path)
+
+
+def restore_snapshot(store, fleet: Fleet, path: str, attach: Callable[[str, int], object]) -> int:
+    """
+    Loads a snapshot's sessions into `store`, with their chips in `fleet`, and
+    returns how many were restored. `attach(session_id, slot)` builds the
+    handle that owns each restored slot. An empty fleet adopts the mapped
+    buffer as-is; otherwise the rows are copied into free slots.
+    """
+    start = time.perf_counter()
+    snapshot = open_snapshot(path)
+    snapshot.check(fleet)
+    count = snapshot.count
+    if len(fleet) == 0:
+        fleet.adopt_buffer(snapshot.buffer, snapshot.capacity, count)
+        slots = np.arange(count)
+    else:
+        slots = fleet.load_rows(snapshot.columns(fleet), count)
+    # Chip clocks stand still while the simulator is down (and the wall clock may have restarted)
+    fleet.synced_at[slots] += fleet.wall() - snapshot.saved_at
+
+    # Building one handle per session is the bulk of the work; the cyclic GC
+    # would otherwise rescan the growing heap many times over while it runs
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        now = store.clock()
+        store.load([
+            (session_id, attach(session_id, slot), now - idle)
+            for session_id, slot, idle in zip(snapshot.sessions, slots.tolist(), snapshot.idle)
+        ])
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    SNAPSHOT_SECONDS.labels("restore").observe(time.perf_counter() - start)
+    return count
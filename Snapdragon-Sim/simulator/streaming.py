@@ -0,0 +1,49 @@
+"""
+Server-pushed telemetry for dashboards and monitors.
+
+Instead of every tab polling `/telemetry`, clients subscribe to a session's
+stream (WebSocket, or Server-Sent Events as a fallback). `TelemetryHub` hangs
+off the tick scheduler: each time a session's frame is re-serialized, the hub
+fans those same bytes out to every subscriber of that session.
+"""
+import asyncio
+from typing import Callable, Dict, Set
+
+
+class TelemetryHub:
+    """Fans one serialized telemetry frame per session out to all of its subscribers."""
+
+    def __init__(self, current_frame: Callable[[str], bytes]):
+        # Returns the latest serialized frame for a session id
+        self.current_frame = current_frame
+        # session_id -> set of subscriber queues
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, session_id: str) -> asyncio.Queue:
+        """
+        Registers a subscriber and primes it with the current frame so the
+        client doesn't wait a whole tick for its first update.
+        """
+        # Each queue only ever holds the newest frame; slow clients skip frames
+        queue = asyncio.Queue(maxsize=1)
+        self._subscribers.setdefault(session_id, set()).add(queue)
+        queue.put_nowait(self.current_frame(session_id))
+        return queue
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(session_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[session_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, session_id: str, frame):
+        """Tick-scheduler listener: pushes a freshly serialized frame to the session's subscribers."""
+        for queue in self._subscribers.get(session_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(frame.body)
@@ -0,0 +1,276 @@
+"""
+Parallel scenario sweeps over declarative workload profiles, without the web layer.
+
+A profile describes one chip's run:
+
+    {"name": "hp-50", "mode": "High Performance", "battery": 50, "temp": 40,
+     "duration": 3600, "seed": 1,
+     "events": [{"at": 600, "set_mode": "Balance"}, {"at": 1800, "reboot": true}]}
+
+Timed mode switches follow the same rules as the API's /set_mode (only the
+performance modes, and never at or below the saver battery threshold);
+refused switches are counted. A sweep spec lists profiles and/or a grid
+whose axes are crossed into profiles:
+
+    {"grid": {"mode": ["High Performance", "Balance"],
+              "battery": {"start": 1, "stop": 100, "step": 1},
+              "temp": [40, 60]},
+     "duration": 7200, "events": [...]}
+
+Profiles are split into batches; each batch runs as one vectorized Fleet in a
+worker process, stepped tick by tick so crossing times are exact. Each result
+reports time-to-throttle, time-to-saver, peak temperature and energy used
+(battery percentage points drained).
+
+Usage:
+    python -m simulator.sweep spec.json [--workers N] [--csv results.csv]
+    python -m simulator.sweep --mode "High Performance" --battery 1:100:1 --duration 7200
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+from simulator.fleet import (
+    FACTORY_BATTERY, FACTORY_MODE, FACTORY_TEMP, MODE_BATTERY_SAVER, MODE_CODES, MODES, SAVER_BATTERY,
+    SELECTABLE_MODES, TICK_SECONDS, Fleet,
+)
+
+# Profiles simulated together in one vectorized fleet
+BATCH_SIZE = 256
+
+
+class Profile(NamedTuple):
+    """One declarative workload: a starting state, timed events and a duration (simulated seconds)."""
+    name: str
+    mode: str = MODES[FACTORY_MODE]
+    battery: float = FACTORY_BATTERY
+    temp: float = FACTORY_TEMP
+    duration: float = 3600
+    events: tuple = ()
+    seed: Optional[int] = None
+
+
+class ScenarioResult(NamedTuple):
+    name: str
+    mode: str
+    battery: float
+    temp: float
+    time_to_throttle: Optional[float]  # None: never throttled
+    time_to_saver: Optional[float]  # None: never entered a saver mode
+    peak_temp: float
+    energy_used: float  # battery percentage points drained over the run
+    throttled_ratio: float  # share of ticks spent throttling
+    final_battery: float
+    final_mode: str
+    rejected_switches: int
+
+
+# --- Profiles ---
+
+def make_profile(entry: dict, defaults: Optional[dict] = None) -> Profile:
+    """Builds a validated Profile from a spec entry (missing keys fall back to `defaults`)."""
+    entry = {**(defaults or {}), **entry}
+    unknown = set(entry) - set(Profile._fields)
+    if unknown:
+        raise ValueError(f"Unknown profile keys: {', '.join(sorted(unknown))}")
+    profile = Profile(**entry)
+
+    if profile.mode not in MODE_CODES:
+        raise ValueError(f"{profile.name}: unknown mode {profile.mode!r}")
+    if profile.duration <= 0:
+        raise ValueError(f"{profile.name}: duration must be positive")
+    events = []
+    for event in profile.events:
+        if "at" not in event or not ("set_mode" in event) ^ ("reboot" in event):
+            raise ValueError(f"{profile.name}: events need 'at' and exactly one of 'set_mode' / 'reboot'")
+        if "set_mode" in event and event["set_mode"] not in MODE_CODES:
+            raise ValueError(f"{profile.name}: unknown mode {event['set_mode']!r}")
+        events.append(dict(event))
+    return profile._replace(events=tuple(sorted(events, key=lambda e: e["at"])))
+
+
+def _axis(value) -> list:
+    """A grid axis: a list, a scalar, or {"start", "stop", "step"} (stop inclusive)."""
+    if isinstance(value, dict):
+        return np.arange(value["start"], value["stop"] + value["step"] / 2, value["step"]).round(6).tolist()
+    return value if isinstance(value, list) else [value]
+
+
+def load_profiles(spec: dict) -> List[Profile]:
+    """Expands a sweep spec into profiles. Top-level keys other than grid/profiles are defaults."""
+    defaults = {k: v for k, v in spec.items() if k not in ("grid", "profiles")}
+    profiles = [make_profile(entry, defaults) for entry in spec.get("profiles", [])]
+
+    grid = spec.get("grid")
+    if grid:
+        names, axes = zip(*((name, _axis(values)) for name, values in grid.items()))
+        for i, combo in enumerate(itertools.product(*axes)):
+            entry = dict(zip(names, combo))
+            entry.setdefault("name", "-".join(str(v) for v in combo))
+            # Distinct but reproducible jitter per grid point
+            entry.setdefault("seed", (defaults.get("seed") or 0) + i)
+            profiles.append(make_profile(entry, defaults))
+    return profiles
+
+
+# --- Simulation ---
+
+def run_batch(profiles: List[Profile]) -> List[ScenarioResult]:
+    """Runs a batch of profiles side by side in one fleet, tick by tick."""
+    n = len(profiles)
+    fleet = Fleet(capacity=n)
+    slots = np.array([fleet.allocate(p.seed) for p in profiles], dtype=np.intp)
+
+    for slot, profile in zip(slots, profiles):
+        fleet.power_mode[slot] = MODE_CODES[profile.mode]
+        fleet.battery[slot] = profile.battery
+        fleet.global_temp[slot] = profile.temp
+        fleet.core_temp[slot] = profile.temp
+
+    # Timed events, keyed by the tick they fire on
+    schedule = {}
+    for i, profile in enumerate(profiles):
+        for event in profile.events:
+            schedule.setdefault(int(round(event["at"] / TICK_SECONDS)), []).append((i, event))
+
+    total_ticks = np.array([int(round(p.duration / TICK_SECONDS)) for p in profiles])
+    throttle_at = np.full(n, -1)
+    saver_at = np.full(n, -1)
+    peak_temp = fleet.global_temp[slots].copy()
+    energy = np.zeros(n)
+    throttled_ticks = np.zeros(n, dtype=np.int64)
+    rejected = np.zeros(n, dtype=np.int64)
+
+    for tick in range(int(total_ticks.max())):
+        for i, event in schedule.get(tick, ()):
+            if tick >= total_ticks[i]:
+                continue
+            slot = slots[i]
+            if "reboot" in event:
+                fleet.reset(slot)
+            elif event["set_mode"] in SELECTABLE_MODES and fleet.battery[slot] > SAVER_BATTERY:
+                fleet.power_mode[slot] = MODE_CODES[event["set_mode"]]
+            else:
+                rejected[i] += 1
+
+        live = np.flatnonzero(total_ticks > tick)
+        idx = slots[live]
+        before = fleet.battery[idx]
+        fleet.step(idx)
+
+        # Per-tick metrics, vectorized over the live profiles
+        elapsed = tick + 1
+        energy[live] += np.maximum(before - fleet.battery[idx], 0)
+        peak_temp[live] = np.maximum(peak_temp[live], fleet.global_temp[idx])
+        throttling = fleet.is_throttling[idx]
+        throttled_ticks[live] += throttling
+        throttle_at[live[throttling & (throttle_at[live] < 0)]] = elapsed
+        in_saver = fleet.power_mode[idx] >= MODE_BATTERY_SAVER
+        saver_at[live[in_saver & (saver_at[live] < 0)]] = elapsed
+
+    def seconds(ticks):
+        return None if ticks < 0 else float(ticks * TICK_SECONDS)
+
+    return [
+        ScenarioResult(
+            name=p.name, mode=p.mode, battery=p.battery, temp=p.temp,
+            time_to_throttle=seconds(throttle_at[i]),
+            time_to_saver=seconds(saver_at[i]),
+            peak_temp=float(peak_temp[i]),
+            energy_used=round(float(energy[i]), 2),
+            throttled_ratio=round(float(throttled_ticks[i] / total_ticks[i]), 4),
+            final_battery=float(fleet.battery[slots[i]]),
+            final_mode=MODES[fleet.power_mode[slots[i]]],
+            rejected_switches=int(rejected[i]),
+        )
+        for i, p in enumerate(profiles)
+    ]
+
+
+def run_sweep(profiles: List[Profile], workers: Optional[int] = None,
+              batch_size: int = BATCH_SIZE) -> List[ScenarioResult]:
+    """Runs every profile, batches spread over `workers` processes (default: all cores). Keeps input order."""
+    batches = [profiles[i:i + batch_size] for i in range(0, len(profiles), batch_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(batches) <= 1:
+        return [result for batch in batches for result in run_batch(batch)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [result for batch in pool.map(run_batch, batches) for result in batch]
+
+
+# --- Output ---
+
+def format_table(results: Iterable[ScenarioResult]) -> str:
+    """Aligned text table, one row per scenario."""
+    headers = ("name", "time_to_throttle", "time_to_saver", "peak_temp", "energy_used", "throttled_ratio",
+               "final_battery", "final_mode")
+    rows = [[("-" if getattr(r, h) is None else str(getattr(r, h))) for h in headers] for r in results]
+    widths = [max([len(h)] + [len(row[i]) for row in rows]) for i, h in enumerate(headers)]
+    lines = [" | ".join(h.rjust(w) for h, w in zip(headers, widths)), "-+-".join("-" * w for w in widths)]
+    lines += [" | ".join(cell.rjust(w) for cell, w in zip(row, widths)) for row in rows]
+    return "\n".join(lines)
+
+
+def write_csv(results: List[ScenarioResult], path: str):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(ScenarioResult._fields)
+        writer.writerows(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simulator.sweep", description="Run a scenario sweep.")
+    parser.add_argument("spec", nargs="?", help="JSON sweep spec (see module docs)")
+    parser.add_argument("--mode", action="append", help="grid axis: starting mode (repeatable)")
+    parser.add_argument("--battery", help="grid axis: start:stop:step or a single value")
+    parser.add_argument("--temp", help="grid axis: start:stop:step or a single value")
+    parser.add_argument("--duration", type=float, help="simulated seconds per scenario")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--csv", help="also write every result to this CSV file")
+    args = parser.parse_args(argv)
+
+    spec = {}
+    if args.spec:
+        with open(args.spec) as f:
+            spec = json.load(f)
+
+    def axis(text):
+        parts = [float(p) for p in text.split(":")]
+        return parts[0] if len(parts) == 1 else {"start": parts[0], "stop": parts[1], "step": parts[2]}
+
+    grid = dict(spec.get("grid", {}))
+    if args.mode:
+        grid["mode"] = args.mode
+    if args.battery:
+        grid["battery"] = axis(args.battery)
+    if args.temp:
+        grid["temp"] = axis(args.temp)
+    if grid:
+        spec["grid"] = grid
+    if args.duration:
+        spec["duration"] = args.duration
+    if not spec.get("grid") and not spec.get("profiles"):
+        parser.error("give a spec file or at least one grid axis (--mode / --battery / --temp)")
+
+    try:
+        profiles = load_profiles(spec)
+    except (TypeError, ValueError) as exc:
+        parser.error(str(exc))
+    results = run_sweep(profiles, workers=args.workers)
+    print(format_table(results))
+    if args.csv:
+        write_csv(results, args.csv)
+        print(f"\n{len(results)} results written to {args.csv}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    # Run via the importable module so worker processes can unpickle its classes
+    from simulator.sweep import main as sweep_main
+    sweep_main()
@@ -0,0 +1,96 @@
+"""
+Server-side condition waits, so clients stop polling for a state.
+
+A client that needs to know when its chip starts throttling, or when the
+battery reaches 20%, sends the condition once to `/wait_for` (in selector
+syntax, see simulator.selectors) and the request parks on an asyncio event.
+The condition is registered as a watch on the chip's fleet slot, so whatever
+catches the chip up (a scheduler tick, /advance, a manual step) pauses on the
+first tick the condition holds. The frame is rendered right there, the event
+fires, and physics carries on.
+"""
+import asyncio
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from simulator.selectors import Selector, select
+
+
+class Waiter:
+    """One pending wait; `frame` and `tick` are filled in once the condition holds."""
+
+    def __init__(self, selectors: List[Selector]):
+        self.selectors = selectors
+        self.event = asyncio.Event()
+        self.frame: Optional[dict] = None
+        self.tick: Optional[int] = None
+        self._loop = asyncio.get_running_loop()
+
+    def condition(self, columns, slots: np.ndarray) -> np.ndarray:
+        return select(columns, slots, self.selectors)
+
+    @property
+    def matched(self) -> bool:
+        return self.frame is not None
+
+
+class ConditionWaits:
+    """Registers condition waits as fleet watches and wakes the waiting requests."""
+
+    def __init__(self, render: Callable[[str, object], dict]):
+        # Builds a chip's public telemetry frame from its current state
+        self.render = render
+        self.pending = 0
+
+    def _fire(self, waiter: Waiter, session_id: str, chip):
+        waiter.frame = self.render(session_id, chip)
+        waiter.tick = chip.ticks
+        # The catch-up may run outside the waiter's event loop (e.g. another thread)
+        waiter._loop.call_soon_threadsafe(waiter.event.set)
+
+    async def wait(self, session_id: str, chip, selectors: List[Selector], timeout: float,
+                   poll_interval: float = 1.0, drive: bool = False) -> Waiter:
+        """
+        Waits up to `timeout` wall seconds for the chip's state to satisfy
+        every selector and returns the waiter (check `matched`). A condition
+        that already holds returns at once with the current frame.
+
+        Crossings are caught by the fleet watch as physics runs. Every
+        `poll_interval` the current state is re-checked as well, which covers
+        changes made outside physics (commands, other worker processes). With
+        `drive`, the poll also catches the chip up to now, for when no tick
+        scheduler is running.
+        """
+        waiter = Waiter(selectors)
+        fleet, slot = chip.fleet, chip.slot
+
+        def fire():
+            self._fire(waiter, session_id, chip)
+
+        with fleet.locked(slot):
+            chip.sync()
+            if waiter.condition(fleet, np.array([slot]))[0]:
+                fire()
+                return waiter
+            fleet.watch(slot, waiter.condition, fire)
+
+        self.pending += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        try:
+            while not waiter.matched:
+                left = deadline - loop.time()
+                if left <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), min(left, poll_interval))
+                except asyncio.TimeoutError:
+                    with fleet.locked(slot):
+                        if drive:
+                            chip.sync()
+                        fleet.check_watches(slot)
+        finally:
+            self.pending -= 1
+            fleet.unwatch(slot, fire)
+        return waiter
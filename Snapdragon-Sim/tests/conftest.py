@@ -1,23 +1,169 @@
-import pytest
+"""
+Shared fixtures for the HIL suites.
+
+Every test gets its own chip: `chip_session` is a cookie value unique to the
+test (and the xdist worker running it), and the clients below send it, so
+tests never share simulator state and the suite can run in parallel
+(`pytest -n auto` with pytest-xdist).
+
+- `client`: the in-process app through a TestClient (no server, no sockets)
+- `api`: an httpx.AsyncClient over an in-process ASGI transport, for tests
+  that need several requests in flight at once
+- `live_server`: a real uvicorn process on an ephemeral port, one per worker,
+  for the browser tests (set SIM_BASE_URL to test an existing server instead)
+
+The clients and the server are session-scoped and pooled; only the cookie
+changes from test to test.
+"""
+import atexit
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
 import httpx
+import pytest
+import pytest_asyncio
+
+# Each worker keeps its files (status registers, shared state, run journals)
+# to itself. This has to happen before the app is imported below.
+WORKER = os.environ.get("PYTEST_XDIST_WORKER", "main")
+_STATE_DIR = tempfile.mkdtemp(prefix=f"snapdragon-tests-{WORKER}-")
+atexit.register(shutil.rmtree, _STATE_DIR, ignore_errors=True)
+os.environ.setdefault("SIM_REGISTER_FILE", os.path.join(_STATE_DIR, "registers.bin"))
+os.environ.setdefault("SIM_SHARED_STATE", os.path.join(_STATE_DIR, "fleet.bin"))
+os.environ.setdefault("SIM_RECORD_DIR", os.path.join(_STATE_DIR, "runs"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from simulator.chip_api import app, user_sessions  # noqa: E402
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Longest wait for the live server to start listening
+SERVER_START_TIMEOUT = 30
+
+
+@pytest.fixture
+def chip_session():
+    """A chip session id no other test (or worker) uses; the chip is dropped afterwards."""
+    session_id = f"test-{WORKER}-{uuid.uuid4().hex}"
+    yield session_id
+    user_sessions.discard(session_id)
+
+
+@pytest.fixture
+def chip(chip_session):
+    """The in-process simulator handle behind `chip_session`, for setting up state directly."""
+    return user_sessions.get_or_create(chip_session)
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    # Not entered as a context manager: the lifespan's background tick loop
+    # would advance chips behind the tests' backs
+    return TestClient(app)
 
-# The address of our "Hardware" simulator
-SIMULATOR_URL = "http://127.0.0.1:8000"
 
+@pytest.fixture
+def client(app_client, chip_session, chip):
+    """The session's TestClient, talking to this test's own (already created) chip."""
+    app_client.cookies.clear()
+    app_client.cookies.set("chip_session", chip_session)
+    yield app_client
+    app_client.cookies.clear()
 
-@pytest.fixture(scope="function")
-async def power_cycle():
+
+@pytest.fixture(scope="session")
+def asgi_transport():
+    return httpx.ASGITransport(app=app)
+
+
+@pytest_asyncio.fixture
+async def api(asgi_transport, chip_session, chip):
+    """An async client over the in-process ASGI transport, talking to this test's own chip."""
+    async with httpx.AsyncClient(transport=asgi_transport, base_url="http://sim",
+                                 cookies={"chip_session": chip_session}) as api:
+        yield api
+
+
+@pytest.fixture
+def power_cycle(client):
     """
-    This is a FIXTURE. 
-    It runs BEFORE the test to ensure the chip is fresh.
+    Reboots this test's chip before the test, so it starts from factory state.
     """
-    async with httpx.AsyncClient() as client:
-        # --- SETUP: Reboot the chip ---
-        print("\n[HIL] Initiating Power Cycle... Rebooting Snapdragon SoC.")
-        await client.post(f"{SIMULATOR_URL}/reboot")
-        
-        # This 'yield' is where the actual test happens
-        yield 
-        
-        # --- TEARDOWN: Clean up after the test ---
-        print("[HIL] Test finished. Chip state logged.")
\ No newline at end of file
+    print("\n[HIL] Initiating Power Cycle... Rebooting Snapdragon SoC.")
+    client.post("/reboot")
+    yield
+    print("[HIL] Test finished. Chip state logged.")
+
+
+# --- Live Server ---
+
+def _start_server(log_path: str, state_dir: str) -> tuple:
+    env = dict(os.environ)
+    env.update({
+        "SIM_REGISTER_FILE": os.path.join(state_dir, "registers.bin"),
+        "SIM_SHARED_STATE": os.path.join(state_dir, "fleet.bin"),
+        "SIM_RECORD_DIR": os.path.join(state_dir, "runs"),
+    })
+    # Port 0: the OS picks a free port, and uvicorn logs which one
+    command = [sys.executable, "-m", "uvicorn", "simulator.chip_api:app", "--host", "127.0.0.1", "--port", "0"]
+    log = open(log_path, "wb")
+    process = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        with open(log_path, "rb") as f:
+            match = re.search(rb"Uvicorn running on (http://\S+)", f.read())
+        if match:
+            return process, match.group(1).decode()
+        if process.poll() is not None:
+            break
+        time.sleep(0.05)
+    process.kill()
+    with open(log_path, "rb") as f:
+        raise RuntimeError(f"Simulator did not start:\n{f.read().decode(errors='replace')}")
+
+
+@pytest.fixture(scope="session")
+def live_server(tmp_path_factory):
+    """Base URL ("http://127.0.0.1:PORT/") of a simulator process private to this worker."""
+    external = os.environ.get("SIM_BASE_URL")
+    if external:
+        yield external.rstrip("/") + "/"
+        return
+    state_dir = str(tmp_path_factory.mktemp("live_server"))
+    process, url = _start_server(os.path.join(state_dir, "server.log"), state_dir)
+    yield url + "/"
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+@pytest.fixture(scope="session")
+def base_url(live_server):
+    """pytest-playwright resolves relative page.goto() URLs against this."""
+    return live_server
+
+
+@pytest.fixture(scope="session")
+def live_http(live_server):
+    """Keep-alive connection pool to the live server."""
+    with httpx.Client(base_url=live_server) as pool:
+        yield pool
+
+
+@pytest.fixture
+def live_client(live_http, chip_session):
+    """The pooled live-server client, talking to this test's own chip."""
+    live_http.cookies.clear()
+    live_http.cookies.set("chip_session", chip_session)
+    # The server creates the chip on its first telemetry request
+    live_http.get("/telemetry").raise_for_status()
+    yield live_http
+    live_http.cookies.clear()
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from framework.utils.bit_parser import BitParser
+
+
+def test_scalar_parse_uses_register_map():
+    """Verifies the scalar decoder still returns the documented fields."""
+    assert BitParser.parse_status("0x0A01") == {"overheat_fault": True, "voltage_fault": False, "reporting_core": 10}
+    assert BitParser.parse_status("0x0702") == {"overheat_fault": False, "voltage_fault": True, "reporting_core": 7}
+
+
+@pytest.mark.parametrize("byteorder", ["little", "big"])
+def test_batch_decode_matches_scalar_for_every_value(byteorder):
+    """Verifies the columnar decoder agrees with parse_status across all 65536 registers."""
+    regs = np.arange(0x10000, dtype=np.uint16)
+    raw = regs.astype("<u2" if byteorder == "little" else ">u2").tobytes()
+
+    cols = BitParser.parse_status_batch(memoryview(raw), byteorder=byteorder)
+    scalar = [BitParser.parse_status(hex(value)) for value in range(0x10000)]
+    assert cols.overheat_fault.tolist() == [s["overheat_fault"] for s in scalar]
+    assert cols.voltage_fault.tolist() == [s["voltage_fault"] for s in scalar]
+    assert cols.reporting_core.tolist() == [s["reporting_core"] for s in scalar]
+    print(f"\n[BITS] {byteorder}-endian batch decode verified.")
+
+
+def test_batch_accepts_arrays_without_copying():
+    """Verifies uint16 arrays and raw buffers are decoded in place."""
+    regs = np.array([0x0301, 0x0102], dtype=np.uint16)
+    assert BitParser.as_registers(regs) is regs
+
+    raw = bytearray(regs.tobytes())
+    view = BitParser.as_registers(raw)
+    raw[0] = 0x00  # the view shares memory with the dump
+    assert view[0] == 0x0300
+
+    with pytest.raises(ValueError):
+        BitParser.parse_status_batch(b"\x01\x02\x03")
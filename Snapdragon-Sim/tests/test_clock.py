@@ -0,0 +1,74 @@
+from fastapi.testclient import TestClient
+from simulator.chip_api import app
+from simulator.fleet import Fleet, MODE_CODES
+
+
+class FakeWall:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_state_depends_on_simulated_time_not_poll_rate():
+    """Verifies two chips reach the same tick count however often they are polled."""
+    wall = FakeWall()
+    fleet = Fleet(capacity=2, seed=0, time_scale=100.0, wall=wall)
+    polled, idle = fleet.allocate(), fleet.allocate()
+
+    for _ in range(10):
+        wall.now += 0.1
+        fleet.sync(polled)
+    fleet.sync(idle)
+
+    # 1 wall second at 100x = 100 simulated seconds = 100 physics ticks
+    assert fleet.ticks[polled] == fleet.ticks[idle] == 100
+    assert fleet.battery[polled] == fleet.battery[idle] == 85.0
+    print("\n[CLOCK] Poll-rate independence verified.")
+
+
+def test_fast_forward_and_pause():
+    """Verifies fast_forward runs the owed ticks and a 0x chip stays frozen."""
+    wall = FakeWall()
+    fleet = Fleet(capacity=1, seed=0, time_scale=0.0, wall=wall)
+    slot = fleet.allocate()
+    fleet.power_mode[slot] = MODE_CODES["High Performance"]
+
+    wall.now += 60
+    fleet.sync(slot)
+    assert fleet.ticks[slot] == 0
+
+    fleet.fast_forward(slot, 240)
+    assert fleet.ticks[slot] == 240
+    assert fleet.battery[slot] <= 20
+    print("\n[CLOCK] Fast-forward verified.")
+
+
+def test_advance_endpoint_reaches_pmic_override():
+    """Verifies /advance catches a session up to the Battery Saver override in one call."""
+    client = TestClient(app)
+    client.get("/telemetry")
+    client.post("/clock?time_scale=0")
+    client.post("/set_mode?mode=High Performance")
+
+    response = client.post("/advance?seconds=200")
+    assert response.status_code == 200
+    assert response.json()["ticks"] == 200
+
+    telemetry = client.get("/telemetry").json()
+    assert telemetry["battery"] <= 20
+    assert "Saver" in telemetry["power_mode"]
+
+    assert client.post("/advance?seconds=-5").status_code == 400
+    print("\n[CLOCK] /advance endpoint verified.")
+
+
+def test_clock_rejects_bad_time_scales(client):
+    """Verifies negative, non-finite and too-fast time scales get a 400 and leave the clock alone."""
+    client.post("/clock?time_scale=0")
+    for bad in ("-1", "nan", "inf", "-inf", "1e9"):
+        assert client.post(f"/clock?time_scale={bad}").status_code == 400
+    clock = client.get("/clock")
+    assert clock.status_code == 200
+    assert clock.json()["time_scale"] == 0
@@ -0,0 +1,52 @@
+import gzip
+
+import pytest
+
+from simulator.dashboard import DASHBOARD_HTML, PrecompressedPage, dashboard_page
+
+
+def test_dashboard_is_served_compressed_and_revalidated(client):
+    """Verifies gzip delivery, the per-encoding strong ETag and a bodiless 304 on revalidation."""
+    plain = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert plain.status_code == 200
+    assert "content-encoding" not in plain.headers
+    assert plain.text == DASHBOARD_HTML
+    assert plain.headers["vary"] == "Accept-Encoding"
+
+    compressed = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] != plain.headers["etag"]
+    assert int(compressed.headers["content-length"]) < len(plain.content) // 2
+    assert gzip.decompress(dashboard_page.variants["gzip"].body).decode() == DASHBOARD_HTML
+
+    for etag in (compressed.headers["etag"], f"W/{compressed.headers['etag']}", '"stale", ' + compressed.headers["etag"]):
+        revalidated = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == compressed.headers["etag"]
+    # Another encoding's ETag is not a match
+    assert client.get("/", headers={"Accept-Encoding": "gzip",
+                                    "If-None-Match": plain.headers["etag"]}).status_code == 200
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("", "identity"),
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0.5, identity", "identity"),
+    ("gzip;q=0, *;q=0.1", "identity"),
+    ("identity;q=0, *;q=0", "identity"),  # nothing acceptable: send it plain anyway
+    ("deflate", "identity"),
+    ("*", "gzip"),
+])
+def test_accept_encoding_negotiation(accept, expected):
+    page = PrecompressedPage("<html></html>")
+    page.variants.pop("br", None)
+    assert page.negotiate(accept) == expected
+
+
+def test_brotli_preferred_when_available():
+    """Verifies br wins a tie with gzip, and is only offered with the brotli package installed."""
+    brotli = pytest.importorskip("brotli")
+    assert dashboard_page.negotiate("gzip, deflate, br") == "br"
+    assert dashboard_page.negotiate("gzip, br;q=0.5") == "gzip"
+    assert brotli.decompress(dashboard_page.variants["br"].body).decode() == DASHBOARD_HTML
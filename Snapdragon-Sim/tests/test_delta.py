@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+from simulator.chip_api import tick_scheduler
+from simulator.delta import apply_delta, encode_delta, pack_frame
+
+
+@pytest.fixture
+def frozen(client):
+    """This test's chip with its clock stopped, so only /advance moves it."""
+    client.post("/clock", params={"time_scale": 0})
+    return client
+
+
+def poll(client, since):
+    return client.get("/telemetry", params={"since": since}).json()
+
+
+def test_delta_chain_rebuilds_full_frames(frozen):
+    """Verifies a keyframe then deltas decode to exactly the full frames, without the static fields."""
+    update = poll(frozen, 0)
+    assert update["keyframe"] is True
+    frame, seq = apply_delta(None, update), update["seq"]
+    assert frame == frozen.get("/telemetry").json()
+
+    for step in range(5):
+        frozen.post("/advance", params={"seconds": 1})
+        if step == 2:
+            frozen.post("/set_mode", params={"mode": "High Performance"})
+        response = frozen.get("/telemetry", params={"since": seq})
+        update = response.json()
+        assert "keyframe" not in update
+        assert not {"device_id", "chipset", "cores"} & update.keys()
+        frame, seq = apply_delta(frame, update), update["seq"]
+
+        full = frozen.get("/telemetry")
+        assert frame == full.json()
+        assert len(response.content) < len(full.content) / 2
+
+    # Nothing changed since the last poll: an empty delta
+    assert poll(frozen, seq) == {"seq": seq}
+
+
+def test_keyframe_when_the_base_frame_is_gone(frozen, chip):
+    """Verifies unknown and too-old sequence numbers fall back to a keyframe."""
+    first = poll(frozen, 0)["seq"]
+    assert poll(frozen, first + 12345)["keyframe"] is True
+    for bad in ("-1", "²", "1e3"):
+        assert frozen.get("/telemetry", params={"since": bad}).status_code == 400
+
+    for _ in range(tick_scheduler.window):
+        frozen.post("/advance", params={"seconds": 1})
+        # Full-frame reads extend the history too, once the chip has asked for deltas
+        frozen.get("/telemetry")
+    assert len(chip.frame.history) == tick_scheduler.window
+    update = poll(frozen, first)
+    assert update["keyframe"] is True
+    assert apply_delta(None, update) == frozen.get("/telemetry").json()
+    assert "keyframe" not in poll(frozen, chip.frame.history[0][0])
+
+
+def test_window_zero_always_sends_keyframes(frozen, chip, monkeypatch):
+    """Verifies chips keep no history with SIM_DELTA_WINDOW=0, and every ?since= poll gets a keyframe."""
+    monkeypatch.setattr(tick_scheduler, "window", 0)
+    first = poll(frozen, 0)
+    assert first["keyframe"] is True
+    frozen.post("/advance", params={"seconds": 1})
+    update = poll(frozen, first["seq"])
+    assert update["keyframe"] is True
+    assert apply_delta(None, update) == frozen.get("/telemetry").json()
+    assert chip.frame.history == ()
+
+
+def test_full_frame_clients_keep_no_history(frozen, chip):
+    """Verifies chips nobody polls for deltas don't pay for the frame history."""
+    frozen.get("/telemetry")
+    frozen.post("/advance", params={"seconds": 1})
+    frozen.get("/telemetry")
+    assert chip.frame.history == ()
+
+
+def test_delta_encoding_of_every_field():
+    """Verifies modes, throttling and per-core values round-trip through a delta."""
+    cores = [{"id": i, "type": "Prime", "speed": 3.53, "temp": 40.0} for i in range(4)]
+    old = {"device_id": "d", "chipset": "c", "battery": 80.0, "power_mode": "Balance",
+           "thermal_status": "OPTIMAL", "global_temp": 50.0, "cores": cores}
+    new = dict(old, battery=79.5, power_mode="High Performance", thermal_status="THROTTLING",
+               cores=[dict(c, speed=4.32) if c["id"] == 1 else dict(c, temp=41.5) for c in cores])
+
+    update = json.loads(encode_delta(2, pack_frame(old), pack_frame(new)))
+    assert update == {"seq": 2, "battery": 7950, "power_mode": "High Performance", "thermal_status": "THROTTLING",
+                      "speed": [1, 432], "temp": [0, 415, 2, 415, 3, 415]}
+    assert apply_delta(old, update) == new
+    assert old["cores"][1]["speed"] == 3.53  # the base frame is left alone
+
+    # A different core count, or a value off the fixed-point grid, can't be expressed as a delta
+    assert encode_delta(2, pack_frame(old), pack_frame(dict(new, cores=cores[:2]))) is None
+    assert pack_frame(dict(new, global_temp=50.25)) is None
+    assert encode_delta(2, pack_frame(old), None) is None
@@ -0,0 +1,102 @@
+import json
+
+import numpy as np
+from simulator.fleet import Fleet, MODE_CODES, MODES
+from simulator.chip_api import SnapdragonSimulator, render_frame
+
+
+def test_batched_step_matches_power_mode_rules():
+    """Verifies the PMIC override and mode targets hold for a whole batch at once."""
+    fleet = Fleet(capacity=4, seed=1)
+    slots = [fleet.allocate() for _ in range(3)]
+
+    fleet.power_mode[slots] = MODE_CODES["High Performance"]
+    fleet.battery[slots] = [50.0, 20.0, 5.0]
+    fleet.step()
+
+    assert [MODES[m] for m in fleet.power_mode[slots]] == ["High Performance", "Battery Saver", "Ultra Saver"]
+    assert fleet.battery[slots].tolist() == [49.55, 19.95, 4.95]
+    # Prime cores boosted to ~4.32 GHz only on the chip still in High Performance
+    assert np.all(np.abs(fleet.core_speed[slots[0], :2] - 4.32) <= 0.03 + 1e-9)
+    assert np.all(np.abs(fleet.core_speed[slots[1:], :2] - 1.20) <= 0.03 + 1e-9)
+    print("\n[FLEET] PMIC override verified across a batch.")
+
+
+def test_throttling_hysteresis():
+    """Verifies throttling latches above 85°C and releases only below 65°C."""
+    fleet = Fleet(capacity=1, seed=2)
+    slot = fleet.allocate()
+
+    fleet.global_temp[slot] = 86.0
+    fleet.step(slot)
+    assert fleet.is_throttling[slot]
+    assert np.all(np.abs(fleet.core_speed[slot, :2] - 1.80) <= 0.03 + 1e-9)
+
+    # Between 65 and 85 the governor keeps throttling
+    fleet.global_temp[slot] = 70.0
+    fleet.step(slot)
+    assert fleet.is_throttling[slot]
+
+    fleet.global_temp[slot] = 64.0
+    fleet.step(slot)
+    assert not fleet.is_throttling[slot]
+    print("\n[FLEET] Thermal hysteresis verified.")
+
+
+def test_subset_step_and_growth():
+    """Verifies stepping a subset leaves other chips alone and growth keeps state."""
+    fleet = Fleet(capacity=2, seed=3)
+    a, b = fleet.allocate(), fleet.allocate()
+    fleet.step(a)
+    assert fleet.battery[a] == 99.85
+    assert fleet.battery[b] == 100.0
+
+    # A third chip forces the buffer to grow; existing slots must survive
+    c = fleet.allocate()
+    assert fleet.capacity == 4
+    assert fleet.battery[a] == 99.85
+    assert len(fleet) == 3
+
+    fleet.release(b)
+    assert fleet.active_slots().tolist() == [a, c]
+    print("\n[FLEET] Subset stepping and buffer growth verified.")
+
+
+def test_simulator_is_a_view_over_the_fleet():
+    """Verifies the per-session API reads and writes the fleet arrays."""
+    fleet = Fleet(capacity=1, seed=4)
+    sim = SnapdragonSimulator("view-test", fleet=fleet)
+
+    sim.state["battery_level"] = 15.0
+    assert fleet.battery[sim.slot] == 15.0
+
+    state = sim.update_physics()
+    assert state["power_mode"] == "Battery Saver"
+    assert len(state["cores"]) == 8
+    assert state["cores"][0]["type"] == "Prime"
+
+    sim.close()
+    assert len(fleet) == 0
+    print("\n[FLEET] Session view verified.")
+
+
+def test_compact_handle_keeps_the_frame_contract():
+    """Verifies the slotted handle carries no per-session dict and frames keep their exact JSON shape."""
+    fleet = Fleet(capacity=1, seed=2)
+    sim = SnapdragonSimulator("compact-test", fleet=fleet)
+    assert not hasattr(sim, "__dict__")
+    core_type = fleet.profile.core_types
+    assert fleet.profile.core_cluster.tolist() == [core_type.Prime] * 2 + [core_type.Performance] * 6
+    assert fleet.profile.core_labels == ("Prime",) * 2 + ("Performance",) * 6
+
+    fleet.step()
+    frame = json.loads(json.dumps(render_frame("compact-test", sim)))
+    assert list(frame) == ["device_id", "chipset", "battery", "power_mode", "thermal_status", "global_temp", "cores"]
+    assert frame["battery"] == 99.85 and frame["power_mode"] == "Balance" and frame["thermal_status"] == "OPTIMAL"
+    assert [list(core) for core in frame["cores"]] == [["id", "type", "speed", "temp"]] * 8
+    assert [core["type"] for core in frame["cores"]][1:3] == ["Prime", "Performance"]
+    assert all(isinstance(core["speed"], float) for core in frame["cores"])
+
+    # Dropping the handle hands its slot back
+    del sim
+    assert len(fleet) == 0
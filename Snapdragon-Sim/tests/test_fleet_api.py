@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from simulator.chip_api import app, user_sessions
+from simulator.fleet import Fleet
+from simulator.selectors import parse_selector, select
+
+client = TestClient(app)
+
+
+def new_devices(n):
+    """Creates n sessions (each with its own cookie) and pauses their clocks."""
+    ids = []
+    for _ in range(n):
+        client.cookies.clear()
+        device_id = client.get("/telemetry").json()["device_id"]
+        client.post("/clock?time_scale=0")
+        ids.append(device_id)
+    client.cookies.clear()
+    return ids
+
+
+def test_selectors():
+    fleet = Fleet(capacity=4, seed=0)
+    slots = np.array([fleet.allocate() for _ in range(4)])
+    fleet.battery[slots] = [10, 20, 50, 90]
+    fleet.is_throttling[slots] = [True, False, True, False]
+
+    assert select(fleet, slots, [parse_selector("battery < 20")]).tolist() == [True, False, False, False]
+    assert select(fleet, slots, [parse_selector("battery<=20"), parse_selector("optimal")]).tolist() == [
+        False, True, False, False]
+    assert select(fleet, slots, [parse_selector("throttling")]).sum() == 2
+    assert select(fleet, slots, [parse_selector("mode=Balance")]).all()
+    for bad in ("battery ~ 3", "voltage < 3", "battery < low", "mode>Balance"):
+        with pytest.raises(ValueError):
+            parse_selector(bad)
+
+
+def test_fleet_telemetry_by_ids_and_selector():
+    """Verifies one batched call returns columns for exactly the requested devices."""
+    ids = new_devices(3)
+    user_sessions.get(ids[1]).state["battery_level"] = 15
+
+    data = client.post("/fleet/telemetry", json={"devices": ids + ["missing"]}).json()
+    assert data["devices"] == ids
+    assert data["count"] == 3 and len(data["core_temp"]) == 3 and len(data["core_temp"][0]) == 8
+    assert data["not_found"] == ["missing"]
+
+    low = client.get("/fleet/telemetry", params={"devices": ",".join(ids), "select": "battery < 20"}).json()
+    assert low["devices"] == [ids[1]] and low["battery"] == [15]
+
+    assert client.get("/fleet/telemetry?select=voltage<3").status_code == 400
+    print("\n[FLEET] Batched telemetry verified.")
+
+
+def test_fleet_set_mode_applies_low_battery_rule():
+    """Verifies the batch switch honours the same battery guard as /set_mode."""
+    ids = new_devices(3)
+    user_sessions.get(ids[0]).state["battery_level"] = 10
+
+    result = client.post("/fleet/set_mode", json={"devices": ids, "mode": "High Performance"}).json()
+    assert result["switched"] == ids[1:]
+    assert result["battery_too_low"] == [ids[0]]
+    assert user_sessions.get(ids[1]).state["power_mode"] == "High Performance"
+    assert user_sessions.get(ids[0]).state["power_mode"] == "Balance"
+
+    assert client.post("/fleet/set_mode", json={"devices": ids, "mode": "Ultra Saver"}).status_code == 400
+
+
+def test_fleet_reboot_with_selector():
+    ids = new_devices(2)
+    user_sessions.get(ids[0]).state["global_temp"] = 90
+    user_sessions.get(ids[0]).state["is_throttling"] = True
+
+    result = client.post("/fleet/reboot", json={"devices": ids, "select": ["throttling"]}).json()
+    assert result["rebooted"] == [ids[0]]
+    assert user_sessions.get(ids[0]).state["global_temp"] == 40.0
+    assert not user_sessions.get(ids[0]).state["is_throttling"]
@@ -0,0 +1,74 @@
+import json
+
+from fastapi.testclient import TestClient
+from simulator.chip_api import app, user_sessions, tick_scheduler
+
+
+def test_frame_is_serialized_once_per_tick():
+    """Verifies repeated reads within a tick return the same cached bytes and ETag."""
+    client = TestClient(app)
+    first = client.get("/telemetry")
+    client.post("/clock?time_scale=0")
+    device_id = first.json()["device_id"]
+    cached = user_sessions.get(device_id).frame
+
+    again = client.get("/telemetry")
+    assert again.content == first.content
+    assert again.headers["etag"] == first.headers["etag"] == cached.etag
+    assert user_sessions.get(device_id).frame is cached
+    print(f"\n[CACHE] Frame {cached.etag} reused across reads.")
+
+
+def test_if_none_match_returns_304_until_state_changes():
+    """Verifies the ETag 304 path and that ticks and commands refresh the frame."""
+    client = TestClient(app)
+    client.get("/telemetry")
+    client.post("/clock?time_scale=0")
+    etag = client.get("/telemetry").headers["etag"]
+
+    not_modified = client.get("/telemetry", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    # A command changes state without a tick; the frame must still be rebuilt
+    client.post("/set_mode?mode=High Performance")
+    changed = client.get("/telemetry", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["power_mode"] == "High Performance"
+
+    client.post("/advance?seconds=1")
+    assert client.get("/telemetry").headers["etag"] != changed.headers["etag"]
+    print("\n[CACHE] ETag / 304 path verified.")
+
+
+def test_scheduler_tick_advances_and_serializes_all_sessions():
+    """Verifies one scheduler tick catches every session up and caches its frame."""
+    client = TestClient(app)
+    device_id = client.get("/telemetry").json()["device_id"]
+    client.post("/clock?time_scale=0")
+    client.post("/advance?seconds=3")
+
+    tick_scheduler.tick()
+    chip = user_sessions.get(device_id)
+    assert chip.frame.version == chip.version
+    assert chip.ticks == 3
+    assert b'"device_id": "' + device_id.encode() in chip.frame.body
+
+
+def test_tick_encodes_from_a_copy_taken_under_the_lock(client, chip):
+    """Verifies frames render from the rows copied under the lock, and a frame a request built meanwhile is kept."""
+    client.post("/clock?time_scale=0")
+    client.post("/advance?seconds=1")
+    batches = tick_scheduler._collect()
+    # Changes after the copy don't leak into the frame being encoded
+    battery = float(chip.fleet.battery[chip.slot])
+    chip.fleet.battery[chip.slot] = 1.0
+    encoded = tick_scheduler._encode(batches)
+    ours = next(body for pending, body, _ in encoded if pending.chip is chip)
+    assert json.loads(ours)["battery"] == battery
+    chip.fleet.battery[chip.slot] = battery
+
+    # A request serialized the same state while the tick was encoding: its frame stays
+    served = client.get("/telemetry").headers["etag"]
+    tick_scheduler._publish(encoded, 0.0)
+    assert chip.frame.etag == served
@@ -0,0 +1,126 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from simulator.chip_api import app, user_sessions
+from simulator.fleet import Fleet, HISTORY_DEPTH, MODE_CODES
+from simulator.history import downsample, read_history
+
+client = TestClient(app)
+
+
+def test_every_tick_is_recorded_losslessly():
+    """Verifies each step leaves one sample matching the live state exactly."""
+    fleet = Fleet(capacity=2, seed=0)
+    slot = fleet.allocate()
+    fleet.track_history(slot)
+    for _ in range(5):
+        fleet.step(slot)
+
+    history = read_history(fleet, slot)
+    # The factory state at tick 0, then one sample per tick
+    assert history["sim_time"].tolist() == [0, 1, 2, 3, 4, 5]
+    assert history["battery"][-1] == fleet.battery[slot]
+    assert history["global_temp"][-1] == fleet.global_temp[slot]
+    assert np.array_equal(history["core_speed"][-1], fleet.core_speed[slot])
+    assert np.array_equal(history["core_temp"][-1], fleet.core_temp[slot])
+    print("\n[HISTORY] Per-tick recording verified.")
+
+
+def test_ring_keeps_only_the_newest_samples():
+    fleet = Fleet(capacity=1, seed=0)
+    slot = fleet.allocate()
+    fleet.track_history(slot)
+    for _ in range(HISTORY_DEPTH + 10):
+        fleet.step(slot)
+
+    sim_time = read_history(fleet, slot)["sim_time"]
+    assert sim_time.size == HISTORY_DEPTH
+    assert sim_time[0] == 11 and sim_time[-1] == HISTORY_DEPTH + 10
+    assert np.all(np.diff(sim_time) == 1)
+
+    # A reboot starts a fresh history
+    fleet.reset(slot)
+    assert read_history(fleet, slot)["sim_time"].tolist() == [0]
+
+
+def test_range_slicing_and_downsampling():
+    fleet = Fleet(capacity=1, seed=0)
+    slot = fleet.allocate()
+    fleet.track_history(slot)
+    fleet.power_mode[slot] = MODE_CODES["High Performance"]
+    for _ in range(40):
+        fleet.step(slot)
+
+    window = read_history(fleet, slot, start=10, end=19)
+    assert window["sim_time"].tolist() == list(range(10, 20))
+
+    summary = downsample(window, buckets=2, start=10, end=20)
+    assert summary["count"].tolist() == [5, 5]
+    first = window["battery"][:5]
+    assert summary["battery"]["min"][0] == first.min()
+    assert summary["battery"]["max"][0] == first.max()
+    assert np.isclose(summary["battery"]["mean"][0], first.mean())
+    assert summary["core_temp"]["max"].shape == (2, 8)
+
+
+def test_history_endpoint():
+    """Verifies /history returns raw columns and bucketed summaries."""
+    client.cookies.clear()
+    device_id = client.get("/telemetry").json()["device_id"]
+    client.post("/clock?time_scale=0")
+    # The first /history call starts recording, from the current state on
+    assert client.get("/history").json()["samples"] == 1
+    sim = user_sessions.get(device_id)
+    for _ in range(30):
+        sim.update_physics()
+
+    raw = client.get("/history?start=10&end=20").json()
+    assert raw["samples"] == 11
+    assert raw["sim_time"][0] == 10 and raw["sim_time"][-1] == 20
+    assert len(raw["core_speed"][0]) == 8
+    assert raw["power_mode"][0] == "Balance"
+
+    buckets = client.get("/history?buckets=3").json()["buckets"]
+    assert sum(buckets["count"]) == 31
+    assert len(buckets["battery"]["mean"]) == len(buckets["start"]) == 3
+    assert buckets["battery"]["min"][-1] <= buckets["battery"]["max"][0]
+
+    assert client.get("/history?buckets=0").status_code == 400
+    assert client.get("/history?start=5&end=1").status_code == 400
+    print("\n[HISTORY] /history endpoint verified.")
+
+
+def test_jump_ahead_records_segment_end_states():
+    """Verifies a fast-forward leaves at least its final state in the history."""
+    fleet = Fleet(capacity=1, seed=0)
+    slot = fleet.allocate()
+    fleet.track_history(slot)
+    fleet.advance(slot, 3_600)
+
+    history = read_history(fleet, slot)
+    assert history["sim_time"][-1] == 3_600
+    assert history["battery"][-1] == fleet.battery[slot]
+    assert np.all(np.diff(history["sim_time"]) > 0)
+
+
+def test_history_is_kept_only_for_chips_that_ask():
+    """Verifies the ring lives outside the fleet buffer and only holds rows for recorded chips."""
+    fleet = Fleet(capacity=4, seed=0)
+    quiet, watched = fleet.allocate(), fleet.allocate()
+    assert fleet.slot_nbytes() < 256
+    fleet.step()
+    assert fleet._history is None
+    assert read_history(fleet, quiet)["sim_time"].size == 0
+
+    fleet.step()
+    fleet.track_history(watched)
+    fleet.step()
+    assert read_history(fleet, watched)["sim_time"].tolist() == [2, 3]
+    assert read_history(fleet, quiet)["sim_time"].size == 0
+
+    # A released chip's row goes back to the ring for the next chip that asks
+    row = int(fleet.hist_row[watched])
+    fleet.release(watched)
+    fleet.track_history(quiet)
+    assert fleet.hist_row[quiet] == row
+    assert read_history(fleet, quiet)["sim_time"].tolist() == [3]
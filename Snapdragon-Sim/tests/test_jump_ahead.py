@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from simulator.fleet import Fleet, MODE_CODES, MODES
+
+N_CHIPS = 2000
+
+
+def make_fleet(seed, mode="Balance", battery=100.0, temp=40.0, n=N_CHIPS):
+    fleet = Fleet(capacity=n, seed=seed)
+    slots = np.array([fleet.allocate() for _ in range(n)])
+    fleet.power_mode[slots] = MODE_CODES[mode]
+    fleet.battery[slots] = battery
+    fleet.global_temp[slots] = temp
+    return fleet, slots
+
+
+def run_both(ticks, **start):
+    """Runs the same starting fleet tick-by-tick and via jump-ahead."""
+    stepped, slots = make_fleet(seed=1, **start)
+    for _ in range(ticks):
+        stepped.step(slots)
+    jumped, _ = make_fleet(seed=2, **start)
+    jumped.advance(slots, ticks)
+    return stepped, jumped, slots
+
+
+@pytest.mark.parametrize("mode,battery,ticks", [
+    ("High Performance", 100.0, 150),
+    ("High Performance", 100.0, 400),
+    ("Balance", 100.0, 600),
+    ("Balance", 21.3, 50),
+])
+def test_battery_and_mode_match_exactly(mode, battery, ticks):
+    """Verifies the deterministic battery drain and PMIC overrides match tick-for-tick."""
+    stepped, jumped, slots = run_both(ticks, mode=mode, battery=battery, n=50)
+
+    assert np.array_equal(stepped.battery[slots], jumped.battery[slots])
+    assert np.array_equal(stepped.power_mode[slots], jumped.power_mode[slots])
+    assert np.all(jumped.ticks[slots] == ticks)
+    print(f"\n[JUMP] {mode} x{ticks}: battery {jumped.battery[slots[0]]}%, {MODES[jumped.power_mode[slots[0]]]}")
+
+
+@pytest.mark.parametrize("mode,temp,ticks", [
+    ("Balance", 40.0, 40),             # free drift, occasionally near the 35°C floor
+    ("Balance", 70.0, 80),             # crosses 85°C and cycles through throttling
+    ("High Performance", 40.0, 20),    # just short of the first throttle
+    ("High Performance", 40.0, 60),    # throttle/recover cycles
+])
+def test_temperature_distribution_matches(mode, temp, ticks):
+    """Verifies the aggregated jitter reproduces the step-by-step temperature distribution."""
+    stepped, jumped, slots = run_both(ticks, mode=mode, temp=temp)
+    a, b = stepped.global_temp[slots], jumped.global_temp[slots]
+
+    # Means agree within ~5 standard errors, spreads within 15%
+    stderr = np.sqrt(a.var() / a.size + b.var() / b.size) + 1e-9
+    assert abs(a.mean() - b.mean()) < 5 * stderr + 0.05
+    assert abs(a.std() - b.std()) <= 0.15 * max(a.std(), 0.1) + 0.05
+
+    # Throttling share agrees within a few points
+    assert abs(stepped.is_throttling[slots].mean() - jumped.is_throttling[slots].mean()) < 0.05
+    print(f"\n[JUMP] {mode} x{ticks}: step {a.mean():.2f}±{a.std():.2f}°C, jump {b.mean():.2f}±{b.std():.2f}°C")
+
+
+def test_cooldown_pins_at_floor():
+    """Verifies saver-mode chips cool onto the 35°C floor and stay there exactly."""
+    stepped, jumped, slots = run_both(200, mode="Balance", battery=15.0, temp=84.0, n=200)
+    assert np.all(stepped.global_temp[slots] == 35.0)
+    assert np.all(jumped.global_temp[slots] == 35.0)
+    assert not jumped.is_throttling[slots].any()
+
+
+def test_core_values_follow_final_tick():
+    """Verifies per-core speeds and temps reflect the state of the last tick jumped."""
+    _, jumped, slots = run_both(30, mode="High Performance", n=200)
+    throttled = jumped.is_throttling[slots]
+    prime = jumped.core_speed[slots, 0]
+    assert np.all(np.abs(prime[throttled] - 1.80) <= 0.03 + 1e-9)
+    assert np.all(np.abs(prime[~throttled] - 4.32) <= 0.03 + 1e-9)
+    spread = np.abs(jumped.core_temp[slots] - jumped.global_temp[slots][:, None])
+    assert np.all(spread <= 1.0 + 1e-9)
+
+
+def test_mixed_tick_counts_in_one_call():
+    """Verifies each slot advances by its own tick count in a single batched call."""
+    fleet, slots = make_fleet(seed=3, n=3)
+    fleet.advance(slots, [0, 10, 86_400])
+    assert fleet.ticks[slots].tolist() == [0, 10, 86_400]
+    assert fleet.battery[slots].tolist() == [100.0, 98.5, 0.0]
+    assert MODES[fleet.power_mode[slots[2]]] == "Ultra Saver"
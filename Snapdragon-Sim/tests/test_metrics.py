@@ -0,0 +1,90 @@
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+
+from simulator import metrics
+from simulator.chip_api import app
+from simulator.fleet import Fleet, MODE_CODES
+
+client = TestClient(app)
+
+pytestmark = pytest.mark.skipif(not metrics.ENABLED, reason="metrics disabled (SIM_METRICS=0)")
+
+
+def sample(text, name, **labels):
+    """Value of one series in a /metrics scrape (0 if absent)."""
+    wanted = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    pattern = "^" + re.escape(name + (f"{{{wanted}}}" if wanted else "")) + r" (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_text_format_rendering():
+    """Verifies histogram buckets are cumulative with a +Inf bucket, and label values are escaped."""
+    registry = metrics.Registry()
+    histogram = metrics.Histogram("lat_seconds", "Latency", ("route",), registry=registry, buckets=(0.1, 1.0))
+    child = histogram.labels('/a"b')
+    for value in (0.05, 0.1, 0.5, 5.0):
+        child.observe(value)
+    metrics.Counter("hits_total", "Hits", registry=registry).inc(3)
+    metrics.Gauge("live", "Live things", registry=registry, function=lambda: 7)
+
+    text = registry.render()
+    assert "# TYPE lat_seconds histogram" in text
+    assert 'lat_seconds_bucket{route="/a\\"b",le="0.1"} 2' in text
+    assert 'lat_seconds_bucket{route="/a\\"b",le="1"} 3' in text
+    assert 'lat_seconds_bucket{route="/a\\"b",le="+Inf"} 4' in text
+    assert 'lat_seconds_count{route="/a\\"b"} 4' in text
+    assert 'lat_seconds_sum{route="/a\\"b"} 5.65' in text
+    assert "hits_total 3" in text
+    assert "live 7" in text
+
+    with pytest.raises(ValueError):
+        metrics.Counter("hits_total", "Again", registry=registry)
+    with pytest.raises(ValueError):
+        histogram.labels("a", "b")
+
+
+def test_requests_and_rejections_are_counted():
+    """Verifies /metrics reflects requests by route and status, and refused mode switches by reason."""
+    before = client.get("/metrics").text
+    client.get("/telemetry")
+    client.get("/telemetry")
+    assert client.post("/set_mode", params={"mode": "Turbo"}).status_code == 400
+
+    after = client.get("/metrics")
+    assert after.headers["content-type"].startswith("text/plain")
+    text = after.text
+
+    def delta(name, **labels):
+        return sample(text, name, **labels) - sample(before, name, **labels)
+
+    assert delta("sim_http_responses_total", route="/telemetry", method="GET", status="200") == 2
+    assert delta("sim_http_request_duration_seconds_count", route="/telemetry", method="GET") == 2
+    assert delta("sim_http_responses_total", route="/set_mode", method="POST", status="400") == 1
+    assert delta("sim_set_mode_rejected_total", reason="invalid_mode") == 1
+    assert sample(text, "sim_sessions_live") >= 1
+
+
+def test_physics_counters():
+    """Verifies stepped and jumped ticks are counted separately, and throttle onsets are counted once each."""
+    ticks = metrics.REGISTRY.get("sim_physics_ticks_total")
+    onsets = metrics.REGISTRY.get("sim_throttle_onsets_total")
+    stepped, jumped = ticks.labels("step").value, ticks.labels("advance").value
+    onsets_before = onsets._children[()].value
+
+    fleet = Fleet(capacity=2)
+    slots = [fleet.allocate(seed=i) for i in range(2)]
+    fleet.power_mode[slots] = MODE_CODES["High Performance"]
+    entered = 0
+    for _ in range(300):
+        was = fleet.is_throttling[slots].copy()
+        fleet.step(slots)
+        entered += int((fleet.is_throttling[slots] & ~was).sum())
+    fleet.advance(slots, 100)
+
+    assert entered > 0
+    assert ticks.labels("step").value - stepped == 600
+    assert ticks.labels("advance").value - jumped == 200
+    assert onsets._children[()].value - onsets_before >= entered
@@ -0,0 +1,79 @@
+import asyncio
+import signal
+import threading
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from simulator import chip_api
+from simulator.chip_api import app
+from simulator.profiler import ThreadSampler
+
+client = TestClient(app)
+
+ADMIN = {"X-Admin-Token": "s3cret"}
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(chip_api, "ADMIN_TOKEN", ADMIN["X-Admin-Token"])
+
+
+def spin(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def test_sampler_finds_the_hot_function():
+    """Verifies samples land in the busy function and the output is valid collapsed-stack text."""
+    stop = threading.Event()
+    worker = threading.Thread(target=spin, args=(stop,), name="spinner")
+    worker.start()
+    profiler = ThreadSampler(interval=0.002, thread_ids=(worker.ident,))
+    profiler.start()
+    threading.Event().wait(0.3)
+    profile = profiler.stop()
+    stop.set()
+    worker.join()
+
+    assert not profiler.running
+    assert profile.samples > 20
+    for line in profile.collapsed().splitlines():
+        frames, count = line.rsplit(" ", 1)
+        assert frames.startswith("spinner;") and int(count) > 0
+    top = {entry["function"].split(" ")[0]: entry for entry in profile.top(5)}
+    assert top["spin"]["total_percent"] == 100
+    assert "spin.<locals>.<genexpr>" in top or top["spin"]["self"] > 0
+
+
+def test_profile_is_admin_only(admin_token, monkeypatch):
+    assert client.get("/debug/profile?seconds=0.1").status_code == 403
+    assert client.get("/debug/profile?seconds=0.1", headers={"X-Admin-Token": "nope"}).status_code == 403
+    assert client.get("/debug/profile?seconds=600", headers=ADMIN).status_code == 400
+    assert client.get("/debug/profile?seconds=1&format=svg", headers=ADMIN).status_code == 400
+    monkeypatch.setattr(chip_api, "ADMIN_TOKEN", None)
+    assert client.get("/debug/profile?seconds=0.1", headers=ADMIN).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_profile_sees_telemetry_requests(admin_token):
+    """Verifies a profile taken under load attributes samples to the /telemetry handler, and uninstalls its timer."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://sim") as tab:
+        await tab.get("/telemetry")
+        profiling = asyncio.create_task(tab.get("/debug/profile?seconds=0.5&interval=0.001", headers=ADMIN))
+        while not profiling.done():
+            await tab.get("/telemetry")
+            # Let the profile request's sleep finish
+            await asyncio.sleep(0)
+        response = await profiling
+        assert (await tab.get("/debug/profile?seconds=0.1&format=collapsed", headers=ADMIN)).status_code == 200
+
+    result = response.json()
+    assert response.status_code == 200 and result["samples"] > 0
+    assert "get_telemetry" in result["collapsed"]
+    assert len(result["top"]) <= 20 and result["top"][0]["self"] >= result["top"][-1]["self"]
+    # The sampling timer is gone with the profile
+    assert signal.getsignal(signal.SIGPROF) == signal.SIG_DFL
+    assert signal.getitimer(signal.ITIMER_PROF) == (0.0, 0.0)
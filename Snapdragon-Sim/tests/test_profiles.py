@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from simulator.chip_api import SnapdragonSimulator, render_frame
+from simulator.export import open_export, record_run
+from simulator.fleet import Fleet, MODE_CODES
+from simulator.profiles import MODES, PROFILES, get_profile, profile_from_dict
+
+
+def make_fleet(profile, seed=0, n=20, mode="High Performance"):
+    fleet = Fleet(capacity=n, seed=seed, profile=profile)
+    slots = np.array([fleet.allocate() for _ in range(n)])
+    fleet.power_mode[slots] = MODE_CODES[mode]
+    return fleet, slots
+
+
+def test_profile_registry_and_specs(tmp_path):
+    """Verifies built-in lookups, JSON specs and spec validation."""
+    assert get_profile("snapdragon-8-elite").n_cores == 8
+    assert get_profile("mesh-128").n_cores == 128
+    with pytest.raises(ValueError):
+        get_profile("no-such-chip")
+
+    spec = tmp_path / "mesh-6.json"
+    spec.write_text('{"name": "mesh-6", "thermal": {"columns": 3}, "clusters": ['
+                    '{"name": "Big", "cores": 2, "freqs": [3.0, 2.5, 1.0, 1.0], "throttle_freq": 1.5},'
+                    '{"name": "Little", "cores": 4, "freqs": [2.0, 1.5, 0.8, 0.8], "throttle_freq": 1.0}]}')
+    profile = get_profile(str(spec))
+    assert PROFILES["mesh-6"] is profile
+    assert profile.core_labels == ("Big",) * 2 + ("Little",) * 4
+    assert profile.network.settle_ticks > 1
+
+    with pytest.raises(ValueError):
+        profile_from_dict({"name": "broken", "clusters": [{"name": "Big", "cores": 2}]})
+    with pytest.raises(ValueError, match="unique"):
+        profile_from_dict({"name": "twins", "clusters": [
+            {"name": "A", "cores": 1, "freqs": [1.0] * len(MODES), "throttle_freq": 1.0},
+            {"name": "A", "cores": 1, "freqs": [1.0] * len(MODES), "throttle_freq": 1.0},
+        ]})
+    with pytest.raises(ValueError, match="different numbers"):
+        profile_from_dict({"name": "ragged", "clusters": [
+            {"name": "A", "cores": 1, "freqs": [1.0] * len(MODES), "throttle_freq": 1.0},
+            {"name": "B", "cores": 1, "freqs": [1.0] * (len(MODES) - 1), "throttle_freq": 1.0},
+        ]})
+    with pytest.raises(ValueError, match=f"each of the {len(MODES)} power modes"):
+        profile_from_dict({"name": "two-mode", "clusters": [
+            {"name": "A", "cores": 1, "freqs": [1.0, 1.0], "throttle_freq": 1.0},
+            {"name": "B", "cores": 1, "freqs": [1.0, 1.0], "throttle_freq": 1.0},
+        ]})
+
+
+def test_rc_network_spreads_heat_and_settles():
+    """Verifies a hot core warms its grid neighbours and stepping converges on the steady state."""
+    network = get_profile("mesh-64").network
+    power = np.zeros((1, 64))
+    power[0, 9] = 4.0  # row 1, column 1 of the 8-wide grid
+    die = np.array([40.0])
+
+    temps = np.full((1, 64), 40.0)
+    for _ in range(network.settle_ticks * 4):
+        temps = network.step(temps, power, die)
+    steady = network.steady_state(power, die)
+    assert np.allclose(temps, steady, atol=1e-3)
+
+    core = steady[0]
+    assert core[9] == core.max()
+    # Direct neighbours sit between the hot core and a far corner
+    for neighbour in (1, 8, 10, 17):
+        assert core[63] < core[neighbour] < core[9]
+
+
+@pytest.mark.parametrize("ticks", [30, 400])
+def test_rc_exact_advance_matches_stepping(ticks):
+    """Verifies exact jump-ahead carries the RC network to the state tick-by-tick stepping reaches."""
+    stepped, slots = make_fleet("snapdragon-8-elite-rc", seed=1)
+    for _ in range(ticks):
+        stepped.step(slots)
+    jumped, _ = make_fleet("snapdragon-8-elite-rc", seed=1)
+    jumped.advance(slots, ticks, exact=True)
+
+    assert np.array_equal(stepped.global_temp[slots], jumped.global_temp[slots])
+    assert np.allclose(stepped.node_temp[slots], jumped.node_temp[slots], atol=1e-9)
+    assert np.array_equal(stepped.core_temp[slots], jumped.core_temp[slots])
+
+
+def test_rc_fast_advance_lands_near_stepping():
+    """Verifies a long approximate jump leaves every core within the die's own spread of stepping."""
+    stepped, slots = make_fleet("mesh-64", seed=1, mode="Balance")
+    for _ in range(3_000):
+        stepped.step(slots)
+    jumped, _ = make_fleet("mesh-64", seed=2, mode="Balance")
+    jumped.advance(slots, 3_000)
+
+    # Cores ride on the die temperature, whose jitter makes the two runs differ by a few degrees
+    die_gap = np.abs(stepped.global_temp[slots] - jumped.global_temp[slots])
+    core_gap = np.abs(stepped.core_temp[slots] - jumped.core_temp[slots]).max(axis=1)
+    assert np.all(core_gap <= die_gap + 0.5)
+
+
+def test_many_core_frames_and_export(tmp_path):
+    """Verifies a 128-core chip renders full frames and exports 128-wide rows."""
+    fleet, slots = make_fleet("mesh-128", n=3)
+    for _ in range(10):
+        fleet.step(slots)
+    frame = render_frame("mesh", SnapdragonSimulator("mesh", fleet=fleet, slot=int(slots[0])))
+    assert frame["chipset"] == "Mesh 128-core"
+    assert len(frame["cores"]) == 128
+    assert frame["cores"][0]["type"] == "Big" and frame["cores"][-1]["type"] == "Efficiency"
+    # Big cores draw more power, so they run hotter than the efficiency cores
+    big = [core["temp"] for core in frame["cores"] if core["type"] == "Big"]
+    little = [core["temp"] for core in frame["cores"] if core["type"] == "Efficiency"]
+    assert np.mean(big) > np.mean(little)
+
+    path = tmp_path / "mesh.sdx"
+    record_run(fleet, slots, [f"dev-{s}" for s in slots], ticks=5, path=str(path))
+    export = open_export(str(path))
+    assert export["core_temp"].shape == (len(export), 128)
@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+from fastapi.testclient import TestClient
+from framework.utils.bit_parser import BitParser
+from simulator.chip_api import app
+from simulator.fleet import Fleet
+from simulator.registers import RegisterFile, default_register_path
+
+
+def test_fleet_publishes_status_registers(tmp_path):
+    """Verifies every tick writes overheat, low-voltage and hottest-core bits per slot."""
+    path = str(tmp_path / "regs.bin")
+    fleet = Fleet(capacity=4, seed=0)
+    fleet.attach_registers(RegisterFile.create(path, capacity=16))
+    hot, flat = fleet.allocate(), fleet.allocate()
+
+    fleet.global_temp[hot] = 90.0
+    fleet.battery[flat] = 4.0
+    fleet.step()
+
+    # An external rig maps the same file read-only and decodes it in bulk
+    reader = RegisterFile.open(path)
+    cols = BitParser.parse_status_batch(reader.registers)
+    assert cols.overheat_fault[hot] and not cols.voltage_fault[hot]
+    assert cols.voltage_fault[flat] and not cols.overheat_fault[flat]
+    assert cols.reporting_core[hot] == np.argmax(fleet.core_temp[hot])
+    print(f"\n[REGS] Slot {hot}: 0x{int(reader.registers[hot]):04X}")
+
+
+def test_fault_injection_survives_ticks(tmp_path):
+    """Verifies injected bits stay forced across ticks until cleared."""
+    regs = RegisterFile.create(str(tmp_path / "regs.bin"), capacity=4)
+    fleet = Fleet(capacity=1, seed=0)
+    fleet.attach_registers(regs)
+    slot = fleet.allocate()
+
+    regs.inject(slot, set_bits=0x0001)
+    fleet.step()
+    assert BitParser.parse_status(hex(regs.registers[slot]))["overheat_fault"]
+
+    regs.clear_faults(slot)
+    fleet.step()
+    assert not BitParser.parse_status(hex(regs.registers[slot]))["overheat_fault"]
+
+    fleet.release(slot)
+    assert regs.registers[slot] == 0
+
+
+def test_register_endpoints():
+    """Verifies /registers reports the session's slot and /registers/fault forces bits."""
+    client = TestClient(app)
+    client.get("/telemetry")
+    info = client.get("/registers").json()
+    assert info["value"].startswith("0x")
+
+    response = client.post("/registers/fault?set_bits=0x0002")
+    assert response.status_code == 200
+    regs = RegisterFile.open(info["path"])
+    assert BitParser.parse_status(hex(regs.registers[info["slot"]]))["voltage_fault"]
+
+    client.delete("/registers/fault")
+    assert client.get("/registers").json()["forced_set"] == "0x0000"
+
+
+def test_default_register_file_is_per_process(monkeypatch):
+    """Verifies only shared-backend workers share the default file, and SIM_REGISTER_FILE="" disables it."""
+    monkeypatch.delenv("SIM_REGISTER_FILE", raising=False)
+    assert str(os.getpid()) in os.path.basename(default_register_path())
+    assert str(os.getpid()) not in os.path.basename(default_register_path(shared=True))
+    monkeypatch.setenv("SIM_REGISTER_FILE", "")
+    assert default_register_path() is None
+
+
+def test_temporary_register_file_is_removed(tmp_path):
+    """Verifies a temporary register file goes away with its mapping, and a plain one stays."""
+    temporary = str(tmp_path / "temp.bin")
+    registers = RegisterFile.create(temporary, 4, temporary=True)
+    assert os.path.exists(temporary)
+    del registers
+    assert not os.path.exists(temporary)
+
+    kept = str(tmp_path / "kept.bin")
+    registers = RegisterFile.create(kept, 4)
+    del registers
+    assert os.path.exists(kept)
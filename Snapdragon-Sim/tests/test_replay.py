@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from simulator import chip_api
+from simulator.chip_api import app, user_sessions
+from simulator.fleet import Fleet, MODE_CODES
+from simulator.replay import RecordedRun
+
+client = TestClient(app)
+
+STATE_COLUMNS = ("battery", "global_temp", "power_mode", "is_throttling", "core_speed", "core_temp")
+
+
+def test_seeded_chip_is_independent_of_its_batch():
+    """Verifies a seeded chip's run doesn't depend on which other chips share its steps."""
+    alone = Fleet(capacity=1)
+    a = alone.allocate(seed=1234)
+    crowd = Fleet(capacity=8)
+    others = [crowd.allocate() for _ in range(5)]
+    b = crowd.allocate(seed=1234)
+
+    alone.power_mode[a] = crowd.power_mode[b] = MODE_CODES["High Performance"]
+    for _ in range(30):
+        alone.step(a)
+        crowd.step(others + [b])
+    alone.advance(a, 5_000)
+    crowd.advance(others[:2] + [b], 5_000)
+
+    for name in STATE_COLUMNS:
+        assert np.array_equal(getattr(alone, name)[a], getattr(crowd, name)[b]), name
+    print("\n[RNG] Per-chip counter-based stream verified.")
+
+
+def test_short_jumps_match_stepping_exactly():
+    """Verifies exact-sum jump segments draw the very values stepping would."""
+    stepped, jumped = Fleet(capacity=1), Fleet(capacity=1)
+    s, j = stepped.allocate(seed=7), jumped.allocate(seed=7)
+    for _ in range(20):
+        stepped.step(s)
+    jumped.advance(j, 20)
+
+    for name in STATE_COLUMNS:
+        assert np.array_equal(getattr(stepped, name)[s], getattr(jumped, name)[j]), name
+
+
+def test_reboot_with_seed_reproduces_telemetry():
+    frames = []
+    for _ in range(2):
+        client.cookies.clear()
+        client.get("/telemetry")
+        client.post("/reboot?seed=99")
+        client.post("/clock?time_scale=0")
+        client.post("/set_mode?mode=High Performance")
+        client.post("/advance?seconds=600")
+        frame = client.get("/telemetry").json()
+        del frame["device_id"]
+        frames.append(frame)
+    assert frames[0] == frames[1]
+    assert client.post("/reboot?seed=-1").status_code == 400
+
+
+@pytest.fixture
+def record_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(chip_api, "RECORD_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_record_and_replay(record_dir):
+    """Verifies a recorded run serves its frames without physics and re-simulates identically."""
+    client.cookies.clear()
+    device_id = client.get("/telemetry").json()["device_id"]
+    assert client.post("/record/start?run=golden&seed=42").json() == {"run": "golden", "seed": 42}
+
+    served = {}
+    client.post("/clock?time_scale=0")
+    served[0] = client.get("/telemetry").json()
+    client.post("/set_mode?mode=High Performance")
+    client.post("/advance?seconds=45")
+    served[45] = client.get("/telemetry").json()
+    sim = user_sessions.get(device_id)
+    for _ in range(3):
+        sim.update_physics()
+    client.post("/advance?seconds=900")
+    served[sim.ticks] = client.get("/telemetry").json()
+    assert client.post("/record/stop").json()["run"] == "golden"
+
+    run = RecordedRun(str(record_dir / "golden.jsonl"))
+    assert run.rng_key == 42 and run.session_id == device_id
+    assert [c["op"] for c in run.commands if c["op"] != "advance"] == ["set", "step", "step", "step"]
+
+    # Served straight from the log
+    assert client.get("/replay/golden").json()["last_tick"] == sim.ticks
+    for tick, frame in served.items():
+        assert client.get(f"/replay/golden/telemetry?tick={tick}").json() == frame
+    assert client.get("/replay/golden/telemetry?tick=47").json() == served[45]
+
+    # ...and reproduced exactly by re-simulating the journal from the seed
+    verdict = client.post("/replay/golden/verify").json()
+    assert verdict["frames"] >= 3 and verdict["mismatched_ticks"] == []
+    print(f"\n[REPLAY] {verdict['frames']} recorded frames re-simulated identically.")
+
+    assert client.get("/replay/missing/telemetry?tick=0").status_code == 404
+    assert client.get("/replay/..%2Fetc/telemetry?tick=0").status_code in (400, 404)
+    assert client.post("/record/stop").status_code == 400
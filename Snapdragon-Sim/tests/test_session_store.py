@@ -0,0 +1,71 @@
+from fastapi.testclient import TestClient
+from simulator.chip_api import app, SnapdragonSimulator
+from simulator.fleet import Fleet
+from simulator.session_store import InMemorySessionStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_store(**kwargs):
+    fleet = Fleet(capacity=4, seed=0)
+    clock = FakeClock()
+    store = InMemorySessionStore(lambda sid: SnapdragonSimulator(sid, fleet=fleet), clock=clock, **kwargs)
+    return store, fleet, clock
+
+
+def test_idle_sessions_expire_on_sweep():
+    """Verifies sessions idle longer than the TTL are evicted and their slots freed."""
+    store, fleet, clock = make_store(ttl=60, max_sessions=None)
+    store.get_or_create("idle")
+    clock.now = 30
+    store.get_or_create("busy")
+
+    clock.now = 70
+    store.get("busy")  # refresh the busy session's idle timer
+    assert store.sweep() == 1
+    assert "idle" not in store and "busy" in store
+    assert len(fleet) == 1
+    print("\n[STORE] Idle TTL eviction verified.")
+
+
+def test_lru_cap_evicts_least_recently_used():
+    """Verifies the max-session cap evicts the least recently touched chip."""
+    store, fleet, _ = make_store(ttl=None, max_sessions=2)
+    store.get_or_create("a")
+    store.get_or_create("b")
+    store.get("a")
+    store.get_or_create("c")
+
+    assert list(store) == ["a", "c"]
+    assert store.stats()["evicted_lru"] == 1
+    assert len(fleet) == 2
+    print("\n[STORE] LRU cap verified.")
+
+
+def test_evicted_session_returns_at_factory_state():
+    """Verifies a cookie whose chip was evicted gets a clean factory chip back."""
+    store, _, _ = make_store(ttl=None, max_sessions=1)
+    chip = store.get_or_create("rig-1")
+    chip.state["battery_level"] = 12.0
+    store.get_or_create("rig-2")  # evicts rig-1
+
+    revived = store.get_or_create("rig-1")
+    assert revived.state["battery_level"] == 100.0
+    assert revived.state["power_mode"] == "Balance"
+    print("\n[STORE] Evicted session revived at factory state.")
+
+
+def test_session_stats_endpoint():
+    """Verifies /sessions/stats reports live counts and per-session memory."""
+    client = TestClient(app)
+    client.get("/telemetry")
+    stats = client.get("/sessions/stats").json()
+    assert stats["live_sessions"] >= 1
+    assert stats["approx_bytes_per_session"] > 0
+    print(f"\n[STORE] ~{stats['approx_bytes_per_session']} bytes per session.")
@@ -0,0 +1,144 @@
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from simulator import chip_api
+from simulator.chip_api import SnapdragonSimulator, app, render_frame
+from simulator.fleet import Fleet, MODE_CODES
+from simulator.session_store import InMemorySessionStore
+from simulator.snapshot import checkpoint, open_snapshot, restore_snapshot, save_snapshot
+
+client = TestClient(app)
+
+ADMIN = {"X-Admin-Token": "s3cret"}
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_store(capacity=4, clock=None, wall=None):
+    clock = clock or Clock()
+    fleet = Fleet(capacity=capacity, seed=0, wall=wall or Clock())
+    store = InMemorySessionStore(lambda session_id: SnapdragonSimulator(session_id, fleet), ttl=60,
+                                 max_sessions=None, clock=clock)
+    return fleet, store, clock
+
+
+def attach(fleet):
+    return lambda session_id, slot: SnapdragonSimulator(session_id, fleet, slot=slot, owns_slot=True)
+
+
+def populate(store, fleet, clock, n=6):
+    for i in range(n):
+        clock.now += 1
+        store.get_or_create(f"dev-{i}")
+    store.discard("dev-2")
+    fleet.power_mode[dict(store.items())["dev-3"].slot] = MODE_CODES["High Performance"]
+    for _ in range(25):
+        fleet.step()
+    # dev-0 becomes the most recently used
+    clock.now += 1
+    store.get("dev-0")
+
+
+def assert_same_chips(store, fleet, restored, restored_fleet):
+    assert list(restored) == list(store)
+    twins = dict(restored.items())
+    for session_id, chip in store.items():
+        twin = twins[session_id]
+        for name, _, _ in fleet.fields:
+            if name != "synced_at":
+                assert np.array_equal(getattr(fleet, name)[chip.slot], getattr(restored_fleet, name)[twin.slot]), name
+        assert render_frame(session_id, twin) == render_frame(session_id, chip)
+
+
+def test_snapshot_round_trips_into_an_empty_fleet(tmp_path):
+    """Verifies every chip, the LRU order and idle times survive, with the fleet adopting the mapped file."""
+    fleet, store, clock = make_store()
+    populate(store, fleet, clock)
+    save_snapshot(store, fleet, str(tmp_path / "s.snap"))
+
+    restored_fleet, restored, restored_clock = make_store(capacity=1, clock=Clock(50.0), wall=Clock(7.0))
+    assert restore_snapshot(restored, restored_fleet, str(tmp_path / "s.snap"), attach(restored_fleet)) == 5
+    assert_same_chips(store, fleet, restored, restored_fleet)
+    assert restored_fleet.buffer.base is not None  # a view of the mapping, not a copy
+
+    # Idle times carry over: dev-1 (idle 5s) expires before dev-0 (just used)
+    restored_clock.now += 59.5
+    restored.sweep()
+    assert list(restored) == ["dev-0"]
+    # Chip clocks pick up where they stopped rather than counting the downtime
+    assert restored_fleet.due_ticks(np.array([restored.get("dev-0").slot]))[0] == 0
+
+    # Restored chips own their slots and the fleet keeps growing as usual
+    restored.discard("dev-0")
+    assert len(restored_fleet) == 0
+    for i in range(10):
+        restored.get_or_create(f"new-{i}")
+    restored_fleet.step()
+    assert len(restored_fleet) == 10
+
+
+def test_snapshot_merges_into_a_live_store(tmp_path):
+    """Verifies restoring next to live sessions copies rows into free slots and keeps access order."""
+    fleet, store, clock = make_store()
+    populate(store, fleet, clock)
+    save_snapshot(store, fleet, str(tmp_path / "s.snap"))
+
+    live_fleet, live, live_clock = make_store(clock=Clock(10_000.0))
+    live.get_or_create("dev-1")
+    live_clock.now += 1
+    live.get_or_create("other")
+    live_clock.now += 0.5
+    restore_snapshot(live, live_fleet, str(tmp_path / "s.snap"), attach(live_fleet))
+
+    # The restored dev-1 replaces the live one; restored idle times slot in around "other"
+    assert list(live) == ["dev-1", "dev-3", "dev-4", "dev-5", "other", "dev-0"]
+    assert len(live_fleet) == 6
+    restored = InMemorySessionStore(None, max_sessions=None)
+    restored.load([(session_id, chip, 0) for session_id, chip in live.items() if session_id != "other"])
+    assert_same_chips(store, fleet, restored, live_fleet)
+
+
+def test_background_checkpoint_matches_blocking_save(tmp_path):
+    """Verifies a forked checkpoint writes the same snapshot, and a mismatched fleet refuses it."""
+    fleet, store, clock = make_store()
+    populate(store, fleet, clock)
+    save_snapshot(store, fleet, str(tmp_path / "a.snap"))
+    info = asyncio.run(checkpoint(store, fleet, str(tmp_path / "b.snap")))
+    assert info["sessions"] == 5
+
+    a, b = open_snapshot(str(tmp_path / "a.snap")), open_snapshot(str(tmp_path / "b.snap"))
+    assert a.sessions == b.sessions and a.idle == b.idle
+    assert np.array_equal(a.buffer, b.buffer)
+
+    other = Fleet(capacity=1, profile="mesh-64")
+    with pytest.raises(ValueError):
+        restore_snapshot(InMemorySessionStore(None), other, str(tmp_path / "a.snap"), attach(other))
+
+
+def test_snapshot_endpoint(tmp_path, monkeypatch):
+    """Verifies the admin checkpoint endpoint writes the live sessions to SIM_SNAPSHOT_FILE."""
+    path = str(tmp_path / "api.snap")
+    assert client.post("/debug/snapshot").status_code == 404
+
+    monkeypatch.setattr(chip_api, "ADMIN_TOKEN", ADMIN["X-Admin-Token"])
+    monkeypatch.setattr(chip_api, "SNAPSHOT_FILE", path)
+    client.cookies.set("chip_session", "snapshot-rig")
+    client.get("/telemetry")
+    client.post("/set_mode", params={"mode": "High Performance"})
+
+    response = client.post("/debug/snapshot", headers=ADMIN)
+    assert response.status_code == 200
+    assert response.json()["sessions"] == len(chip_api.user_sessions)
+
+    saved = open_snapshot(path)
+    row = saved.sessions.index("snapshot-rig")
+    assert saved.columns(chip_api.session_fleet)["power_mode"][row] == MODE_CODES["High Performance"]
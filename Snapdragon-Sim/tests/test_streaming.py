@@ -0,0 +1,54 @@
+import json
+from fastapi.testclient import TestClient
+from simulator.chip_api import app, telemetry_hub, tick_scheduler
+
+
+def test_websocket_stream_pushes_frames(monkeypatch):
+    """Verifies /telemetry/stream pushes live frames over a WebSocket."""
+    monkeypatch.setattr(tick_scheduler, "interval", 0.05)
+    with TestClient(app) as client:
+        device_id = client.get("/telemetry").json()["device_id"]
+        client.post("/clock?time_scale=100")
+
+        with client.websocket_connect("/telemetry/stream") as ws:
+            first = json.loads(ws.receive_text())
+            second = json.loads(ws.receive_text())
+
+    assert first["device_id"] == second["device_id"] == device_id
+    assert len(second["cores"]) == 8
+    # Frames come from the server tick, so the chip moved on between them
+    assert second["battery"] < first["battery"]
+    print(f"\n[STREAM] WebSocket frames: {first['battery']}% -> {second['battery']}%")
+
+
+def test_one_frame_fans_out_to_every_subscriber():
+    """Verifies all subscribers of a session receive the same serialized frame."""
+    client = TestClient(app)
+    device_id = client.get("/telemetry").json()["device_id"]
+    tab_a = telemetry_hub.subscribe(device_id)
+    tab_b = telemetry_hub.subscribe(device_id)
+    try:
+        tab_a.get_nowait(), tab_b.get_nowait()
+        client.post("/advance?seconds=1")
+        tick_scheduler.tick()
+        assert tab_a.get_nowait() is tab_b.get_nowait()
+    finally:
+        telemetry_hub.unsubscribe(device_id, tab_a)
+        telemetry_hub.unsubscribe(device_id, tab_b)
+    print("\n[STREAM] Fan-out verified.")
+
+
+def test_sse_fallback():
+    """Verifies the Server-Sent Events fallback emits telemetry events."""
+    client = TestClient(app)
+    client.get("/telemetry")
+    response = client.get("/telemetry/stream?max_frames=1")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frame = json.loads(response.text.removeprefix("data: ").strip())
+    assert frame["chipset"] == "Snapdragon 8 Elite (Gen 5)"
+
+
+def test_stream_requires_session_cookie():
+    """Verifies a cookieless client is turned away instead of streaming a random chip."""
+    client = TestClient(app)
+    assert client.get("/telemetry/stream").status_code == 400
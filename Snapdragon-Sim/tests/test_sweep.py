@@ -0,0 +1,62 @@
+import pytest
+
+from simulator.sweep import load_profiles, main, make_profile, run_batch, run_sweep
+
+
+def test_grid_expands_into_profiles():
+    profiles = load_profiles({
+        "grid": {"mode": ["High Performance", "Balance"], "battery": {"start": 10, "stop": 30, "step": 10}},
+        "duration": 60,
+    })
+    assert len(profiles) == 6
+    assert {p.duration for p in profiles} == {60}
+    assert len({p.seed for p in profiles}) == 6
+
+    with pytest.raises(ValueError):
+        make_profile({"name": "bad", "mode": "Turbo"})
+    with pytest.raises(ValueError):
+        make_profile({"name": "bad", "events": [{"at": 5}]})
+
+
+def test_sweep_metrics():
+    """Verifies time-to-saver, throttling and energy match the PMIC and governor rules."""
+    hp, idle = run_batch([
+        make_profile({"name": "hp", "mode": "High Performance", "battery": 30, "duration": 120, "seed": 1}),
+        make_profile({"name": "saver", "mode": "Battery Saver", "battery": 15, "duration": 120, "seed": 2}),
+    ])
+    # 30% at 0.45%/tick crosses the 20% saver threshold on tick 23 (the PMIC acts at the next tick)
+    assert hp.time_to_saver == 24.0
+    assert hp.time_to_throttle is not None and hp.peak_temp > 85
+    assert hp.energy_used == pytest.approx(30 - hp.final_battery)
+
+    assert idle.time_to_throttle is None
+    assert idle.time_to_saver == 1.0
+    assert idle.energy_used == pytest.approx(120 * 0.05)
+
+
+def test_timed_events_and_rejected_switches():
+    [result] = run_batch([make_profile({
+        "name": "events", "mode": "Balance", "battery": 100, "duration": 300, "seed": 3,
+        "events": [
+            {"at": 10, "set_mode": "Battery Saver"},  # not client-selectable
+            {"at": 20, "set_mode": "High Performance"},
+            {"at": 200, "reboot": True},
+        ],
+    })])
+    assert result.rejected_switches == 1
+    # Rebooted at t=200: back in Balance with a nearly full battery
+    assert result.final_mode == "Balance" and result.final_battery > 80
+
+
+def test_process_pool_matches_serial_run():
+    """Verifies results are identical (and ordered) however the sweep is parallelized."""
+    profiles = load_profiles({"grid": {"mode": ["High Performance"], "battery": {"start": 5, "stop": 100, "step": 5}},
+                              "duration": 200})
+    assert run_sweep(profiles, workers=1, batch_size=8) == run_sweep(profiles, workers=2, batch_size=8)
+
+
+def test_cli(tmp_path, capsys):
+    main(["--mode", "High Performance", "--battery", "50", "--duration", "60", "--workers", "1",
+          "--csv", str(tmp_path / "out.csv")])
+    assert "time_to_throttle" in capsys.readouterr().out
+    assert len((tmp_path / "out.csv").read_text().splitlines()) == 2
@@ -1,12 +1,9 @@
 import pytest
-from fastapi.testclient import TestClient
-# Assuming your file is named chip_api.py
-from simulator.chip_api import app, chip_state 
 
-client = TestClient(app)
+# `client` (see conftest.py) talks to a chip private to each test
 
 # --- TEST 1: TELEMETRY INTEGRITY ---
-def test_telemetry_integrity():
+def test_telemetry_integrity(client):
     """Verifies the Snapdragon 8 Elite returns the correct 8-core cluster data."""
     response = client.get("/telemetry")
     assert response.status_code == 200
@@ -24,14 +21,16 @@ def test_telemetry_integrity():
     print("\n[BACKEND] Test 1: Telemetry cluster mapping verified.")
 
 # --- TEST 2: POWER MODE PHYSICS ---
-def test_performance_boost_physics():
+def test_performance_boost_physics(client, power_cycle):
     """Verifies that the API successfully triggers the 4.32GHz boost logic."""
-    # First, ensure we reset to a known state
-    client.post("/reboot")
+    # power_cycle has reset the chip to a known state
     
     # Action: Switch to High Performance via query parameter
     response = client.post("/set_mode?mode=High Performance")
     assert response.status_code == 200
+
+    # Physics runs on the virtual clock, so let one simulated second pass
+    client.post("/advance?seconds=1")
     
     # Validation: Verify physics updated in telemetry
     telemetry = client.get("/telemetry").json()
@@ -43,17 +42,17 @@ def test_performance_boost_physics():
     print(f"[BACKEND] Test 2: Boost speed verified at {prime_speed} GHz.")
 
 # --- TEST 3: PMIC SAFETY OVERRIDE (NEGATIVE TEST) ---
-def test_pmic_low_battery_rejection():
+def test_pmic_low_battery_rejection(client, chip):
     """Verifies the PMIC blocks Performance Mode when battery is <= 20%."""
     # 1. Manually force the chip state to low battery for the test
-    chip_state["battery_level"] = 15.0
+    chip.state["battery_level"] = 15.0
     
     # 2. Try to switch to High Performance
     response = client.post("/set_mode?mode=High Performance")
     
     # 3. Verify rejection (400 Bad Request)
     assert response.status_code == 400
-    assert "Battery below 20%" in response.json()["detail"]
+    assert "Battery too low" in response.json()["detail"]
     
     # 4. Verify mode stayed in whatever it was (not High Performance)
     telemetry = client.get("/telemetry").json()
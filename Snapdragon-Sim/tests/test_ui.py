@@ -1,13 +1,18 @@
 import pytest
 from playwright.sync_api import expect
 from framework.pages.dashboard_page import SnapdragonDashboard
-import time
 
-def test_core_grid_initialization(page):
+
+@pytest.fixture
+def dashboard(page, live_server):
+    """The dashboard of this worker's own simulator; each page's browser context is its own chip."""
+    return SnapdragonDashboard(page, live_server)
+
+
+def test_core_grid_initialization(page, dashboard):
     """
     Step 1 (Sync): Verify the 8-core cluster layout.
     """
-    dashboard = SnapdragonDashboard(page)
     
     # Simple, linear execution
     dashboard.navigate()
@@ -22,11 +27,10 @@ def test_core_grid_initialization(page):
     
     print("\n[PASSED] Core initialization verified.")
 
-def test_responsive_grid_alignment(page):
+def test_responsive_grid_alignment(page, dashboard):
     """
     Test 2 (Alignment Logic): Verify grid 'snapping' behavior.
     """
-    dashboard = SnapdragonDashboard(page)
     dashboard.navigate()
 
     # --- 1. DESKTOP (4 Columns) ---
@@ -55,41 +59,36 @@ def test_responsive_grid_alignment(page):
 
 
 
-def test_live_telemetry_heartbeat(page):
+def test_live_telemetry_heartbeat(page, dashboard):
     """
     Test 3: Verify that the UI telemetry updates in real-time.
     """
-    dashboard = SnapdragonDashboard(page)
     dashboard.navigate()
 
-    # 1. Capture the initial temperature
-    # We wait a moment for the first 'fetch' to complete
-    page.wait_for_timeout(1000) 
-    temp_start = dashboard.get_global_temp()
+    # 1. Capture the initial temperature once the first frame is rendered
+    temp_start = dashboard.wait_for_snapshot(lambda snap: snap.cores, timeout=5).global_temp
     print(f"\n[HEARTBEAT] Start Temp: {temp_start}°C")
 
-    # 2. Wait for 2 seconds (allows two update cycles in the UI)
-    time.sleep(2)
-
-    # 3. Capture the temperature again
-    temp_end = dashboard.get_global_temp()
+    # 2. Wait (up to two update cycles) for a frame with a new temperature
+    end = dashboard.wait_for_snapshot(lambda snap: snap.global_temp != temp_start, timeout=2.5,
+                                      message="Telemetry Failure: Temperature is frozen!")
+    temp_end = end.global_temp
     print(f"[HEARTBEAT] End Temp: {temp_end}°C")
 
-    # 4. Assertion: The values should not be identical
+    # 3. Assertion: The values should not be identical
     assert temp_start != temp_end, "Telemetry Failure: Temperature is frozen!"
     print("[PASSED] Test 3: Live telemetry heartbeat detected.")
 
 from playwright.sync_api import expect
 
-def test_manual_mode_transition(page):
+def test_manual_mode_transition(page, dashboard):
     """
     Test 4: Verify clicking PERFORMANCE button boosts chip clock speeds.
     """
-    dashboard = SnapdragonDashboard(page)
     dashboard.navigate()
 
     # 1. Verify we start in a 'Balanced' state
-    initial_speed = dashboard.get_prime_core_speed()
+    initial_speed = dashboard.wait_for_snapshot(lambda snap: snap.cores, timeout=5).prime_core_speed
     print(f"\n[TRANSITION] Starting Speed: {initial_speed} GHz")
     dashboard.click_reset_soc()
     assert initial_speed < 4.0, "Setup Error: Chip did not start in Balanced mode."
@@ -103,9 +102,10 @@ def test_manual_mode_transition(page):
     expect(page.locator("#mode-text")).to_have_text("Mode: High Performance")
 
     # 4. Verify Hardware Speed update
-    # We wait 1.5s to ensure the JS 'update()' function has fetched the new data
-    page.wait_for_timeout(1500)
-    boosted_speed = dashboard.get_prime_core_speed()
+    # The first frame rendered after the switch carries the boosted clocks
+    snap = dashboard.wait_for_snapshot(lambda snap: snap.prime_core_speed > 4.0, timeout=5,
+                                       message="Physics Error: Prime cores never boosted")
+    boosted_speed = snap.prime_core_speed
     print(f"[TRANSITION] Boosted Speed: {boosted_speed} GHz")
     
     # 4.32 GHz is our target for Prime Cores in High Performance mode
@@ -113,11 +113,10 @@ def test_manual_mode_transition(page):
 
     print("[PASSED] Test 4: UI Button -> Hardware API -> Dashboard Sync verified.")    
 
-def test_thermal_throttling_visuals(page):
+def test_thermal_throttling_visuals(page, dashboard):
     """
     Test 5: Verify that the UI displays a red alert during thermal overheating.
     """
-    dashboard = SnapdragonDashboard(page)
     dashboard.navigate()
 
     # 1. Start the heat-up process
@@ -127,33 +126,31 @@ def test_thermal_throttling_visuals(page):
     # 2. Monitor until Throttling occurs
     # We use a loop to wait because the simulator takes time to heat up
     print("[THERMAL] Waiting for temperature to hit 85°C threshold...")
+
+    # Skip the slow heat-up ramp on the simulator's virtual clock
+    expect(page.locator("#mode-text")).to_have_text("Mode: High Performance")
+    dashboard.fast_forward(25)
     
-    # We'll give it a maximum of 30 seconds to overheat
-    success = False
-    for _ in range(30):
-        current_status = dashboard.get_thermal_status()
-        current_temp = page.locator("#global-temp").inner_text()
-        
-        print(f"[LIVE] Status: {current_status} | Temp: {current_temp}")
-        
-        if current_status == "THROTTLING":
-            success = True
-            break
-        page.wait_for_timeout(1000) # Check every second
+    # We'll give it a maximum of 30 seconds to overheat. One long-poll replaces
+    # the polling loop: the server answers with the frame where throttling began
+    result = dashboard.wait_for("thermal_status == THROTTLING", timeout=30)
+    frame = result["frame"]
+    print(f"[LIVE] Status: {frame['thermal_status']} | Temp: {frame['global_temp']}°C (tick {result['tick']})")
 
     # 3. Assertions
-    assert success, "Safety Failure: Chip reached high temp but did not trigger Throttling UI!"
+    assert result["matched"], "Safety Failure: Chip reached high temp but did not trigger Throttling!"
+    # The dashboard shows it from its next pushed frame
+    expect(page.locator("#status-text")).to_have_text("THROTTLING")
     
     # Verify the red blinking CSS class is active
     assert dashboard.is_throttling_style_active(), "Visual Failure: 'throttling' CSS class not found."
     
     print("[PASSED] Test 5: Thermal Throttling alert and visuals verified.")
 
-def test_pmic_battery_auto_override(page):
+def test_pmic_battery_auto_override(page, dashboard):
     """
     Test 6: Verify PMIC forces 'Balance' mode when battery hits 20%.
     """
-    dashboard = SnapdragonDashboard(page)
     dashboard.navigate()
 
     # 1. Set to Performance Mode to accelerate battery drain
@@ -162,28 +159,24 @@ def test_pmic_battery_auto_override(page):
     
     # 2. Wait until battery drops to the critical threshold (20%)
     print("[PMIC] Monitoring battery drain (Waiting for 20%)...")
+
+    # Skip ~3 minutes of drain on the simulator's virtual clock
+    expect(page.locator("#mode-text")).to_have_text("Mode: High Performance")
+    dashboard.fast_forward(180)
     
-    overridden = False
-    # We'll check for up to 60 seconds
-    for _ in range(240):
-        level = dashboard.get_battery_level()
-        mode = dashboard.get_current_mode_text()
-        
-        print(f"[LIVE] Battery: {level}% | {mode}")
-        
-        # The logic: If battery <= 20, mode should NOT be High Performance
-        if level <= 20:
-            if "Saver" in mode:
-                overridden = True
-                break
-        
-        page.wait_for_timeout(1000)
+    # We'll wait for up to 60 seconds, server-side
+    # The logic: If battery <= 20, mode should NOT be High Performance
+    result = dashboard.wait_for("battery <= 20", "mode ~ Saver", timeout=60)
+    frame = result["frame"]
+    print(f"[LIVE] Battery: {frame['battery']}% | Mode: {frame['power_mode']} (tick {result['tick']})")
 
     # 3. Assertions
-    assert overridden, "Safety Failure: PMIC did not force Balance mode at 20% battery!"
+    assert result["matched"], "Safety Failure: PMIC did not force Balance mode at 20% battery!"
+    # Mode and speed are read from the same rendered frame
+    snap = dashboard.wait_for_snapshot(lambda snap: "Saver" in snap.mode, timeout=5)
     
     # 4. Final Verification: Speed should be back to Balanced (~3.53 GHz)
-    current_speed = dashboard.get_prime_core_speed()
+    current_speed = snap.prime_core_speed
     print(f"[PMIC] Current Prime Core Speed: {current_speed} GHz")
     assert current_speed < 4.0, f"Hardware Failure: Speed still boosted at {current_speed} GHz"
 
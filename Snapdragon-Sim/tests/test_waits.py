@@ -0,0 +1,133 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from simulator.chip_api import app, condition_waits, tick_scheduler
+from simulator.fleet import Fleet, MODE_CODES
+from simulator.selectors import parse_selector, select
+
+client = TestClient(app)
+
+STATE_COLUMNS = ("battery", "global_temp", "power_mode", "is_throttling", "core_speed", "core_temp")
+
+
+def first_crossing(seed, condition, ticks=3000):
+    """(tick, fleet state) where `condition` first holds for a High Performance chip, found by stepping."""
+    fleet = Fleet(capacity=1)
+    slot = fleet.allocate(seed=seed)
+    fleet.power_mode[slot] = MODE_CODES["High Performance"]
+    selectors = [parse_selector(condition)]
+    for _ in range(ticks):
+        fleet.step(slot)
+        if select(fleet, np.array([slot]), selectors)[0]:
+            return int(fleet.ticks[slot]), fleet, slot
+    raise AssertionError(f"{condition} never held")
+
+
+@pytest.mark.parametrize("condition", ["thermal_status == THROTTLING", "battery <= 20", "mode ~ Saver", "temp > 80"])
+def test_watch_stops_on_the_exact_crossing_tick(condition):
+    """Verifies a watched jump-ahead pauses on the very tick (and state) stepping first satisfies the condition."""
+    tick, stepped, s = first_crossing(5, condition)
+
+    fleet = Fleet(capacity=1)
+    slot = fleet.allocate(seed=5)
+    fleet.power_mode[slot] = MODE_CODES["High Performance"]
+    seen = []
+    fleet.watch(slot, lambda columns, slots: select(columns, slots, [parse_selector(condition)]),
+                lambda: seen.append({name: getattr(fleet, name)[slot].copy() for name in ("ticks", *STATE_COLUMNS)}))
+    fleet.advance(slot, 3000)
+
+    assert len(seen) == 1 and seen[0]["ticks"] == tick
+    for name in STATE_COLUMNS:
+        assert np.array_equal(seen[0][name], getattr(stepped, name)[s]), name
+    assert fleet.ticks[slot] == 3000 and not fleet.watches
+
+
+def test_only_watched_slots_leave_the_vectorized_path(monkeypatch):
+    """Verifies one pending watch sends just its own slot through the per-slot loop."""
+    fleet = Fleet(capacity=64, seed=0)
+    slots = [fleet.allocate() for _ in range(64)]
+    fired = []
+    fleet.watch(slots[7], lambda columns, idx: columns.ticks[idx] >= 5, lambda: fired.append(int(fleet.ticks[slots[7]])))
+    looped = []
+    advance_watched = fleet._advance_watched
+    monkeypatch.setattr(fleet, "_advance_watched", lambda idx, remaining: looped.append(idx.tolist())
+                        or advance_watched(idx, remaining))
+
+    fleet.advance(None, 100)
+    fleet.step()
+    assert looped == [[slots[7]]]
+    assert fired == [5]
+    assert (fleet.ticks[slots] == 101).all()
+
+
+@pytest.fixture
+def fast_polls(monkeypatch):
+    monkeypatch.setattr(tick_scheduler, "interval", 0.02)
+
+
+def new_chip(seed):
+    client.cookies.clear()
+    client.get("/telemetry")
+    client.post(f"/reboot?seed={seed}")
+    client.post("/clock?time_scale=0")
+    client.post("/set_mode?mode=High Performance")
+
+
+def test_wait_for_returns_the_crossing_frame(fast_polls):
+    """Verifies one long-poll replaces a polling loop and reports the frame of the crossing tick."""
+    tick, stepped, s = first_crossing(8, "battery <= 20")
+    new_chip(8)
+    client.post("/clock?time_scale=2000")
+
+    result = client.get("/wait_for", params={"condition": ["battery <= 20"], "timeout": 10}).json()
+    assert result["matched"] and result["tick"] == tick
+    assert result["frame"]["battery"] == stepped.battery[s]
+    assert result["frame"]["global_temp"] == stepped.global_temp[s]
+    print(f"\n[WAIT] battery <= 20 first held at tick {tick}: {result['frame']['battery']}%")
+
+    # Already true: answered at once with the current state
+    result = client.get("/wait_for", params={"condition": ["mode ~ Saver", "battery < 20"], "timeout": 1}).json()
+    assert result["matched"] and "Saver" in result["frame"]["power_mode"]
+
+
+@pytest.mark.asyncio
+async def test_fast_forward_wakes_waiter_at_the_crossing():
+    """Verifies a one-shot /advance far past the crossing still reports the tick it first held."""
+    tick, _, _ = first_crossing(3, "thermal_status == THROTTLING")
+    new_chip(3)
+
+    # Both requests on one event loop, as under uvicorn
+    transport = httpx.ASGITransport(app=app)
+    cookies = {"chip_session": client.cookies["chip_session"]}
+    async with httpx.AsyncClient(transport=transport, base_url="http://sim", cookies=cookies) as tab:
+        async def fast_forward():
+            for _ in range(500):
+                if condition_waits.pending:
+                    break
+                await asyncio.sleep(0.01)
+            await tab.post("/advance?seconds=600")
+
+        waited, _ = await asyncio.gather(
+            tab.get("/wait_for?condition=thermal_status == THROTTLING&timeout=10"), fast_forward())
+        result = waited.json()
+        clock = (await tab.get("/clock")).json()
+
+    assert result["matched"] and result["tick"] == tick
+    assert result["frame"]["thermal_status"] == "THROTTLING"
+    assert clock["ticks"] == 600
+
+
+def test_wait_for_timeout_and_validation(fast_polls):
+    new_chip(1)
+    result = client.get("/wait_for?condition=battery < 5&timeout=0.1").json()
+    assert not result["matched"] and result["frame"]["battery"] == 100
+
+    assert client.get("/wait_for?condition=voltage < 3").status_code == 400
+    assert client.get("/wait_for?condition=mode ~ Turbo").status_code == 400
+    assert client.get("/wait_for?condition=all&timeout=3600").status_code == 400
+    client.cookies.clear()
+    assert client.get("/wait_for?condition=all").status_code == 400